@@ -0,0 +1,73 @@
+"""
+Outils communs aux benchmarks.
+
+L'import de ce module rend les modules de l'application importables (ROOT
+dans sys.path) et choisit la plateforme Qt hors écran ; il doit donc précéder
+les imports de l'application :
+
+    from _common import argument_parser, make_samples
+
+    from protocol import FrameDecoder
+
+Seuls os et sys sont importés ici : bench_startup mesure les imports de
+l'application dans un processus qui charge aussi ce module.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def argument_parser(doc):
+    """Analyseur d'arguments d'un benchmark, la docstring du script servant d'aide"""
+    import argparse
+    return argparse.ArgumentParser(description=doc, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+
+def silence_console_logging():
+    """
+    Retire les sorties console du logging racine (basicConfig de l'application) ;
+    les journaux fichiers restent actifs et font partie de la mesure.
+    """
+    import logging
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if type(handler) is logging.StreamHandler:
+            root.removeHandler(handler)
+
+
+def rss_mb():
+    """Mémoire résidente courante en Mo (Linux), sinon pic"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_samples(count, period=1.0, start_ns=None):
+    """count échantillons STATUS synthétiques espacés de period secondes"""
+    import time
+    from protocol import StatusSample
+    t0 = time.monotonic_ns() if start_ns is None else start_ns
+    step = round(period * 1e9)
+    return [
+        StatusSample(t0 + i * step, 10 + (i % 500) / 100, 80 + (i % 70) / 10,
+                     12.0 + (i % 7) / 4, 7.25, float(i % 255), 3, 2)
+        for i in range(count)
+    ]
+
+
+def git_commit():
+    """Commit courant (abrégé), ou None hors d'un dépôt git"""
+    import subprocess
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
@@ -0,0 +1,93 @@
+"""
+Application d'un changement de réglages (DELTA, OFFSET, mode, SAVE) sur un
+périphérique simulé derrière un pseudo-terminal (POSIX).
+
+- ancien envoi : 100 ms avant chaque commande, 0.5 s entre DELTA et
+  OFFSET (MainWindow.send_variables), une commande refusée tant que la
+  précédente n'a pas répondu
+- file de commandes : tout est mis en file d'un coup, chaque commande part
+  dès l'ACK de la précédente
+
+Usage : python benchmarks/bench_command_queue.py [--rounds 5] [--latency 0.01]
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+import tty
+
+from _common import argument_parser
+
+from main import SerialWorker
+
+# Commandes suivies d'un octet de valeur
+_WITH_VALUE = (0x31, 0x32, 0x36)
+
+
+def device(fd, latency):
+    """Répond ACK à chaque commande après `latency` secondes"""
+    while True:
+        try:
+            command = os.read(fd, 1)
+        except OSError:
+            return
+        if not command:
+            return
+        if command[0] in _WITH_VALUE:
+            os.read(fd, 1)
+        time.sleep(latency)
+        os.write(fd, b'\x35')
+
+
+def apply_settings(worker):
+    return [worker.send_delta_temp(3), worker.send_dew_offset(4),
+            worker.send_mode(True, 50), worker.send_save()]
+
+
+def legacy_apply_settings(worker):
+    """Reproduit les délais fixes de l'ancien envoi"""
+    for index, send in enumerate((lambda: worker.send_delta_temp(3), lambda: worker.send_dew_offset(4),
+                                  lambda: worker.send_mode(True, 50), worker.send_save)):
+        if index == 1:
+            time.sleep(0.5)
+        time.sleep(0.1)
+        send().result(timeout=10)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.01, help="temps de réponse du périphérique (s)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    threading.Thread(target=device, args=(master, args.latency), daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # serial_corrected.log et logs/ du worker
+        worker = SerialWorker()
+        worker.device_boot_delay = 3600  # pas de HELLO/STATUS automatiques
+        worker.connect(os.ttyname(slave))
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            legacy_apply_settings(worker)
+        legacy = (time.perf_counter() - start) / args.rounds
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for future in apply_settings(worker):
+                future.result(timeout=10)
+        queued = (time.perf_counter() - start) / args.rounds
+        worker.disconnect()
+
+    print(f"4 commandes, réponse en {args.latency * 1e3:.0f} ms")
+    print(f"ancien envoi       : {legacy * 1e3:.0f} ms par changement de réglages")
+    print(f"file de commandes  : {queued * 1e3:.0f} ms par changement de réglages")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Coût par appareil ajouté au ControllerManager (pseudo-terminaux, POSIX).
+
+Les périphériques simulés (device_simulator) tournent dans un processus
+fils afin que seul le gestionnaire soit mesuré. Pour 1, 2, 4... --devices
+appareils interrogés toutes les --period secondes, on relève le
+CPU consommé, la mémoire résidente et le nombre de threads.
+
+Usage : python benchmarks/bench_controller_manager.py [--devices 16] [--period 0.1] [--seconds 3]
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from _common import argument_parser, rss_mb
+
+from controller_manager import ControllerManager
+from device_simulator import DeviceSimulator
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--devices', type=int, default=16)
+    parser.add_argument('--period', type=float, default=0.1, help="période STATUS par appareil (s)")
+    parser.add_argument('--seconds', type=float, default=3.0, help="durée de mesure par palier")
+    parser.add_argument('--history', type=int, default=43200, help="capacité de l'historique par appareil")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    simulator = DeviceSimulator(args.devices)
+    names = simulator.fork()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        manager = ControllerManager(directory, history_capacity=args.history)
+        base_rss, base_threads = rss_mb(), threading.active_count()
+        print(f"période STATUS {args.period * 1e3:.0f} ms, historique {args.history} points")
+        print("appareils | CPU (%) | CPU/appareil (%) | RSS (+Mo) | Mo/appareil | threads | échantillons/s")
+
+        steps = sorted({1 << k for k in range(args.devices.bit_length()) if 1 << k <= args.devices} | {args.devices})
+        for count in steps:
+            while len(manager.devices) < count:
+                index = len(manager.devices)
+                manager.add_device(f"anneau{index}", names[index], poll_interval=args.period, adaptive=False,
+                                   boot_delay=0)
+            time.sleep(0.5)  # mise en régime
+            samples = sum(len(device.history) for device in manager.devices.values())
+            start, cpu = time.perf_counter(), time.process_time()
+            time.sleep(args.seconds)
+            elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+            rate = (sum(len(device.history) for device in manager.devices.values()) - samples) / elapsed
+            load = cpu / elapsed * 100
+            rss = rss_mb() - base_rss
+            print(f"{count:9} | {load:7.2f} | {load / count:16.3f} | {rss:9.1f} | {rss / count:11.2f} | "
+                  f"{threading.active_count() - base_threads:7} | {rate:14.0f}")
+
+        manager.shutdown()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Démarrage et empreinte mémoire de darkidew-daemon (pseudo-terminal, POSIX).
+
+Lance daemon.py contre un périphérique simulé et mesure le temps jusqu'au
+premier échantillon STATUS, puis la mémoire résidente (VmRSS et pic VmHWM)
+une fois en régime. À titre de comparaison, mesure aussi le simple import
+de l'application graphique (main.py, Qt compris).
+
+Usage : python benchmarks/bench_daemon_startup.py [--runs 5] [--interval 0.2]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import ROOT, argument_parser
+
+from device_simulator import DeviceSimulator
+
+# Objectifs de la demande
+TARGET_STARTUP_MS = 200
+TARGET_RSS_MB = 30
+
+
+def memory_mb(pid):
+    """(VmRSS, VmHWM) d'un processus en Mo"""
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(value.split()[0]) / 1024
+    return values['VmRSS'], values['VmHWM']
+
+
+def run_daemon(port, interval, log_dir):
+    """Temps jusqu'au premier échantillon (ms), RSS et pic en régime (Mo)"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'daemon.py'), '--port', port,
+                                '--boot-delay', '0', '--interval', str(interval), '--log-dir', log_dir],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    process.stdout.readline()
+    first_sample = (time.perf_counter() - start) * 1e3
+    for _ in range(5):
+        process.stdout.readline()
+    rss, peak = memory_mb(process.pid)
+    process.terminate()
+    process.wait(timeout=10)
+    return first_sample, rss, peak
+
+
+def run_import(module, check):
+    """Temps (ms) et RSS (Mo) de `python -c "import module"`"""
+    code = (f"import time, sys; t = time.perf_counter(); import {module}; t = time.perf_counter() - t; "
+            f"assert {check}; print(t * 1e3, open('/proc/self/status').read())")
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    elapsed, status = output.split(' ', 1)
+    rss = next(int(line.split()[1]) for line in status.splitlines() if line.startswith('VmRSS')) / 1024
+    return float(elapsed), rss
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--interval', type=float, default=0.2, help="période STATUS du démon (s)")
+    args = parser.parse_args()
+
+    simulator = DeviceSimulator(1)
+    port, = simulator.fork()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            runs = [run_daemon(port, args.interval, directory) for _ in range(args.runs)]
+        first, rss, peak = (sorted(values)[len(values) // 2] for values in zip(*runs))
+        print(f"daemon.py       : 1er STATUS {first:6.0f} ms (objectif < {TARGET_STARTUP_MS} ms), "
+              f"RSS {rss:5.1f} Mo, pic {peak:5.1f} Mo (objectif < {TARGET_RSS_MB} Mo)")
+    finally:
+        simulator.stop()
+
+    for label, module, check in (("import daemon", 'daemon', "'PyQt6' not in sys.modules"),
+                                 ("import main", 'main', "'PyQt6' in sys.modules")):
+        elapsed, rss = zip(*(run_import(module, check) for _ in range(args.runs)))
+        print(f"{label:16}: {sorted(elapsed)[len(elapsed) // 2]:6.0f} ms, RSS {sorted(rss)[len(rss) // 2]:5.1f} Mo")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Débit de journalisation et nombre d'appels système d'écriture.
+
+Chaque échantillon reproduit ce que journalise SerialWorker pour un STATUS :
+la commande TX, le bloc RX reçu puis l'échantillon décodé (CSV + JSON).
+
+- ancien : écriture et flush() à chaque ligne CSV/JSONL, dans le thread appelant
+- DataLogger : file bornée + thread d'écriture, vidage par lots, pour chaque
+  niveau de durabilité
+
+Les appels système d'écriture sont lus dans /proc/self/io (syscw, Linux).
+Le débit est mesuré en rafale ; le coût côté appelant (thread de lecture
+série) est la médiane mesurée à 1000 échantillons/s.
+
+Usage : python benchmarks/bench_data_logger.py [--samples 20000]
+"""
+import csv
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from _common import argument_parser
+
+from data_logger import DataLogger, DURABILITY_BATCH, DURABILITY_FSYNC, DURABILITY_IMMEDIATE
+from protocol import STATUS_FIELDS, parse_status_payload
+
+TX = bytes([0x31])
+RX = b'[12.34#85.10#15.20#9.87#127.00#3#2]\x35'
+
+
+class LegacyLogger:
+    """Journalisation d'origine : un write + flush par ligne"""
+
+    def __init__(self, log_dir):
+        self.csv_file = open(os.path.join(log_dir, 'legacy.csv'), 'w', newline='')
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(['timestamp'] + list(STATUS_FIELDS))
+        self.json_file = open(os.path.join(log_dir, 'legacy.jsonl'), 'w')
+
+    def log_parsed_data(self, sample):
+        row = [sample.timestamp.isoformat()]
+        row.extend(sample.values())
+        self.csv_writer.writerow(row)
+        self.csv_file.flush()
+        self._log_json('DATA', sample._asdict())
+
+    def log_raw_data(self, data, direction="RX"):
+        event = {
+            'type': 'RAW',
+            'direction': direction,
+            'timestamp': datetime.now().isoformat(),
+            'data_hex': data.hex(),
+            'data_length': len(data)
+        }
+        self._log_json('RAW', event)
+
+    def _log_json(self, event_type, data):
+        log_entry = {'event_type': event_type, 'timestamp': datetime.now().isoformat(), 'data': data}
+        self.json_file.write(json.dumps(log_entry) + '\n')
+        self.json_file.flush()
+
+    def stop_logging(self):
+        self.csv_file.close()
+        self.json_file.close()
+
+
+def write_syscalls():
+    """Nombre cumulé d'appels système d'écriture du processus (Linux)"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('syscw:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def caller_cost(logger, samples):
+    """Médiane du temps passé dans les appels de journalisation, à 1 kHz"""
+    costs = []
+    for sample in samples:
+        start = time.perf_counter()
+        logger.log_raw_data(TX, direction="TX")
+        logger.log_raw_data(RX, direction="RX")
+        logger.log_parsed_data(sample)
+        costs.append(time.perf_counter() - start)
+        time.sleep(0.001)
+    return statistics.median(costs) * 1e6
+
+
+def run(logger, samples):
+    cost = caller_cost(logger, samples[:1000])
+    before = write_syscalls()
+    start = time.perf_counter()
+    for sample in samples:
+        logger.log_raw_data(TX, direction="TX")
+        logger.log_raw_data(RX, direction="RX")
+        logger.log_parsed_data(sample)
+    logger.stop_logging()
+    total = time.perf_counter() - start
+    after = write_syscalls()
+    syscalls = after - before if before is not None else None
+    return cost, len(samples) / total, syscalls, getattr(logger, 'dropped', 0)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--samples', type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    samples = [parse_status_payload(RX[1:-2]) for _ in range(args.samples)]
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.chdir(log_dir)  # DataLogger écrit application.log dans log_dir
+        results = [("ancien (flush par ligne)", run(LegacyLogger(log_dir), samples))]
+        for durability in (DURABILITY_IMMEDIATE, DURABILITY_BATCH, DURABILITY_FSYNC):
+            logger = DataLogger(os.path.join(log_dir, durability), durability=durability)
+            logger.start_new_session()
+            results.append((f"DataLogger {durability}", run(logger, samples)))
+
+    print(f"{args.samples} échantillons (TX + RX + STATUS décodé)")
+    print("mode                      | appelant (µs/éch) | rafale (éch/s) | write() | abandonnés")
+    for label, (cost, total, syscalls, dropped) in results:
+        print(f"{label:25} | {cost:17.1f} | {total:14.0f} | "
+              f"{syscalls if syscalls is not None else 'n/a':>7} | {dropped:10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmark du décodeur de trames (protocol.FrameDecoder).
+
+- débit en trames/s, flux alimenté octet par octet puis en gros morceaux
+- coût d'une réponse longue et bruitée reçue par petits morceaux, comparé à
+  l'ancien parseur STATUS de SerialWorker (reconstruction ASCII du buffer
+  complet à chaque morceau, donc O(n²))
+
+Usage : python benchmarks/bench_frame_decoder.py [--frames 20000]
+"""
+import time
+
+from _common import argument_parser
+
+from protocol import FrameDecoder
+
+STATUS_FRAME = b'[12.34#85.10#15.20#9.87#127.00#3#2]\x35'
+
+
+def make_stream(frames):
+    """Flux réaliste : réponses STATUS entrecoupées d'ACK et de HELLO"""
+    unit = STATUS_FRAME + b'\x35' + STATUS_FRAME + b'\x30\x35'
+    return unit * (frames // 4)
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def legacy_status_scan(chunks):
+    """Reproduction de l'ancien _process_status_response_smart (sans logs)"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer.extend(chunk)
+        buffer_str = ""
+        for byte in buffer:
+            if 32 <= byte <= 126:
+                buffer_str += chr(byte)
+            else:
+                buffer_str += f"\\x{byte:02X}"
+        if ']' in buffer_str:
+            for i, byte in enumerate(buffer):
+                if byte == 0x5D and len(buffer) > i + 1 and buffer[i + 1] == 0x35:
+                    return i
+    return None
+
+
+def time_feed(chunks):
+    decoder = FrameDecoder()
+    start = time.perf_counter()
+    count = 0
+    for chunk in chunks:
+        count += len(decoder.feed(chunk))
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    stream = make_stream(args.frames)
+    print(f"Flux : {len(stream)} octets")
+    for label, size in (("octet par octet", 1), ("morceaux de 64 o", 64), ("morceaux de 64 Ko", 65536)):
+        count, elapsed = time_feed(chunked(stream, size))
+        print(f"  {label:20}: {count / elapsed:12,.0f} trames/s  ({len(stream) / elapsed / 1e6:6.2f} Mo/s)")
+
+    print("Réponse STATUS bruitée reçue par morceaux de 16 octets :")
+    for noise in (256, 1024, 4096):
+        response = b'[' + b'7' * noise + b']\x35'
+        chunks = chunked(response, 16)
+        start = time.perf_counter()
+        decoder = FrameDecoder(max_payload=noise + 1)
+        for chunk in chunks:
+            decoder.feed(chunk)
+        new = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy_status_scan(chunks)
+        old = time.perf_counter() - start
+        print(f"  {noise:5} octets : décodeur {new * 1e3:8.3f} ms | ancien parseur {old * 1e3:9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
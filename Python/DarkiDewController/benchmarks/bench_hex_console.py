@@ -0,0 +1,77 @@
+"""
+Console HEX sous un flux de trames brutes (port bavard).
+
+- QTextEdit : formatage octet par octet, append() puis suppression de la
+  première ligne au-delà de la limite (ancienne console)
+- HexConsole : formatage bytes.hex(' ') / translate, QPlainTextEdit à
+  nombre de blocs borné, un seul ajout par trame d'affichage
+
+Mesure le temps passé dans la boucle d'événements Qt pour afficher
+--chunks trames.
+
+Usage : python benchmarks/bench_hex_console.py [--chunks 20000] [--lines 1000]
+"""
+import time
+from datetime import datetime
+
+from _common import argument_parser
+
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QApplication, QTextEdit
+
+from hex_console import HexConsole
+
+CHUNK = b'[12.50#80.10#15.00#9.87#127.00#3#2]\x35'
+
+
+def legacy_append(console, data, max_lines):
+    """Ancienne MainWindow.update_raw_log"""
+    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    hex_str = ' '.join(f'{b:02X}' for b in data)
+    ascii_str = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in data)
+    console.append(f"[{timestamp}] RX: {hex_str:30} | {ascii_str}\n")
+    if console.document().lineCount() > max_lines:
+        cursor = console.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Start)
+        cursor.select(QTextCursor.SelectionType.LineUnderCursor)
+        cursor.removeSelectedText()
+
+
+def run(app, append, chunks, burst):
+    """Trames par rafales de `burst`, la boucle d'événements tourne entre deux rafales"""
+    start = time.perf_counter()
+    for i in range(0, chunks, burst):
+        for _ in range(min(burst, chunks - i)):
+            append(CHUNK)
+        app.processEvents()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--chunks', type=int, default=20000)
+    parser.add_argument('--lines', type=int, default=1000)
+    parser.add_argument('--burst', type=int, default=20, help="trames reçues entre deux tours de boucle Qt")
+    args = parser.parse_args()
+
+    app = QApplication([])
+
+    legacy = QTextEdit()
+    legacy.setReadOnly(True)
+    legacy.show()
+    elapsed = run(app, lambda data: legacy_append(legacy, data, args.lines), args.chunks, args.burst)
+    print(f"QTextEdit  : {elapsed:.2f} s, {elapsed / args.chunks * 1e6:.0f} µs/trame")
+
+    console = HexConsole(max_lines=args.lines, show_ascii=True, milliseconds=True)
+    console.show()
+    start = time.perf_counter()
+    run(app, console.append_bytes, args.chunks, args.burst)
+    console.flush()  # dernières lignes en attente
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(f"HexConsole : {elapsed:.2f} s, {elapsed / args.chunks * 1e6:.0f} µs/trame "
+          f"({console.blockCount()} lignes affichées)")
+
+
+if __name__ == '__main__':
+    main()
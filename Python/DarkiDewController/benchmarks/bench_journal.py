@@ -0,0 +1,67 @@
+"""
+Taille sur disque du journal d'événements pour une nuit d'acquisition simulée.
+
+Chaque échantillon journalise la commande STATUS (TX), la réponse (RX) et
+l'échantillon décodé, comme SerialWorker.
+- jsonl hex      : un seul fichier JSONL non compressé (format d'origine)
+- hex + gzip     : segments JSONL compressés
+- binaire + gzip : trames RAW en segments binaires, le reste en JSONL compressé
+
+Usage : python benchmarks/bench_journal.py [--samples 8640]
+"""
+import logging
+import os
+import tempfile
+import time
+
+from _common import argument_parser
+
+from data_logger import DataLogger
+from journal import COMPRESSION_GZIP, COMPRESSION_NONE, RAW_BINARY, RAW_HEX, read_events
+from protocol import parse_status_payload
+
+TX = bytes([0x31])
+
+
+def journal_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+               if name.startswith(('events_', 'raw_')))
+
+
+def run(directory, samples, raw_encoding, compression):
+    logger = DataLogger(directory, raw_encoding=raw_encoding, compression=compression,
+                        journal_options={'max_segment_bytes': 2**20})
+    logger.start_new_session()
+    start = time.perf_counter()
+    for i in range(samples):
+        payload = b'%.2f#%.2f#%.2f#9.87#%d.00#3#2' % (10 + (i % 300) / 100, 80 + (i % 50) / 10, 12 + (i % 7) / 4, i % 255)
+        logger.log_raw_data(TX, direction="TX")
+        logger.log_raw_data(b'[' + payload + b']\x35', direction="RX")
+        logger.log_parsed_data(parse_status_payload(payload))
+    logger.stop_logging()
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    count = sum(1 for _ in read_events(directory, logger.session_id))
+    read = time.perf_counter() - start
+    return journal_size(directory), write, read, count
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--samples', type=int, default=8640, help="8640 = une nuit de 12 h à un STATUS toutes les 5 s")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{args.samples} échantillons")
+    print("mode            | taille (Ko) | écriture (s) | relecture (s) | événements")
+    for label, raw_encoding, compression in (("jsonl hex", RAW_HEX, COMPRESSION_NONE),
+                                             ("hex + gzip", RAW_HEX, COMPRESSION_GZIP),
+                                             ("binaire + gzip", RAW_BINARY, COMPRESSION_GZIP)):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)  # DataLogger écrit application.log dans log_dir
+            size, write, read, count = run(directory, args.samples, raw_encoding, compression)
+        print(f"{label:15} | {size / 1024:11.1f} | {write:12.2f} | {read:13.2f} | {count:10}")
+
+
+if __name__ == '__main__':
+    main()
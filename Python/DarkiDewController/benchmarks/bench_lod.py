@@ -0,0 +1,66 @@
+"""
+Temps de rendu d'un RealTimePlot dont la fenêtre affiche tout l'historique.
+
+- brut : tous les points de la fenêtre sont transmis à pyqtgraph
+- LOD  : enveloppe min/max de MinMaxPyramid, environ 2 points par pixel
+
+Le temps mesuré comprend la préparation de la courbe (redraw) et le dessin
+effectif du widget (repaint). Avec le LOD il doit rester à peu près constant
+quelle que soit la taille de l'historique.
+
+Usage : QT_QPA_PLATFORM=offscreen python benchmarks/bench_lod.py [--sizes 10000 100000 1000000]
+"""
+import sys
+import time
+
+import numpy as np
+
+from _common import argument_parser
+
+from PyQt6.QtWidgets import QApplication
+
+
+def filled_plot(app, size, lod):
+    from realtime_plots import RealTimePlot
+    plot = RealTimePlot("Bench", "", 'blue', max_points=size)
+    plot.lod_enabled = lod
+    plot.resize(1000, 400)
+    plot.show()
+    app.processEvents()
+    times = np.arange(size, dtype=float)
+    values = np.sin(times / 500.0) + np.random.default_rng(0).normal(0, 0.1, size)
+    plot.time_window = size  # toute la nuit visible
+    plot.set_data(times, values)
+    return plot, float(size)
+
+
+def time_render(app, size, lod, repeats):
+    plot, t = filled_plot(app, size, lod)
+    elapsed = []
+    for i in range(repeats):
+        plot._append(np.sin((t + i) / 500.0), t + i)
+        start = time.perf_counter()
+        plot.redraw()
+        plot.repaint()
+        elapsed.append(time.perf_counter() - start)
+    points = len(plot.curve.getData()[0])
+    plot.close()
+    return np.median(elapsed) * 1e3, points
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print("points d'historique | brut (ms/rendu, points tracés) | LOD (ms/rendu, points tracés)")
+    for size in args.sizes:
+        raw_ms, raw_points = time_render(app, size, False, max(3, args.repeats // 4))
+        lod_ms, lod_points = time_render(app, size, True, args.repeats)
+        print(f"{size:19} | {raw_ms:12.2f} ms {raw_points:9} pts | {lod_ms:11.2f} ms {lod_points:9} pts")
+
+
+if __name__ == '__main__':
+    main()
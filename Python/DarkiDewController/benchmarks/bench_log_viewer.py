@@ -0,0 +1,76 @@
+"""
+Ouverture d'un gros journal events_*.jsonl dans la visionneuse.
+
+- QTextEdit : f.read() puis setText (ancienne visionneuse)
+- LogViewerDialog : projection mmap, index des lignes en arrière-plan,
+  seules les lignes visibles sont décodées
+
+Mesure le temps avant affichage, le temps d'indexation complète et la
+mémoire résidente ajoutée.
+
+Usage : python benchmarks/bench_log_viewer.py [--mb 100]
+"""
+import json
+import os
+import tempfile
+import time
+
+from _common import argument_parser, rss_mb
+
+from PyQt6.QtWidgets import QApplication, QTextEdit
+
+from log_viewer import LogViewerDialog
+
+
+def write_journal(path, megabytes):
+    event = {'event_type': 'RAW', 'timestamp': '2026-10-18T02:00:00.000000',
+             'data': {'type': 'RAW', 'direction': 'RX', 'data_hex': '5b31322e35302338302e31305d35', 'data_length': 14}}
+    line = (json.dumps(event) + '\n').encode()
+    block = line * 1000
+    with open(path, 'wb') as f:
+        for _ in range(megabytes * 2**20 // len(block) + 1):
+            f.write(block)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--mb', type=int, default=100)
+    parser.add_argument('--legacy', action='store_true', help="mesure aussi l'ancienne visionneuse QTextEdit")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events_20261018_020000_0001.jsonl')
+        write_journal(path, args.mb)
+        print(f"journal de {os.path.getsize(path) / 2**20:.0f} Mo")
+
+        before = rss_mb()
+        start = time.perf_counter()
+        dialog = LogViewerDialog(path)
+        dialog.show()
+        app.processEvents()
+        shown = time.perf_counter() - start
+        while dialog.model.indexing:
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+        indexed = time.perf_counter() - start
+        print(f"LogViewerDialog : affichage {shown * 1e3:.0f} ms, indexation {indexed:.2f} s "
+              f"({dialog.model.rowCount()} lignes), +{rss_mb() - before:.0f} Mo")
+        dialog.close()
+
+        if args.legacy:
+            before = rss_mb()
+            start = time.perf_counter()
+            text_edit = QTextEdit()
+            text_edit.setReadOnly(True)
+            with open(path, 'r') as f:
+                text_edit.setText(f.read())
+            text_edit.show()
+            app.processEvents()
+            print(f"QTextEdit : affichage {time.perf_counter() - start:.2f} s (GUI bloquée), "
+                  f"+{rss_mb() - before:.0f} Mo")
+
+
+if __name__ == '__main__':
+    main()
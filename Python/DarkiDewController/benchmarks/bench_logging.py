@@ -0,0 +1,122 @@
+"""
+Coût du logging par trame dans SerialWorker (sans matériel).
+
+Chaque trame est un aller-retour STATUS complet dans le SerialTransport du
+worker : envoi (_send_next vers un port nul), réception de la réponse en
+blocs de --chunk octets (_received : journal brut, décodage, _handle_frame,
+journal des mesures, signaux). Configurations mesurées :
+
+- off            logging désactivé (référence)
+- INFO           log_config.configure_logging, trace série désactivée
+- DEBUG          idem, trace série activée (serial_corrected.log)
+- DEBUG direct   trace série écrite par des FileHandler synchrones dans le
+                 thread d'E/S (configuration d'avant log_config)
+
+Le surcoût par trame est l'écart avec « off ».
+
+Usage : python benchmarks/bench_logging.py [--frames 2000] [--repeat 5] [--chunk 16]
+"""
+import asyncio
+import gc
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from _common import argument_parser
+
+STATUS_REPLY = b'[12.34#85.10#15.20#9.87#127.00#3#2]\x35'
+
+
+class NullPort:
+    """Port série ouvert qui ignore les écritures"""
+    is_open = True
+
+    def write(self, data):
+        return len(data)
+
+
+def configure(mode):
+    import log_config
+    logging.disable(logging.NOTSET)
+    if mode == 'off':
+        log_config.configure_logging(logging.INFO, 'app.log', console=False)
+        logging.disable(logging.CRITICAL)
+    elif mode == 'DEBUG direct':
+        log_config.shutdown_logging()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(logging.INFO)
+        root.addHandler(logging.FileHandler('app.log'))
+        serial_handler = logging.FileHandler(log_config.SERIAL_LOG_FILE, mode='w')
+        serial_handler.setFormatter(logging.Formatter(log_config.SERIAL_FORMAT, datefmt='%H:%M:%S'))
+        logging.getLogger(log_config.SERIAL_LOGGER).addHandler(serial_handler)
+        log_config.set_serial_trace(True)
+        return serial_handler
+    else:
+        log_config.configure_logging(logging.INFO, 'app.log', console=False)
+        log_config.set_serial_trace(mode == 'DEBUG')
+    return None
+
+
+def run_frames(transport, chunks, frames):
+    for _ in range(frames):
+        transport.commands.submit("STATUS", b'\x38')
+        transport._send_next()
+        for chunk in chunks:
+            transport._received(chunk)
+
+
+def measure(mode, frames, repeat, chunks):
+    from main import SerialWorker
+    import log_config
+    serial_handler = configure(mode)
+    worker = SerialWorker()
+    transport = worker.transport
+    transport.serial_port = NullPort()
+    transport.loop = asyncio.new_event_loop()  # délais armés puis annulés, jamais exécutés
+    worker.data_logger.start_new_session()
+    run_frames(transport, chunks, 100)  # chauffe
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_frames(transport, chunks, frames)
+        times.append((time.perf_counter() - start) / frames)
+    worker.data_logger.stop_logging()
+    transport.loop.close()
+    # Le worker et son transport se référencent : libérés tant que les journaux sont ouverts
+    del worker, transport
+    gc.collect()
+    if serial_handler is not None:
+        logging.getLogger(log_config.SERIAL_LOGGER).removeHandler(serial_handler)
+        serial_handler.close()
+    log_config.set_serial_trace(False)
+    return statistics.median(times)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--chunk', type=int, default=16, help="taille des blocs reçus (octets)")
+    args = parser.parse_args()
+
+    chunks = [STATUS_REPLY[i:i + args.chunk] for i in range(0, len(STATUS_REPLY), args.chunk)]
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        results = {mode: measure(mode, args.frames, args.repeat, chunks)
+                   for mode in ('off', 'INFO', 'DEBUG', 'DEBUG direct')}
+        import log_config
+        log_config.shutdown_logging()
+
+    baseline = results['off']
+    print(f"{len(chunks)} blocs par trame, {args.frames} trames x {args.repeat}")
+    for mode, per_frame in results.items():
+        overhead = "" if mode == 'off' else f"  surcoût {(per_frame - baseline) * 1e6:7.1f} µs/trame"
+        print(f"{mode:13} {per_frame * 1e6:7.1f} µs/trame{overhead}")
+
+
+if __name__ == '__main__':
+    main()
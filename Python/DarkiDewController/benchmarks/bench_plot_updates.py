@@ -0,0 +1,68 @@
+"""
+Coût d'ajout d'un échantillon à un RealTimePlot selon la taille de l'historique.
+
+- incrémental : add_data_point (courbe limitée à la fenêtre visible, moyenne
+  mobile et statistiques mises à jour en O(1) amorti)
+- rechargement : set_data sur tout l'historique à chaque échantillon, comme le
+  faisait MultiPlotWidget.update_data
+
+Le coût incrémental doit rester stable quand l'historique grandit.
+
+Usage : QT_QPA_PLATFORM=offscreen python benchmarks/bench_plot_updates.py
+"""
+import sys
+import time
+
+import numpy as np
+
+from _common import argument_parser
+
+from PyQt6.QtWidgets import QApplication
+
+
+def filled_plot(size):
+    from realtime_plots import RealTimePlot
+    plot = RealTimePlot("Bench", "", 'blue', max_points=size)
+    times = np.arange(size, dtype=float)
+    plot.set_data(times, np.sin(times / 50.0))
+    return plot, float(size)
+
+
+def time_incremental(size, updates):
+    plot, t = filled_plot(size)
+    start = time.perf_counter()
+    for i in range(updates):
+        plot.add_data_point(np.sin((t + i) / 50.0), t + i)
+    return (time.perf_counter() - start) / updates * 1e3
+
+
+def time_reload(size, updates):
+    plot, t = filled_plot(size)
+    times = np.arange(size, dtype=float)
+    values = np.sin(times / 50.0)
+    start = time.perf_counter()
+    for _ in range(updates):
+        plot.set_data(times, values)
+    return (time.perf_counter() - start) / updates * 1e3
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--updates', type=int, default=200)
+    parser.add_argument('--reload-max', type=int, default=10000,
+                        help="ne mesure le rechargement complet que jusqu'à cette taille")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print("points d'historique | incrémental (ms/échantillon) | rechargement (ms/échantillon)")
+    for size in args.sizes:
+        incremental = time_incremental(size, args.updates)
+        line = f"{size:19} | {incremental:28.3f} |"
+        if size <= args.reload_max:
+            line += f" {time_reload(size, max(5, args.updates // 20)):29.3f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Débit de ProtocolHandler.feed en trames/s lors d'un rejeu de journal.
+
+Compare le décodeur actuel (scan par re/find, buffer à offset) à l'ancien
+_extract_frame, qui recopiait le bytearray à chaque trame extraite et
+parcourait le buffer avec une boucle Python (coût quadratique).
+
+Usage : python benchmarks/bench_protocol_throughput.py [--sizes 1000 10000 100000]
+"""
+import time
+
+from _common import argument_parser
+
+from protocol import ProtocolHandler
+
+STATUS_FRAME = b'[12.34#85.10#15.20#9.87#127.00#3#2]\x35'
+
+
+class LegacyExtractor:
+    """Reproduction de l'ancien ProtocolHandler.feed/_extract_frame (sans logs)"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer.extend(data)
+        frames = []
+        while True:
+            frame = self._extract_frame()
+            if frame is None:
+                break
+            frames.append(frame)
+        return frames
+
+    def _extract_frame(self):
+        idx = self.buffer.find(b']\x35')
+        if idx != -1:
+            frame = self.buffer[:idx + 2]
+            self.buffer = self.buffer[idx + 2:]
+            return frame
+        for i, byte in enumerate(self.buffer):
+            if byte in (0x35, 0x34):
+                frame = self.buffer[:i + 1]
+                self.buffer = self.buffer[i + 1:]
+                return frame
+        return None
+
+
+def replay(handler, data, chunk):
+    start = time.perf_counter()
+    count = 0
+    for i in range(0, len(data), chunk):
+        count += len(handler.feed(data[i:i + chunk]))
+    return count, time.perf_counter() - start
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--chunk', type=int, default=1 << 20, help="taille des blocs relus (octets)")
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help="n'exécute l'ancien extracteur que jusqu'à ce nombre de trames")
+    args = parser.parse_args()
+
+    for frames in args.sizes:
+        data = (STATUS_FRAME + b'\x35') * (frames // 2)
+        count, elapsed = replay(ProtocolHandler(), data, args.chunk)
+        line = f"{frames:8} trames : {count / elapsed:12,.0f} trames/s"
+        if frames <= args.legacy_max:
+            legacy_count, legacy_elapsed = replay(LegacyExtractor(), data, args.chunk)
+            line += f" | ancien _extract_frame {legacy_count / legacy_elapsed:10,.0f} trames/s"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
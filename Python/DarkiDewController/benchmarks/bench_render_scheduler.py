@@ -0,0 +1,78 @@
+"""
+Rafale d'échantillons (rejeu de journal, interrogation rapide) sur MultiPlotWidget.
+
+Compare le rendu immédiat de chaque graphique à chaque échantillon au rendu
+regroupé par RenderScheduler (au plus une image par période de 1/fps).
+L'onglet « Autres Mesures » étant masqué, ses graphiques ne sont pas rendus.
+
+Usage : QT_QPA_PLATFORM=offscreen python benchmarks/bench_render_scheduler.py [--burst 2000] [--fps 30]
+"""
+import sys
+import time
+
+from _common import argument_parser, make_samples
+
+from PyQt6.QtWidgets import QApplication
+
+
+def run(app, samples, fps, scheduled, spacing):
+    from realtime_plots import MultiPlotWidget
+    widget = MultiPlotWidget()
+    widget.resize(1200, 800)
+    widget.show()
+    app.processEvents()
+    widget.scheduler.set_fps(fps)
+    if not scheduled:
+        for plot in widget.plots.values():
+            plot.scheduler = None
+
+    renders = [0]
+    for plot in widget.plots.values():
+        original = plot.redraw
+
+        def counting_redraw(original=original):
+            renders[0] += 1
+            original()
+        plot.redraw = counting_redraw
+
+    widget.scheduler.reset_stats()
+    start = time.perf_counter()
+    for sample in samples:
+        widget.add_sample(sample)
+        if spacing:
+            # Arrivée étalée : on laisse tourner la boucle d'événements
+            end = time.perf_counter() + spacing
+            while time.perf_counter() < end:
+                app.processEvents()
+    # Laisser la dernière image se dessiner
+    deadline = time.perf_counter() + 2.0 / fps
+    while time.perf_counter() < deadline:
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    report = widget.scheduler.report()
+    widget.close()
+    return renders[0], elapsed, report
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--burst', type=int, default=2000, help="échantillons livrés d'un coup")
+    parser.add_argument('--stream', type=int, default=100, help="échantillons livrés toutes les 2 ms")
+    parser.add_argument('--fps', type=int, default=30)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for label, samples, spacing in (("rafale", make_samples(args.burst, period=0.1), 0.0),
+                                    ("flux 500 Hz", make_samples(args.stream, period=0.1), 0.002)):
+        immediate, immediate_s, _ = run(app, samples, args.fps, False, spacing)
+        scheduled, scheduled_s, report = run(app, samples, args.fps, True, spacing)
+        print(f"{label} ({len(samples)} échantillons, 7 graphiques dont 2 masqués)")
+        print(f"  rendu immédiat : {immediate:6} rendus en {immediate_s * 1000:8.1f} ms")
+        print(f"  planificateur  : {scheduled:6} rendus en {scheduled_s * 1000:8.1f} ms "
+              f"({report['fps']:.1f} img/s mesurées)")
+        for title, (rate, ms) in report['plots'].items():
+            print(f"      {title:24} {rate:6.1f} rendus/s  {ms:6.2f} ms/rendu")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Historique des graphiques : deques Python contre ColumnarRingBuffer.
+
+Pour chaque mise à jour on mesure l'ajout d'un point puis la récupération
+des N derniers points de chaque canal (ce que fait MainWindow.update_display
+avant de redessiner), ainsi que la mémoire allouée pendant les mises à jour.
+
+Usage : python benchmarks/bench_ring_buffer.py [--capacity 43200] [--window 1000]
+"""
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+from _common import argument_parser
+
+from protocol import STATUS_FIELDS
+from ring_buffer import ColumnarRingBuffer
+
+VALUES = (12.3, 85.1, 15.2, 9.8, 127.0, 3, 2)
+
+
+def legacy_update(state, window):
+    plot_data, timestamps = state
+    for key, value in zip(STATUS_FIELDS, VALUES):
+        plot_data[key].append(value)
+    timestamps.append(datetime.now())
+    times = list(timestamps)
+    return [list(plot_data[key])[-window:] for key in STATUS_FIELDS], times[-window:]
+
+
+def ring_update(history, window):
+    history.append(time.monotonic(), VALUES)
+    return [history.column(key, window) for key in STATUS_FIELDS], history.times(window)
+
+
+def run(update, state, window, updates):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    for _ in range(updates):
+        update(state, window)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / updates * 1e6, peak - before
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--capacity', type=int, default=43200)
+    parser.add_argument('--window', type=int, default=1000)
+    parser.add_argument('--updates', type=int, default=2000)
+    args = parser.parse_args()
+
+    # Historique déjà plein, comme en fin de nuit
+    legacy = ({key: deque(VALUES[:1] * args.capacity, maxlen=args.capacity) for key in STATUS_FIELDS},
+              deque([datetime.now()] * args.capacity, maxlen=args.capacity))
+    history = ColumnarRingBuffer(args.capacity, STATUS_FIELDS)
+    for _ in range(args.capacity):
+        history.append(time.monotonic(), VALUES)
+
+    legacy_us, legacy_peak = run(legacy_update, legacy, args.window, args.updates)
+    ring_us, ring_peak = run(ring_update, history, args.window, args.updates)
+
+    print(f"Historique de {args.capacity} points, fenêtre de {args.window} points")
+    print(f"  deques              : {legacy_us:10.1f} µs/màj, pic alloué {legacy_peak / 1024:10.1f} Ko")
+    print(f"  ColumnarRingBuffer  : {ring_us:10.1f} µs/màj, pic alloué {ring_peak / 1024:10.1f} Ko")
+    print(f"  tampon préalloué    : {history.nbytes / 2**20:10.2f} Mo")
+
+
+if __name__ == '__main__':
+    main()
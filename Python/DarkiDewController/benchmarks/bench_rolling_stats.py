@@ -0,0 +1,59 @@
+"""
+Statistiques du titre et de l'échelle Y d'un graphique, par échantillon.
+
+- recalcul : np.array de toute la fenêtre puis min/max/mean/std, comme le
+  faisait RealTimePlot.update_stats
+- RollingStats : Welford + deques monotones, O(1) amorti
+
+Usage : python benchmarks/bench_rolling_stats.py [--windows 1000 10000 43200]
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+from _common import argument_parser
+
+from rolling_stats import RollingStats
+
+
+def legacy(window, warm, values):
+    data = deque(warm, maxlen=window)
+    start = time.perf_counter()
+    for value in values:
+        data.append(value)
+        array = np.array(data)
+        stats = (np.min(array), np.max(array), np.mean(array), np.std(array), array[-1])
+    return (time.perf_counter() - start) / len(values) * 1e6, stats
+
+
+def rolling(window, warm, values):
+    stats = RollingStats(max_count=window)
+    stats.extend(range(len(warm)), warm)
+    start = time.perf_counter()
+    for t, value in enumerate(values, len(warm)):
+        stats.add(t, value)
+        result = (stats.min, stats.max, stats.mean, stats.std, stats.last)
+    return (time.perf_counter() - start) / len(values) * 1e6, result
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--windows', type=int, nargs='+', default=[1000, 10000, 43200])
+    parser.add_argument('--updates', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print("fenêtre | recalcul (µs/échantillon) | RollingStats (µs/échantillon) | écart max")
+    for window in args.windows:
+        values = (20 + rng.normal(0, 1, window + args.updates)).tolist()
+        # Fenêtre déjà pleine : seules les dernières mises à jour sont mesurées
+        warm, measured = values[:window], values[window:]
+        legacy_us, legacy_stats = legacy(window, warm, measured)
+        rolling_us, rolling_stats = rolling(window, warm, measured)
+        error = max(abs(a - b) for a, b in zip(legacy_stats, rolling_stats))
+        print(f"{window:7} | {legacy_us:25.1f} | {rolling_us:29.2f} | {error:.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Mémoire occupée par l'historique d'une session de 24 h à 1 Hz (86 400 échantillons).
+
+Compare :
+- l'ancien modèle : un dict par STATUS (7 clés + datetime), recopié dans sept
+  deques de valeurs et une deque de datetime côté MainWindow
+- le modèle actuel : une deque de StatusSample (NamedTuple, sans __dict__)
+
+Usage : python benchmarks/bench_sample_memory.py [--samples 86400]
+"""
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+
+from _common import argument_parser
+
+from protocol import STATUS_FIELDS, StatusSample
+
+
+def fake_values(i):
+    """Valeurs distinctes (pas de flottants partagés par le cache de l'interpréteur)"""
+    return (
+        10.0 + i * 1e-5, 80.0 + i * 1e-5, 12.0 + i * 1e-5,
+        7.0 + i * 1e-5, 100.0 + i * 1e-5, 3, 2
+    )
+
+
+def build_legacy(count):
+    start = datetime.now()
+    dicts = []
+    plot_data = {key: deque(maxlen=count) for key in STATUS_FIELDS}
+    timestamps = deque(maxlen=count)
+    for i in range(count):
+        values = fake_values(i)
+        data = dict(zip(STATUS_FIELDS, values))
+        data['timestamp'] = start + timedelta(seconds=i)
+        dicts.append(data)
+        for key in STATUS_FIELDS:
+            plot_data[key].append(data[key])
+        timestamps.append(datetime.now())
+    return dicts, plot_data, timestamps
+
+
+def build_samples(count):
+    t0 = time.monotonic_ns()
+    samples = deque(maxlen=count)
+    for i in range(count):
+        samples.append(StatusSample(t0 + i * 1_000_000_000, *fake_values(i)))
+    return samples
+
+
+def measure(builder, count):
+    tracemalloc.start()
+    result = builder(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--samples', type=int, default=86400)
+    args = parser.parse_args()
+
+    legacy = measure(build_legacy, args.samples)
+    compact = measure(build_samples, args.samples)
+    print(f"{args.samples} échantillons")
+    print(f"  dicts + 8 deques : {legacy / 2**20:8.2f} Mo ({legacy / args.samples:6.0f} o/échantillon)")
+    print(f"  StatusSample     : {compact / 2**20:8.2f} Mo ({compact / args.samples:6.0f} o/échantillon)")
+    print(f"  gain             : x{legacy / compact:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark du lecteur série de SerialWorker sur une boucle pty (Linux).
+
+Mesure :
+- le nombre de réveils par seconde du lecteur (add_reader de la boucle d'E/S) au repos
+- la latence entre l'écriture de l'ACK par le périphérique et l'émission de command_ack
+
+Usage : python benchmarks/bench_serial_reader.py [--idle 3] [--acks 200]
+"""
+import os
+import pty
+import statistics
+import tempfile
+import threading
+import time
+import tty
+
+from _common import argument_parser, silence_console_logging
+
+from PyQt6.QtCore import Qt
+
+
+def open_loopback():
+    """Crée une paire pty : (fd maître côté 'périphérique', chemin esclave côté appli)"""
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    return master, os.ttyname(slave), slave
+
+
+def legacy_poll_wakeups(duration):
+    """Reproduit l'ancienne boucle in_waiting + sleep(0.01) et compte ses réveils"""
+    wakeups = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        wakeups += 1
+        time.sleep(0.01)
+    return wakeups / duration
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--idle', type=float, default=3.0, help="durée de la mesure au repos (s)")
+    parser.add_argument('--acks', type=int, default=200, help="nombre de commandes acquittées")
+    args = parser.parse_args()
+
+    # SerialWorker écrit ses logs dans le répertoire courant
+    os.chdir(tempfile.mkdtemp(prefix='bench_reader_'))
+    from main import SerialWorker
+
+    master, slave_path, slave_fd = open_loopback()
+    worker = SerialWorker()
+    silence_console_logging()
+
+    # Lecteur compté, installé avant que open() ne l'enregistre par add_reader
+    wakeups = [0]
+    transport = worker.transport
+    original_readable = transport._on_readable
+
+    def counting_readable():
+        wakeups[0] += 1
+        original_readable()
+
+    transport._on_readable = counting_readable
+
+    acked = threading.Event()
+    ack_times = []
+    worker.command_ack.connect(
+        lambda cmd, ok: (ack_times.append(time.perf_counter()), acked.set()),
+        Qt.ConnectionType.DirectConnection
+    )
+
+    # Connexion sans la séquence de démarrage (HELLO différé)
+    worker.device_boot_delay = 3600
+    worker.connect(slave_path)
+
+    # 1. Réveils au repos
+    time.sleep(0.2)
+    wakeups[0] = 0
+    time.sleep(args.idle)
+    idle_rate = wakeups[0] / args.idle
+    legacy_rate = legacy_poll_wakeups(min(args.idle, 1.0))
+
+    # 2. Latence ACK : le périphérique répond 0x35 à chaque commande
+    latencies = []
+    for _ in range(args.acks):
+        # La commande précédente est terminée juste après command_ack
+        while worker.awaiting_response:
+            time.sleep(0.001)
+        acked.clear()
+        worker.send_raw(b'\x31\x33')  # DELTA 3, reçu par le « périphérique »
+        received = b''
+        while len(received) < 2:
+            received += os.read(master, 2 - len(received))
+        sent = time.perf_counter()
+        os.write(master, b'\x35')
+        if not acked.wait(2.0):
+            print("ACK perdu")
+            continue
+        latencies.append((ack_times[-1] - sent) * 1000)
+
+    worker.disconnect()
+    os.close(master)
+    os.close(slave_fd)
+
+    latencies.sort()
+    print(f"Réveils au repos      : {idle_rate:8.1f} /s (ancienne boucle : {legacy_rate:.1f} /s)")
+    print(f"Latence ACK médiane   : {statistics.median(latencies):8.3f} ms")
+    print(f"Latence ACK p99       : {latencies[int(len(latencies) * 0.99) - 1]:8.3f} ms")
+    print(f"Latence ACK max       : {latencies[-1]:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
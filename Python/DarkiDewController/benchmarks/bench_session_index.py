@@ -0,0 +1,103 @@
+"""
+Requête « humidité entre 02:00 et 03:00 » sur une semaine de sessions.
+
+- relecture : on parcourt tous les CSV de logs/ ligne par ligne
+- SessionIndex.query : catalogue SQLite, seules les sessions concernées sont
+  ouvertes et la lecture commence au repère le plus proche (CSV) ou par
+  recherche dichotomique dans le memmap (.npy)
+
+Usage : python benchmarks/bench_session_index.py [--days 7] [--period 5]
+"""
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from _common import argument_parser
+
+from protocol import STATUS_FIELDS, WALL_CLOCK_OFFSET_NS, StatusSample
+from session_index import SessionIndex, to_ns
+from session_store import ColumnarSessionWriter
+
+
+def write_sessions(directory, days, period, file_format):
+    """Une session par nuit, de 20:00 à 08:00, un échantillon toutes les `period` secondes"""
+    start = datetime(2026, 10, 5, 20, 0, 0)
+    count = int(12 * 3600 / period)
+    for day in range(days):
+        session_start = start + timedelta(days=day)
+        wall_ns = to_ns(session_start) + np.arange(count, dtype=np.int64) * int(period * 1e9)
+        values = 80 + np.sin(np.arange(count) / 500.0) * 10
+        name = f"data_{session_start.strftime('%Y%m%d_%H%M%S')}.{file_format}"
+        path = os.path.join(directory, name)
+        if file_format == 'csv':
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['timestamp'] + list(STATUS_FIELDS))
+                for t_ns, humidity in zip(wall_ns.tolist(), values.tolist()):
+                    stamp = datetime.fromtimestamp(t_ns / 1e9).isoformat()
+                    writer.writerow([stamp, 12.5, round(humidity, 2), 15.0, 9.8, 127.0, 3, 2])
+        else:
+            writer = ColumnarSessionWriter(path)
+            for t_ns, humidity in zip(wall_ns.tolist(), values.tolist()):
+                writer.append(StatusSample(t_ns - WALL_CLOCK_OFFSET_NS, 12.5, humidity, 15.0, 9.8, 127.0, 3, 2))
+            writer.close()
+    return start
+
+
+def naive_query(directory, t0, t1):
+    """Relecture complète de tous les CSV"""
+    times, values = [], []
+    column = STATUS_FIELDS.index('humidity') + 1
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.csv'):
+            continue
+        with open(os.path.join(directory, name), newline='') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                when = datetime.fromisoformat(row[0])
+                if t0 <= when <= t1:
+                    times.append(to_ns(when))
+                    values.append(float(row[column]))
+    return np.array(times), np.array(values)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--period', type=float, default=5.0)
+    args = parser.parse_args()
+
+    for file_format in ('csv', 'npy'):
+        with tempfile.TemporaryDirectory() as directory:
+            start = write_sessions(directory, args.days, args.period, file_format)
+            t0 = start + timedelta(days=args.days - 2, hours=6)   # 02:00 de l'avant-dernière nuit
+            t1 = t0 + timedelta(hours=1)
+
+            index = SessionIndex(directory)
+            begin = time.perf_counter()
+            index.refresh()
+            build = time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            times, values = index.query('humidity', t0, t1)
+            query = time.perf_counter() - begin
+            index.close()
+
+            line = (f"{file_format}: {args.days} sessions, indexation {build * 1e3:.0f} ms, "
+                    f"requête 1 h {query * 1e3:.1f} ms ({len(times)} points)")
+            if file_format == 'csv':
+                begin = time.perf_counter()
+                naive_times, naive_values = naive_query(directory, t0, t1)
+                naive = time.perf_counter() - begin
+                assert np.array_equal(naive_times, times) and np.allclose(naive_values, values)
+                line += f", relecture complète {naive * 1e3:.0f} ms"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
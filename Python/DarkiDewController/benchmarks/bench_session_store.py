@@ -0,0 +1,91 @@
+"""
+Stockage d'une session : CSV texte contre enregistrements binaires .npy.
+
+Pour N échantillons STATUS on mesure :
+- le coût d'écriture (mise en forme + écriture, comme le thread de DataLogger)
+- la taille du fichier
+- le temps de rechargement de toutes les colonnes en tableaux NumPy
+  (CSV : csv.reader + fromisoformat + float ; .npy : load_session en memmap,
+  colonnes lues en entier)
+
+Usage : python benchmarks/bench_session_store.py [--samples 1000000]
+"""
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from _common import argument_parser, make_samples
+
+from protocol import STATUS_FIELDS
+from session_store import ColumnarSessionWriter, export_csv, load_session
+
+
+def write_csv_session(path, samples):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp'] + list(STATUS_FIELDS))
+        for sample in samples:
+            row = [sample.timestamp.isoformat()]
+            row.extend(sample.values())
+            writer.writerow(row)
+
+
+def write_npy_session(path, samples):
+    writer = ColumnarSessionWriter(path)
+    for sample in samples:
+        writer.append(sample)
+    writer.close()
+
+
+def load_csv_session(path):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        rows = list(reader)
+    wall_ns = np.array([int(datetime.fromisoformat(row[0]).timestamp() * 1e9) for row in rows], dtype=np.int64)
+    columns = {name: np.array([float(row[i + 1]) for row in rows]) for i, name in enumerate(STATUS_FIELDS)}
+    return wall_ns, columns
+
+
+def load_npy_session(path):
+    records = load_session(path)
+    # Lecture effective de toutes les colonnes
+    return records['wall_ns'].sum(), {name: records[name].astype(np.float64) for name in STATUS_FIELDS}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--samples', type=int, default=1000000)
+    args = parser.parse_args()
+
+    samples = make_samples(args.samples)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'data.csv')
+        npy_path = os.path.join(directory, 'data.npy')
+        csv_write = timed(write_csv_session, csv_path, samples)
+        npy_write = timed(write_npy_session, npy_path, samples)
+        csv_load = timed(load_csv_session, csv_path)
+        npy_load = timed(load_npy_session, npy_path)
+        export = timed(export_csv, npy_path, os.path.join(directory, 'export.csv'))
+
+        print(f"{args.samples} échantillons")
+        print("format | taille (Mo) | écriture (µs/éch) | rechargement (ms)")
+        for label, path, write, load in (("CSV", csv_path, csv_write, csv_load),
+                                         (".npy", npy_path, npy_write, npy_load)):
+            print(f"{label:6} | {os.path.getsize(path) / 2**20:11.1f} | "
+                  f"{write / args.samples * 1e6:17.2f} | {load * 1e3:17.1f}")
+        print(f"export .npy -> CSV : {export:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Aller-retour STATUS sur une liaison série simulée réaliste (POSIX).
+
+Des périphériques device_simulator émettent à --baudrate, fragmentent leurs
+réponses, ajoutent de la gigue et des octets parasites ; SerialTransport les
+interroge tous en parallèle. Affiche les percentiles du temps d'aller-retour
+et le nombre de requêtes perdues (bruit non resynchronisé, timeouts).
+
+Usage : python benchmarks/bench_simulated_link.py [--devices 32] [--requests 50] [--noise 0.05]
+"""
+import asyncio
+import logging
+import time
+
+from _common import argument_parser
+
+from command_queue import CommandError
+from device_simulator import DeviceSimulator
+from transport import SerialTransport
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def poll(names, requests):
+    transports = [await SerialTransport(name).open() for name in names]
+    latencies, failures = [], 0
+
+    async def run(transport):
+        nonlocal failures
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                await transport.status()
+                latencies.append(time.perf_counter() - start)
+            except CommandError:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(transport) for transport in transports))
+    elapsed = time.perf_counter() - start
+    for transport in transports:
+        await transport.close()
+    return latencies, failures, elapsed
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--devices', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50, help="STATUS par périphérique")
+    parser.add_argument('--baudrate', type=int, default=19200)
+    parser.add_argument('--latency', type=float, default=0.005, help="délai de réponse du périphérique (s)")
+    parser.add_argument('--jitter', type=float, default=0.005)
+    parser.add_argument('--fragment', type=int, default=4)
+    parser.add_argument('--noise', type=float, default=0.05, help="probabilité d'octets parasites par réponse")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    simulator = DeviceSimulator(args.devices, latency=args.latency, jitter=args.jitter, baudrate=args.baudrate,
+                                fragment=args.fragment, noise=args.noise, seed=args.seed)
+    names = simulator.fork()
+    try:
+        latencies, failures, elapsed = asyncio.run(poll(names, args.requests))
+    finally:
+        simulator.stop()
+
+    total = args.devices * args.requests
+    print(f"{args.devices} périphériques à {args.baudrate} bauds, fragments ≤ {args.fragment} octets, "
+          f"bruit {args.noise:.0%}")
+    print(f"{total / elapsed:.0f} STATUS/s, perdues {failures}/{total}")
+    print(f"aller-retour : p50 {percentile(latencies, 0.5) * 1e3:.1f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1e3:.1f} ms, p99 {percentile(latencies, 0.99) * 1e3:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Temps de démarrage de l'application graphique (main.py).
+
+Chaque mesure est faite dans un processus neuf (imports à froid du point de
+vue de Python) : import de main, création de QApplication, construction de
+MainWindow, puis show() jusqu'au premier événement Paint de la fenêtre. Un
+passage sous `python -X importtime` donne les modules les plus coûteux.
+--eager construit aussi tous les onglets différés, pour comparaison.
+--output enregistre les médianes en JSON (avec le commit courant) afin de
+comparer les commits entre eux.
+
+Usage : python benchmarks/bench_startup.py [--runs 5] [--eager] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import argument_parser, git_commit
+
+STAGES = ('import', 'qapplication', 'window', 'first_paint', 'total')
+
+
+def child(eager):
+    """Processus de mesure : affiche les durées (ms) de chaque étape en JSON"""
+    marks = [time.perf_counter()]
+    import main
+    from PyQt6.QtCore import QEvent, QObject
+    from PyQt6.QtWidgets import QApplication
+    marks.append(time.perf_counter())
+    app = QApplication(sys.argv[:1])
+    marks.append(time.perf_counter())
+    window = main.MainWindow()
+    if eager:
+        window.ensure_all_tabs()
+    marks.append(time.perf_counter())
+
+    class PaintWatcher(QObject):
+        painted = False
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                self.painted = True
+            return False
+
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    while not watcher.painted:
+        app.processEvents()
+    marks.append(time.perf_counter())
+
+    stages = [(b - a) * 1e3 for a, b in zip(marks, marks[1:])]
+    print(json.dumps(dict(zip(STAGES, stages + [(marks[-1] - marks[0]) * 1e3]))))
+    sys.stdout.flush()
+    # Sortie immédiate : la fermeture de la fenêtre ne fait pas partie de la mesure
+    os._exit(0)
+
+
+def run_child(eager, directory, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + \
+              [os.path.abspath(__file__), '--child'] + (['--eager'] if eager else [])
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run(command, cwd=directory, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+def top_imports(stderr, count):
+    """Modules de plus grand temps cumulé (µs) d'une sortie -X importtime"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--eager', action='store_true', help="construire tous les onglets au démarrage")
+    parser.add_argument('--imports', type=int, default=12, help="nombre de modules -X importtime affichés")
+    parser.add_argument('--output', help="fichier JSON des médianes")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.eager)
+
+    with tempfile.TemporaryDirectory() as directory:  # logs/ et app.log de l'application
+        runs = [run_child(args.eager, directory)[0] for _ in range(args.runs)]
+        _, stderr = run_child(args.eager, directory, importtime=True)
+
+    medians = {stage: sorted(run[stage] for run in runs)[len(runs) // 2] for stage in STAGES}
+    print(f"onglets {'tous construits' if args.eager else 'différés'}, médiane sur {args.runs} démarrages")
+    for stage in STAGES:
+        print(f"  {stage:13}: {medians[stage]:7.1f} ms")
+    print(f"modules les plus coûteux (-X importtime, cumulé) :")
+    for cumulative, name in top_imports(stderr, args.imports):
+        print(f"  {cumulative / 1e3:7.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'commit': git_commit(), 'eager': args.eager, 'runs': args.runs,
+                       'median_ms': medians}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Requêtes STATUS sur plusieurs périphériques simulés (pseudo-terminaux, POSIX).
+
+- SerialWorker    : un worker Qt par port, chacun avec sa boucle d'E/S (un thread)
+- SerialTransport : tous les ports dans une seule boucle asyncio (add_reader)
+
+Mesure le débit, le temps CPU du processus par requête et le nombre de
+threads ajoutés par l'ouverture des ports.
+
+Usage : python benchmarks/bench_transport.py [--ports 8] [--requests 200]
+"""
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from _common import argument_parser
+
+from main import SerialWorker
+from device_simulator import DeviceSimulator
+from transport import SerialTransport
+
+
+def run_workers(names, requests):
+    before = threading.active_count()
+    workers = []
+    for name in names:
+        worker = SerialWorker()
+        worker.device_boot_delay = 3600  # pas de HELLO/STATUS automatiques
+        worker.connect(name)
+        workers.append(worker)
+    threads = threading.active_count() - before
+
+    def poll(worker):
+        for _ in range(requests):
+            worker.request_status().result(timeout=10)
+
+    start, cpu = time.perf_counter(), time.process_time()
+    pollers = [threading.Thread(target=poll, args=(worker,)) for worker in workers]
+    for thread in pollers:
+        thread.start()
+    for thread in pollers:
+        thread.join()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    for worker in workers:
+        worker.disconnect()
+    return elapsed, cpu, threads
+
+
+async def run_transports(names, requests):
+    before = threading.active_count()
+    transports = [await SerialTransport(name).open() for name in names]
+    threads = threading.active_count() - before
+
+    async def poll(transport):
+        for _ in range(requests):
+            await transport.status()
+
+    start, cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(poll(transport) for transport in transports))
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    for transport in transports:
+        await transport.close()
+    return elapsed, cpu, threads
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--ports', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="STATUS par port")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    # Périphériques dans un processus fils : leur CPU n'est pas compté
+    simulator = DeviceSimulator(args.ports)
+    names = simulator.fork()
+    total = args.ports * args.requests
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # serial_corrected.log et logs/ des workers
+        for label, run in (("SerialWorker", lambda: run_workers(names, args.requests)),
+                           ("SerialTransport", lambda: asyncio.run(run_transports(names, args.requests)))):
+            elapsed, cpu, threads = run()
+            print(f"{label:16}: {args.ports} ports, {total / elapsed:7.0f} STATUS/s, "
+                  f"CPU {cpu / total * 1e6:4.0f} µs/STATUS, +{threads} threads")
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Suite de non-régression des chemins critiques (sans matériel, Qt offscreen).
+
+Contrairement aux autres scripts de benchmarks/, qui comparent une ancienne
+et une nouvelle implémentation, cette suite chronomètre l'implémentation
+courante pour suivre son évolution d'un commit à l'autre :
+
+- decode.feed            ProtocolHandler.feed, réponses STATUS reçues par morceaux
+- decode.worker          SerialWorker : décodeur + _handle_frame de son transport pour un STATUS en vol
+- fanout.update_display  MainWindow.update_display (labels, historique, graphiques)
+- fanout.update_data[N]  MultiPlotWidget.update_data depuis un historique de N points
+- log.parsed / log.raw   DataLogger.log_parsed_data / log_raw_data, vidage compris
+- render.plot[N]         rendu d'un RealTimePlot (redraw + peinture) à N points
+- load.npy[N]            load_session d'une session .npy et lecture des colonnes
+
+Les journaux fichiers de l'application restent actifs : leur coût fait
+partie de la mesure. Chaque cas est répété --repeat fois après un tour de
+chauffe ; les temps sont donnés par opération (min, médiane, moyenne,
+écart-type). --output
+enregistre un JSON (commit, machine, cas) ; --compare A.json B.json affiche
+les rapports de médianes entre deux exécutions.
+
+Usage : python benchmarks/suite.py [--quick] [--filter decode] [--output bench-$(git rev-parse --short HEAD).json]
+        python benchmarks/suite.py --compare avant.json après.json
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from _common import argument_parser, git_commit, make_samples, silence_console_logging
+
+STATUS_REPLY = b'[12.34#85.10#15.20#9.87#127.00#3#2]\x35'
+# Tailles d'historique des cas paramétrés (--quick : les deux premières)
+SIZES = (1000, 10000, 100000)
+# Écart de médiane signalé par --compare
+REGRESSION_THRESHOLD = 1.10
+
+CASES = []
+# Ressources ouvertes par le cas en cours, libérées après sa mesure
+CLEANUPS = []
+
+
+def case(name, sizes=None):
+    """
+    Déclare un cas : la fonction prépare les données et renvoie (run, ops),
+    run() exécutant ops opérations. Avec sizes, un cas par taille N. Ce qui
+    doit être fermé après la mesure est ajouté à CLEANUPS.
+    """
+    def register(factory):
+        if sizes is None:
+            CASES.append((name, factory, None))
+        else:
+            for size in sizes:
+                CASES.append((f"{name}[{size}]", factory, size))
+        return factory
+    return register
+
+
+def filled_history(size):
+    from protocol import HISTORY_CAPACITY, STATUS_FIELDS
+    from ring_buffer import ColumnarRingBuffer
+    history = ColumnarRingBuffer(max(size, HISTORY_CAPACITY), STATUS_FIELDS)
+    for sample in make_samples(size, start_ns=0):
+        history.append(sample.t_ns / 1e9, sample.values())
+    return history
+
+
+@case('decode.feed')
+def decode_feed():
+    from protocol import ProtocolHandler
+    stream = STATUS_REPLY * 1000
+    chunks = [stream[i:i + 16] for i in range(0, len(stream), 16)]
+
+    def run():
+        handler = ProtocolHandler()
+        for chunk in chunks:
+            handler.feed(chunk)
+    return run, 1000
+
+
+@case('decode.worker')
+def decode_worker():
+    from main import SerialWorker
+    transport = SerialWorker().transport
+    chunks = [STATUS_REPLY[i:i + 16] for i in range(0, len(STATUS_REPLY), 16)]
+
+    def run():
+        for _ in range(200):
+            transport.commands.submit('STATUS', b'\x38')
+            transport.commands.start_next()
+            for chunk in chunks:
+                for frame in transport.decoder.feed(chunk):
+                    transport._handle_frame(frame)
+    return run, 200
+
+
+@case('fanout.update_display')
+def fanout_update_display():
+    from main import MainWindow
+    window = MainWindow()
+    window.ensure_all_tabs()
+    window.resize(1400, 900)
+    window.show()
+    feed = make_samples(200)
+
+    def run():
+        for sample in feed:
+            window.update_display(sample)
+    return run, len(feed)
+
+
+@case('fanout.update_data', SIZES)
+def fanout_update_data(size):
+    from realtime_plots import MultiPlotWidget
+    widget = MultiPlotWidget(size)
+    history = filled_history(size)
+
+    def run():
+        widget.update_data(history)
+    return run, 1
+
+
+def started_logger(log_dir):
+    from data_logger import DataLogger
+    data_logger = DataLogger(log_dir)
+    data_logger.start_new_session()
+    CLEANUPS.append(data_logger.stop_logging)
+    return data_logger
+
+
+@case('log.parsed')
+def log_parsed():
+    data_logger = started_logger('logs-parsed')
+    feed = make_samples(2000, start_ns=0)
+
+    def run():
+        for sample in feed:
+            data_logger.log_parsed_data(sample)
+        data_logger.flush()
+    return run, len(feed)
+
+
+@case('log.raw')
+def log_raw():
+    data_logger = started_logger('logs-raw')
+
+    def run():
+        for _ in range(2000):
+            data_logger.log_raw_data(STATUS_REPLY, direction="RX")
+        data_logger.flush()
+    return run, 2000
+
+
+@case('render.plot', SIZES)
+def render_plot(size):
+    import numpy as np
+    from realtime_plots import RealTimePlot
+    plot = RealTimePlot("Bench", "", 'blue', max_points=size)
+    plot.resize(800, 400)
+    times = np.arange(size, dtype=float)
+    plot.set_data(times, np.sin(times / 50.0))
+
+    def run():
+        plot.redraw()
+        plot.grab()
+    return run, 1
+
+
+@case('load.npy', SIZES)
+def load_npy(size):
+    from session_store import ColumnarSessionWriter, load_session
+    path = f'session_{size}.npy'
+    writer = ColumnarSessionWriter(path)
+    for sample in make_samples(size, start_ns=0):
+        writer.append(sample)
+    writer.close()
+
+    def run():
+        records = load_session(path)
+        for name in records.dtype.names:
+            records[name].sum()
+    return run, 1
+
+
+def measure(run, ops, repeat):
+    run()  # chauffe
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) / ops)
+    return {'ops': ops, 'min': min(times), 'median': statistics.median(times),
+            'mean': statistics.fmean(times), 'stddev': statistics.pstdev(times)}
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.0f} ns"
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"{before.get('commit')} -> {after.get('commit')} (médianes par opération)")
+    for name, result in after['cases'].items():
+        old = before['cases'].get(name)
+        if old is None:
+            print(f"  {name:24} {'':>10}   {format_time(result['median'])}   (nouveau)")
+            continue
+        ratio = result['median'] / old['median']
+        flag = "  régression" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"  {name:24} {format_time(old['median'])} -> {format_time(result['median'])}  x{ratio:5.2f}{flag}")
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--quick', action='store_true', help="tailles réduites, 3 répétitions")
+    parser.add_argument('--filter', default='', help="ne lance que les cas contenant ce texte")
+    parser.add_argument('--output', help="fichier JSON des résultats")
+    parser.add_argument('--compare', nargs=2, metavar=('AVANT', 'APRÈS'))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    output = os.path.abspath(args.output) if args.output else None
+    repeat = 3 if args.quick else args.repeat
+    skipped = set(SIZES[2:]) if args.quick else set()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # journaux de l'application et fichiers des cas
+        for name, factory, size in CASES:
+            if args.filter not in name or size in skipped:
+                continue
+            run, ops = factory() if size is None else factory(size)
+            silence_console_logging()
+            app.processEvents()
+            results[name] = result = measure(run, ops, repeat)
+            while CLEANUPS:
+                CLEANUPS.pop()()
+            print(f"{name:24} {format_time(result['median'])}/op  "
+                  f"(min {format_time(result['min'])}, ±{format_time(result['stddev'])})")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'commit': git_commit(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(), 'machine': platform.machine(),
+                       'repeat': repeat, 'cases': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
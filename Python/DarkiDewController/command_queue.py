@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import NamedTuple
+
+import metrics
+
+class CommandPolicy(NamedTuple):
+    """Délai d'attente de la réponse (s) et nombre de renvois après expiration"""
+    timeout: float
+    retries: int
+
+# Politique par type de commande. Un NAK n'est jamais renvoyé : le
+# périphérique a refusé la valeur. SAVE écrit l'EEPROM, il n'est pas répété.
+DEFAULT_POLICIES = {
+    'HELLO': CommandPolicy(5.0, 2),
+    'STATUS': CommandPolicy(15.0, 0),
+    'DELTA': CommandPolicy(5.0, 1),
+    'OFFSET': CommandPolicy(5.0, 1),
+    'FULL': CommandPolicy(5.0, 1),
+    'REGUL': CommandPolicy(5.0, 1),
+    'SAVE': CommandPolicy(5.0, 0),
+}
+DEFAULT_POLICY = CommandPolicy(5.0, 0)
+
+class CommandError(Exception):
+    """Échec d'une commande envoyée au périphérique"""
+
+class CommandTimeout(CommandError):
+    """Pas de réponse dans le délai, renvois épuisés"""
+
+class CommandRejected(CommandError):
+    """Le périphérique a répondu NAK (0x34)"""
+
+class PendingCommand:
+    """Commande en file ou en vol"""
+    __slots__ = ('name', 'data', 'policy', 'future', 'attempts', 'deadline', 'sent_at')
+
+    def __init__(self, name, data, policy):
+        self.name = name
+        self.data = data
+        self.policy = policy
+        self.future = Future()
+        self.attempts = 0
+        self.deadline = None
+        self.sent_at = None  # dernier envoi (time.monotonic), pour la latence
+
+class CommandQueue:
+    """
+    File des commandes du périphérique, une seule en vol à la fois (le
+    protocole n'identifie pas les réponses). submit() renvoie un Future
+    résolu par la réponse : complete() à l'ACK, fail() au NAK, expire()
+    quand le délai de la commande est dépassé et que ses renvois sont
+    épuisés. La suivante part dès que la précédente est terminée, sans
+    délai fixe entre les deux.
+
+    Les callbacks des Future s'exécutent dans le thread qui résout la
+    commande (en pratique le thread de la boucle d'E/S du port série).
+    """
+
+    def __init__(self, policies=None):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.current = None
+        self._queue = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Commandes en attente d'envoi (hors commande en vol)"""
+        return len(self._queue)
+
+    def policy(self, name):
+        return self.policies.get(name, DEFAULT_POLICY)
+
+    def set_timeout(self, name, timeout):
+        """Change le délai d'attente d'un type de commande"""
+        self.policies[name] = self.policy(name)._replace(timeout=timeout)
+
+    def submit(self, name, data, coalesce=False):
+        """
+        Ajoute une commande en fin de file et renvoie son Future.
+        coalesce : si une commande identique attend déjà son envoi, son
+        Future est renvoyé au lieu d'en ajouter une seconde (requêtes STATUS
+        périodiques sur un périphérique lent).
+        """
+        with self._lock:
+            if coalesce:
+                for pending in self._queue:
+                    if pending.name == name and pending.data == data:
+                        return pending.future
+            pending = PendingCommand(name, data, self.policy(name))
+            self._queue.append(pending)
+            return pending.future
+
+    def start_next(self, now=None):
+        """Prend la prochaine commande à envoyer si aucune n'est en vol, sinon None"""
+        with self._lock:
+            if self.current is not None:
+                return None
+            while self._queue:
+                pending = self._queue.popleft()
+                if pending.attempts or pending.future.set_running_or_notify_cancel():
+                    break
+            else:
+                return None
+            pending.attempts += 1
+            pending.sent_at = time.monotonic() if now is None else now
+            pending.deadline = pending.sent_at + pending.policy.timeout
+            self.current = pending
+            return pending
+
+    def _finish(self):
+        with self._lock:
+            pending, self.current = self.current, None
+        return pending
+
+    def complete(self, result=True):
+        """Réponse attendue reçue : résout la commande en vol"""
+        pending = self._finish()
+        if pending is not None:
+            metrics.command_latency(pending.name).observe(time.monotonic() - pending.sent_at)
+            pending.future.set_result(result)
+        return pending
+
+    def fail(self, error):
+        """Échec définitif de la commande en vol"""
+        pending = self._finish()
+        if pending is not None:
+            metrics.COMMAND_FAILURES.inc()
+            pending.future.set_exception(error)
+        return pending
+
+    def time_left(self, now=None):
+        """Secondes avant l'expiration de la commande en vol, ou None"""
+        current = self.current
+        if current is None:
+            return None
+        return max(0.0, current.deadline - (time.monotonic() if now is None else now))
+
+    def expire(self, now=None):
+        """
+        Traite l'expiration de la commande en vol. Renvoie (commande, renvoi) :
+        renvoi vrai si elle est remise en tête de file, faux si elle a échoué
+        (CommandTimeout) ; (None, False) si rien n'a expiré.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            pending = self.current
+            if pending is None or now < pending.deadline:
+                return None, False
+            self.current = None
+            retry = pending.attempts <= pending.policy.retries
+            if retry:
+                self._queue.appendleft(pending)
+        metrics.COMMAND_TIMEOUTS.inc()
+        if not retry:
+            metrics.COMMAND_FAILURES.inc()
+            pending.future.set_exception(CommandTimeout(f"Timeout {pending.name} après {pending.attempts} envoi(s)"))
+        return pending, retry
+
+    def cancel_all(self, error):
+        """Fait échouer la commande en vol et toutes celles en attente (déconnexion)"""
+        with self._lock:
+            pending = ([self.current] if self.current is not None else []) + list(self._queue)
+            self.current = None
+            self._queue.clear()
+        for command in pending:
+            if not command.future.done():
+                command.future.set_exception(error)
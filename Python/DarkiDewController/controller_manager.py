@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import threading
+from pathlib import Path
+
+from command_queue import CommandError
+from data_logger import DataLogger
+from protocol import HISTORY_CAPACITY, STATUS_FIELDS
+from status_scheduler import StatusScheduler
+from transport import EventLoopThread, SerialTransport
+
+# Période de base des requêtes STATUS (adaptée par StatusScheduler)
+POLL_INTERVAL = 5.0
+# Attente du démarrage du périphérique après l'ouverture du port
+BOOT_DELAY = 10.0
+
+# États d'un appareil
+STATE_STOPPED = 'arrêté'
+STATE_BOOTING = 'démarrage'
+STATE_RUNNING = 'actif'
+STATE_ERROR = 'erreur'
+
+logger = logging.getLogger(__name__)
+
+class DeviceSession:
+    """
+    Un anneau chauffant sur un port série : transport asyncio, journal
+    (logs/<nom>/) et historique propres. run() ouvre le port, attend le
+    démarrage, envoie HELLO, exécute on_ready(transport) (consignes par
+    exemple) puis interroge STATUS jusqu'à l'annulation, à la période
+    choisie par un StatusScheduler (fixe si adaptive=False).
+    L'historique est écrit dans le thread de la boucle d'E/S ; les lectures
+    depuis un autre thread passent par snapshot(), sous verrou. Avec
+    history_capacity=0 aucun historique n'est gardé en mémoire (numpy n'est
+    alors pas chargé).
+    """
+
+    def __init__(self, name, port, baudrate=19200, log_dir="logs", history_capacity=HISTORY_CAPACITY,
+                 poll_interval=POLL_INTERVAL, boot_delay=BOOT_DELAY, on_sample=None, on_ready=None,
+                 adaptive=True, **logger_options):
+        self.name = name
+        self.port = port
+        self.scheduler = StatusScheduler(poll_interval, adaptive)
+        self.boot_delay = boot_delay
+        self.on_sample = on_sample  # appelé (nom, StatusSample) dans le thread d'E/S
+        self.on_ready = on_ready    # coroutine on_ready(transport) après HELLO
+        self.state = STATE_STOPPED
+        self.error = None
+        self.failures = 0
+        self.last_sample = None
+        self.history = None
+        if history_capacity:
+            from ring_buffer import ColumnarRingBuffer
+            self.history = ColumnarRingBuffer(history_capacity, STATUS_FIELDS)
+        self.lock = threading.Lock()
+        self.data_logger = DataLogger(log_dir, **logger_options)
+        self.transport = SerialTransport(port, baudrate, self.data_logger, on_sample=self._sample_received)
+        self._task = None
+
+    def _sample_received(self, sample):
+        with self.lock:
+            if self.history is not None:
+                self.history.append(sample.t_ns / 1e9, sample.values())
+            self.last_sample = sample
+        if self.on_sample is not None:
+            self.on_sample(self.name, sample)
+
+    def snapshot(self, channel=None, n=None):
+        """Copie des n derniers points : (temps, valeurs d'une colonne) ou tableau complet"""
+        if self.history is None:
+            raise RuntimeError(f"{self.name}: aucun historique (history_capacity=0)")
+        with self.lock:
+            if channel is None:
+                return self.history.last(n).copy()
+            return self.history.times(n).copy(), self.history.column(channel, n).copy()
+
+    async def start(self):
+        """Lance run() dans la boucle courante"""
+        self._task = asyncio.get_running_loop().create_task(self.run(), name=f"device-{self.name}")
+
+    async def stop(self):
+        """Annule run() et attend la fermeture du port et du journal"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.wait([self._task])
+
+    async def run(self):
+        """Boucle de vie de l'appareil (jusqu'à annulation)"""
+        loop = asyncio.get_running_loop()
+        try:
+            await self.transport.open()
+            self.data_logger.start_new_session()
+            self.state = STATE_BOOTING
+            await asyncio.sleep(self.boot_delay)
+            try:
+                await self.transport.hello()
+            except CommandError as e:
+                logger.warning(f"{self.name}: HELLO sans réponse ({e})")
+            if self.on_ready is not None:
+                await self.on_ready(self.transport)
+            self.state = STATE_RUNNING
+
+            self.scheduler.reset()
+            while True:
+                sent = loop.time()
+                try:
+                    sample = await self.transport.status()
+                    self.failures = 0
+                    delay = self.scheduler.on_sample(sample, loop.time() - sent)
+                except CommandError as e:
+                    self.failures += 1
+                    logger.warning(f"{self.name}: STATUS en échec ({e})")
+                    delay = self.scheduler.on_failure()
+                # Délai compté depuis l'envoi, jamais avant la réponse
+                await asyncio.sleep(max(0.0, sent + delay - loop.time()))
+        except Exception as e:
+            self.state = STATE_ERROR
+            self.error = str(e)
+            logger.error(f"{self.name}: arrêt sur erreur: {e}")
+        finally:
+            await self.transport.close()
+            self.data_logger.stop_logging()
+            if self.state != STATE_ERROR:
+                self.state = STATE_STOPPED
+
+class ControllerManager:
+    """
+    Plusieurs anneaux chauffants dans un même processus : chaque appareil est
+    une DeviceSession et toutes leurs E/S sont multiplexées dans une seule
+    boucle asyncio (EventLoopThread), sans thread de lecture par port.
+    Les méthodes publiques peuvent être appelées depuis n'importe quel thread.
+    """
+
+    def __init__(self, log_root="logs", history_capacity=HISTORY_CAPACITY, io=None):
+        self.log_root = Path(log_root)
+        self.history_capacity = history_capacity
+        self.io = io or EventLoopThread("ControllerIO")
+        self.devices = {}
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """callback(nom, StatusSample), appelé dans le thread d'E/S à chaque échantillon"""
+        self._listeners.append(callback)
+
+    def _notify(self, name, sample):
+        for callback in self._listeners:
+            try:
+                callback(name, sample)
+            except Exception as e:
+                logger.error(f"Erreur notification {name}: {e}")
+
+    def add_device(self, name, port, baudrate=19200, **options):
+        """Ajoute un appareil et démarre sa session ; options : voir DeviceSession"""
+        if name in self.devices:
+            raise ValueError(f"Appareil déjà présent: {name}")
+        log_dir = self.log_root / name
+        log_dir.mkdir(parents=True, exist_ok=True)
+        options.setdefault('history_capacity', self.history_capacity)
+        device = DeviceSession(name, port, baudrate, log_dir, on_sample=self._notify, **options)
+        self.devices[name] = device
+        self.io.submit(device.start()).result()
+        logger.info(f"Appareil {name} ajouté sur {port}")
+        return device
+
+    def remove_device(self, name, timeout=5.0):
+        """Arrête la session d'un appareil et le retire"""
+        device = self.devices.pop(name)
+        self.io.submit(device.stop()).result(timeout)
+        logger.info(f"Appareil {name} retiré")
+
+    def submit(self, name, command):
+        """
+        Exécute command(transport) dans la boucle d'E/S, par exemple
+        manager.submit('guide', lambda t: t.set_delta(3)) ; renvoie un
+        concurrent.futures.Future.
+        """
+        transport = self.devices[name].transport
+        async def run():
+            return await command(transport)
+        return self.io.submit(run())
+
+    def shutdown(self):
+        """Arrête tous les appareils puis la boucle d'E/S"""
+        for name in list(self.devices):
+            self.remove_device(name)
+        self.io.stop()
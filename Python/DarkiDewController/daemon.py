@@ -0,0 +1,157 @@
+"""
+darkidew-daemon : pilotage sans interface graphique (aucun import Qt).
+
+Se connecte à un ou plusieurs anneaux, applique les consignes demandées
+après HELLO, interroge STATUS périodiquement et journalise comme
+l'application graphique (CSV ou .npy, journal d'événements).
+
+Usage : python daemon.py --port /dev/ttyUSB0 [--port guide=/dev/ttyUSB1]
+                         [--interval 5] [--delta 3] [--offset 2] [--save]
+                         [--metrics-port 9105] [--metrics-json metrics.json]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+from command_queue import CommandError
+from controller_manager import BOOT_DELAY, POLL_INTERVAL, DeviceSession
+from data_logger import STORAGE_CSV, STORAGE_NPY
+from journal import RAW_BINARY, RAW_HEX
+from log_config import configure_logging
+import metrics
+
+logger = logging.getLogger('darkidew-daemon')
+
+def parse_port(spec):
+    """'[nom=]port' -> (nom, port) ; le nom par défaut est celui du port"""
+    name, _, port = spec.rpartition('=')
+    return name or Path(port).name, port
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='darkidew-daemon', description=__doc__.split('\n\n')[1].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', action='append', required=True, type=parse_port, metavar='[NOM=]PORT',
+                        help="port série d'un anneau (option répétable)")
+    parser.add_argument('--baudrate', type=int, default=19200)
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help="période STATUS de base (s), adaptée selon la marge de rosée et la PWM")
+    parser.add_argument('--fixed-interval', action='store_true', help="période STATUS fixe, sans adaptation")
+    parser.add_argument('--boot-delay', type=float, default=BOOT_DELAY,
+                        help="attente du démarrage du périphérique (s)")
+    parser.add_argument('--log-dir', default='logs',
+                        help="répertoire des journaux (un sous-répertoire par anneau s'il y en a plusieurs)")
+    parser.add_argument('--storage', choices=(STORAGE_CSV, STORAGE_NPY), default=STORAGE_CSV)
+    parser.add_argument('--raw-binary', action='store_true', help="trames brutes en segments binaires")
+    parser.add_argument('--count', type=int, default=0, help="s'arrêter après N échantillons par anneau")
+    parser.add_argument('--quiet', action='store_true', help="ne pas afficher les échantillons")
+    parser.add_argument('--verbose', action='store_true')
+
+    setpoints = parser.add_argument_group("consignes appliquées après HELLO")
+    setpoints.add_argument('--delta', type=int, choices=range(10), metavar='0-9')
+    setpoints.add_argument('--offset', type=int, choices=range(10), metavar='0-9')
+    setpoints.add_argument('--mode', choices=('regul', 'maxi'))
+    setpoints.add_argument('--power', type=int, default=100, help="puissance en mode maxi (0-100 %%)")
+    setpoints.add_argument('--save', action='store_true', help="enregistrer les consignes en EEPROM")
+
+    exports = parser.add_argument_group("métriques de la chaîne série")
+    exports.add_argument('--metrics-port', type=int, help="servir /metrics (format Prometheus) sur ce port")
+    exports.add_argument('--metrics-host', default='127.0.0.1', help="adresse d'écoute de /metrics")
+    exports.add_argument('--metrics-json', help="écrire périodiquement un instantané JSON dans ce fichier")
+    exports.add_argument('--metrics-interval', type=float, default=10.0, help="période de l'instantané JSON (s)")
+    return parser
+
+def make_setpoints(args):
+    """Coroutine on_ready appliquant les consignes de la ligne de commande"""
+    commands = []
+    if args.delta is not None:
+        commands.append(("DELTA", lambda t: t.set_delta(args.delta)))
+    if args.offset is not None:
+        commands.append(("OFFSET", lambda t: t.set_offset(args.offset)))
+    if args.mode is not None:
+        commands.append(("MODE", lambda t: t.set_mode(args.mode == 'maxi', args.power)))
+    if args.save:
+        commands.append(("SAVE", lambda t: t.save()))
+    if not commands:
+        return None
+
+    async def apply(transport):
+        # Toutes les commandes sont mises en file d'un coup : chacune part dès l'ACK de la précédente
+        results = await asyncio.gather(*(send(transport) for _, send in commands), return_exceptions=True)
+        for (name, _), result in zip(commands, results):
+            if isinstance(result, CommandError):
+                logger.error(f"{transport.port_name}: {name} en échec ({result})")
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                logger.info(f"{transport.port_name}: {name} appliqué")
+    return apply
+
+async def run(args):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows : Ctrl+C lève KeyboardInterrupt
+
+    counts = {}
+
+    def on_sample(name, sample):
+        if not args.quiet:
+            print(f"{sample.timestamp:%H:%M:%S} {name}: T={sample.temperature:.1f}°C H={sample.humidity:.1f}% "
+                  f"tube={sample.tube_temperature:.1f}°C rosée={sample.dew_point:.1f}°C pwm={sample.pwm:.0f}",
+                  flush=True)
+        counts[name] = counts.get(name, 0) + 1
+        if args.count and len(counts) == len(devices) and min(counts.values()) >= args.count:
+            stop.set()
+
+    log_root = Path(args.log_dir)
+    on_ready = make_setpoints(args)
+    devices = []
+    for name, port in args.port:
+        log_dir = log_root / name if len(args.port) > 1 else log_root
+        log_dir.mkdir(parents=True, exist_ok=True)
+        devices.append(DeviceSession(name, port, args.baudrate, log_dir, history_capacity=0,
+                                     poll_interval=args.interval, adaptive=not args.fixed_interval,
+                                     boot_delay=args.boot_delay,
+                                     on_sample=on_sample, on_ready=on_ready, storage=args.storage,
+                                     raw_encoding=RAW_BINARY if args.raw_binary else RAW_HEX))
+    for device in devices:
+        await device.start()
+
+    # Arrêt sur signal, sur --count, ou quand plus aucun anneau ne tourne
+    waiters = [loop.create_task(stop.wait())] + [device._task for device in devices]
+    while not stop.is_set() and any(not device._task.done() for device in devices):
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        waiters = [task for task in waiters if not task.done()]
+
+    for device in devices:
+        await device.stop()
+    failed = [device.name for device in devices if device.error]
+    for name in failed:
+        logger.error(f"{name}: {next(d.error for d in devices if d.name == name)}")
+    return 1 if failed else 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(logging.DEBUG if args.verbose else logging.INFO, log_file=None, stream=sys.stderr)
+    exporters = []
+    if args.metrics_port is not None:
+        exporters.append(metrics.PrometheusServer(metrics.REGISTRY, args.metrics_port, args.metrics_host).start())
+    if args.metrics_json:
+        exporters.append(metrics.JsonSnapshotWriter(metrics.REGISTRY, args.metrics_json,
+                                                    args.metrics_interval).start())
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+
+if __name__ == '__main__':
+    sys.exit(main())
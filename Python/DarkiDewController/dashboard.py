@@ -0,0 +1,183 @@
+import time
+
+import serial.tools.list_ports
+import pyqtgraph as pg
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+
+from controller_manager import ControllerManager
+
+# Colonnes du tableau : (titre, champ du StatusSample, format)
+TABLE_FIELDS = (
+    ("Temp.", 'temperature', "{:.1f} °C"),
+    ("Humidité", 'humidity', "{:.1f} %"),
+    ("Tube", 'tube_temperature', "{:.1f} °C"),
+    ("Rosée", 'dew_point', "{:.1f} °C"),
+    ("PWM", 'pwm', "{:.0f}"),
+)
+# Mesures proposées pour le graphique combiné
+PLOT_CHANNELS = (
+    ("Température", 'temperature'),
+    ("Humidité", 'humidity'),
+    ("Température tube", 'tube_temperature'),
+    ("Point de rosée", 'dew_point'),
+    ("Puissance PWM", 'pwm'),
+)
+# Rafraîchissement du tableau et du graphique combiné
+REFRESH_MS = 1000
+CURVE_COLORS = ('red', 'blue', 'green', 'orange', 'purple', 'cyan', 'magenta', 'yellow')
+
+class ControllerDashboard(QWidget):
+    """
+    Tableau de bord multi-appareils : une ligne par anneau (état et dernières
+    mesures) et un graphique superposant une mesure de tous les appareils.
+    Les échantillons arrivent du thread d'E/S du ControllerManager par un
+    signal ; le graphique relit l'historique des appareils une fois par
+    seconde.
+    """
+    sample_received = pyqtSignal(str, object)
+
+    def __init__(self, manager=None, parent=None):
+        super().__init__(parent)
+        self.manager = manager or ControllerManager()
+        self.manager.add_listener(self.sample_received.emit)
+        self.sample_received.connect(self.update_row)
+        self.rows = {}
+        self.curves = {}
+
+        layout = QVBoxLayout(self)
+
+        # Ajout / retrait d'appareils
+        add_group = QGroupBox("Appareils")
+        add_layout = QHBoxLayout(add_group)
+        add_layout.addWidget(QLabel("Nom:"))
+        self.name_edit = QLineEdit()
+        self.name_edit.setPlaceholderText("lunette, guide, chercheur...")
+        add_layout.addWidget(self.name_edit)
+        add_layout.addWidget(QLabel("Port:"))
+        self.port_combo = QComboBox()
+        self.port_combo.setEditable(True)
+        add_layout.addWidget(self.port_combo)
+        refresh_btn = QPushButton("Rafraîchir")
+        refresh_btn.clicked.connect(self.refresh_ports)
+        add_layout.addWidget(refresh_btn)
+        add_btn = QPushButton("Ajouter")
+        add_btn.clicked.connect(self.add_device)
+        add_layout.addWidget(add_btn)
+        remove_btn = QPushButton("Retirer")
+        remove_btn.clicked.connect(self.remove_selected)
+        add_layout.addWidget(remove_btn)
+        layout.addWidget(add_group)
+
+        # Tableau des appareils
+        headers = ["Appareil", "Port", "État"] + [title for title, _, _ in TABLE_FIELDS] + ["Dernière mesure"]
+        self.table = QTableWidget(0, len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        # Graphique combiné
+        channel_layout = QHBoxLayout()
+        channel_layout.addWidget(QLabel("Mesure:"))
+        self.channel_combo = QComboBox()
+        for label, channel in PLOT_CHANNELS:
+            self.channel_combo.addItem(label, channel)
+        self.channel_combo.currentIndexChanged.connect(self.refresh_plot)
+        channel_layout.addWidget(self.channel_combo)
+        channel_layout.addStretch()
+        layout.addLayout(channel_layout)
+
+        self.plot = pg.PlotWidget()
+        self.plot.setBackground('w')
+        self.plot.showGrid(x=True, y=True, alpha=0.3)
+        self.plot.addLegend()
+        self.plot.setLabel('bottom', 'Temps (s)')
+        layout.addWidget(self.plot)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(REFRESH_MS)
+        self.refresh_ports()
+
+    def refresh_ports(self):
+        self.port_combo.clear()
+        for port in serial.tools.list_ports.comports():
+            self.port_combo.addItem(f"{port.device} - {port.description}", port.device)
+
+    def add_device(self):
+        name = self.name_edit.text().strip()
+        # Port de la liste, ou saisi à la main
+        text = self.port_combo.currentText().strip()
+        index = self.port_combo.findText(text)
+        port = self.port_combo.itemData(index) if index >= 0 else text
+        if not name or not port:
+            QMessageBox.warning(self, "Appareil", "Indiquer un nom et un port")
+            return
+        try:
+            self.manager.add_device(name, port)
+        except Exception as e:
+            QMessageBox.warning(self, "Appareil", f"Impossible d'ajouter {name}: {e}")
+            return
+        self._add_row(name, port)
+        self.name_edit.clear()
+
+    def _add_row(self, name, port):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, 0, QTableWidgetItem(name))
+        self.table.setItem(row, 1, QTableWidgetItem(port))
+        for column in range(2, self.table.columnCount()):
+            self.table.setItem(row, column, QTableWidgetItem("--"))
+        self.rows[name] = row
+        color = CURVE_COLORS[len(self.curves) % len(CURVE_COLORS)]
+        self.curves[name] = self.plot.plot(name=name, pen=pg.mkPen(color=color, width=2))
+        self.curves[name].setDownsampling(auto=True, method='peak')
+        self.curves[name].setClipToView(True)
+
+    def remove_selected(self):
+        selected = self.table.selectionModel().selectedRows()
+        if not selected:
+            return
+        name = self.table.item(selected[0].row(), 0).text()
+        self.manager.remove_device(name)
+        self.table.removeRow(self.rows.pop(name))
+        self.rows = {self.table.item(row, 0).text(): row for row in range(self.table.rowCount())}
+        curve = self.curves.pop(name)
+        self.plot.removeItem(curve)
+        self.plot.plotItem.legend.removeItem(name)
+
+    def update_row(self, name, sample):
+        """Dernières mesures d'un appareil (thread GUI)"""
+        row = self.rows.get(name)
+        if row is None:
+            return
+        for column, (_, field, fmt) in enumerate(TABLE_FIELDS, start=3):
+            self.table.item(row, column).setText(fmt.format(getattr(sample, field)))
+        self.table.item(row, len(TABLE_FIELDS) + 3).setText(sample.timestamp.strftime('%H:%M:%S'))
+
+    def refresh(self):
+        for name, row in self.rows.items():
+            device = self.manager.devices.get(name)
+            if device is not None:
+                state = device.state if not device.failures else f"{device.state} ({device.failures} échecs)"
+                self.table.item(row, 2).setText(state)
+        self.refresh_plot()
+
+    def refresh_plot(self):
+        if not self.isVisible():
+            return
+        channel = self.channel_combo.currentData()
+        now = time.monotonic()  # temps de l'historique : horloge monotone en s
+        for name, curve in self.curves.items():
+            device = self.manager.devices.get(name)
+            if device is None:
+                continue
+            times, values = device.snapshot(channel)
+            curve.setData(times - now, values)
+
+    def shutdown(self):
+        self.refresh_timer.stop()
+        self.manager.shutdown()
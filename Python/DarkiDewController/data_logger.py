@@ -1,19 +1,76 @@
+import atexit
+from collections import deque
 import csv
+import io
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 import os
 from pathlib import Path
 
+import metrics
+from protocol import STATUS_FIELDS
+from journal import EventJournal, DEFAULT_COMPRESSION, RAW_BINARY, RAW_DIRECTIONS, RAW_HEX
+
+# Écriture différée : vidage dès FLUSH_BYTES en attente ou toutes les FLUSH_INTERVAL secondes
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 2.0
+QUEUE_SIZE = 10000
+# Nombre d'enregistrements en attente qui réveille le thread d'écriture avant le délai
+WAKE_RECORDS = 512
+# Attente maximale quand la file est pleine avant d'abandonner l'enregistrement
+PUT_TIMEOUT = 1.0
+
+# Durabilité des écritures
+DURABILITY_IMMEDIATE = 'immediate'  # chaque enregistrement est écrit et vidé aussitôt
+DURABILITY_BATCH = 'batch'          # vidage par lots (taille ou délai)
+DURABILITY_FSYNC = 'fsync'          # vidage par lots suivi d'un fsync
+
+# Stockage des échantillons STATUS
+STORAGE_CSV = 'csv'  # data_<session>.csv, texte
+STORAGE_NPY = 'npy'  # data_<session>.npy, enregistrements binaires (voir session_store)
+
+# Marqueurs de la file d'écriture
+_FLUSH = object()
+_STOP = object()
+
 class DataLogger:
-    """Système de journalisation des données"""
+    """
+    Système de journalisation des données.
+    Les appels de journalisation ne font que déposer l'enregistrement dans une
+    file bornée (deque, sans verrou par enregistrement) ; un thread d'écriture
+    réveillé par lots le formate, l'accumule en mémoire et
+    l'écrit par lots (FLUSH_BYTES ou FLUSH_INTERVAL), ainsi qu'à l'arrêt de la
+    session ou à la sortie du programme. Si la file reste pleine plus de
+    PUT_TIMEOUT, l'enregistrement est abandonné et compté dans `dropped` plutôt
+    que de bloquer la lecture série indéfiniment.
+    """
     
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", storage=STORAGE_CSV, durability=DURABILITY_BATCH,
+                 flush_bytes=FLUSH_BYTES, flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE,
+                 raw_encoding=RAW_HEX, compression=DEFAULT_COMPRESSION, journal_options=None):
         self.log_dir = Path(log_dir)
         self.session_id = None
         self.csv_writer = None
         self.csv_file = None
-        self.json_file = None
+        self.journal = None
+        self.session_writer = None
+        self.storage = storage
+        self.raw_encoding = raw_encoding
+        self.compression = compression
+        self.journal_options = journal_options or {}  # rotation et rétention (voir EventJournal)
+        self.durability = durability
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._records = None
+        self._wake = threading.Event()
+        self._not_full = threading.Condition()
+        self._writer_thread = None
+        self._index = None
         self.setup_logging()
         
     def setup_logging(self):
@@ -21,15 +78,7 @@ class DataLogger:
         # Créer le répertoire de logs s'il n'existe pas
         self.log_dir.mkdir(exist_ok=True)
         
-        # Configurer le logging Python
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_dir / 'application.log'),
-                logging.StreamHandler()
-            ]
-        )
+        # Handlers installés une seule fois par l'application (log_config.configure_logging)
         self.logger = logging.getLogger(__name__)
     
     def start_new_session(self):
@@ -38,21 +87,35 @@ class DataLogger:
         
         # Créer les fichiers de log
         try:
-            # Fichier CSV pour les données structurées
-            csv_path = self.log_dir / f"data_{self.session_id}.csv"
-            self.csv_file = open(csv_path, 'w', newline='')
-            self.csv_writer = csv.writer(self.csv_file)
+            # Les lignes CSV et JSON sont accumulées en mémoire par le thread d'écriture
+            self._csv_pending = io.StringIO()
+            self._json_pending = io.StringIO()
             
-            # En-tête CSV
-            header = [
-                'timestamp', 'temperature', 'humidity', 'tube_temperature',
-                'dew_point', 'pwm', 'delta_temp', 'dew_offset'
-            ]
-            self.csv_writer.writerow(header)
+            if self.storage == STORAGE_NPY:
+                # Enregistrements binaires en colonnes, lisibles par numpy.memmap
+                # (import différé : numpy n'est chargé que pour ce format)
+                from session_store import ColumnarSessionWriter
+                self.session_writer = ColumnarSessionWriter(self.log_dir / f"data_{self.session_id}.npy")
+            else:
+                # Fichier CSV pour les données structurées
+                csv_path = self.log_dir / f"data_{self.session_id}.csv"
+                self.csv_file = open(csv_path, 'w', newline='')
+                self.csv_writer = csv.writer(self._csv_pending)
+                
+                # En-tête CSV
+                header = ['timestamp'] + list(STATUS_FIELDS)
+                self.csv_writer.writerow(header)
             
-            # Fichier JSON pour les données brutes et événements
-            json_path = self.log_dir / f"events_{self.session_id}.jsonl"
-            self.json_file = open(json_path, 'w')
+            # Journal segmenté pour les données brutes et événements
+            self.journal = EventJournal(self.log_dir, self.session_id, self.raw_encoding,
+                                        self.compression, **self.journal_options)
+            
+            self._records = deque()
+            self._wake.clear()
+            self._last_flush = time.monotonic()
+            self._writer_thread = threading.Thread(target=self._writer_loop, name="DataLoggerWriter", daemon=True)
+            self._writer_thread.start()
+            atexit.register(self.stop_logging)
             
             self.logger.info(f"Nouvelle session démarrée: {self.session_id}")
             return True
@@ -61,44 +124,24 @@ class DataLogger:
             self.logger.error(f"Erreur démarrage session: {e}")
             return False
     
-    def log_parsed_data(self, data):
-        """Journalise les données parsées"""
-        if not self.csv_writer:
+    def log_parsed_data(self, sample):
+        """Journalise un échantillon STATUS (StatusSample)"""
+        if not (self.csv_writer or self.session_writer):
             return
         
-        try:
-            row = [
-                data.get('timestamp', datetime.now()).isoformat(),
-                data.get('temperature', ''),
-                data.get('humidity', ''),
-                data.get('tube_temperature', ''),
-                data.get('dew_point', ''),
-                data.get('pwm', ''),
-                data.get('delta_temp', ''),
-                data.get('dew_offset', '')
-            ]
-            self.csv_writer.writerow(row)
-            self.csv_file.flush()
-            
-            # Également log en JSON
-            self._log_json('DATA', data)
-            
-        except Exception as e:
-            self.logger.error(f"Erreur journalisation données: {e}")
+        # Mis en forme par le thread d'écriture (CSV puis JSON)
+        self._enqueue(('DATA', sample))
     
     def log_raw_data(self, data, direction="RX"):
-        """Journalise les données brutes"""
-        try:
-            event = {
-                'type': 'RAW',
-                'direction': direction,
-                'timestamp': datetime.now().isoformat(),
-                'data_hex': data.hex() if isinstance(data, bytes) else str(data),
-                'data_length': len(data)
-            }
-            self._log_json('RAW', event)
-        except Exception as e:
-            self.logger.error(f"Erreur journalisation raw: {e}")
+        """Journalise les données brutes (événement mis en forme par le thread d'écriture)"""
+        if direction not in RAW_DIRECTIONS:
+            raise ValueError(f"Sens de trame invalide: {direction}")
+        if not self.journal:
+            return
+        
+        if not isinstance(data, bytes):
+            data = bytes(data) if isinstance(data, (bytearray, memoryview)) else str(data)
+        self._enqueue(('RAW', direction, time.time_ns(), data))
     
     def log_event(self, event_type, message):
         """Journalise un événement"""
@@ -115,23 +158,156 @@ class DataLogger:
     
     def _log_json(self, event_type, data):
         """Log un événement au format JSONL"""
-        if not self.json_file:
+        if not self.journal:
             return
         
-        try:
-            log_entry = {
-                'event_type': event_type,
-                'timestamp': datetime.now().isoformat(),
-                'data': data
+        self._enqueue(('JSON', event_type, datetime.now(), data))
+    
+    def _enqueue(self, record):
+        """Dépose un enregistrement dans la file d'écriture"""
+        records = self._records
+        if records is None:
+            return
+        if len(records) >= self.queue_size:
+            # File pleine : on laisse au thread d'écriture le temps de la vider
+            self._wake.set()
+            with self._not_full:
+                if not self._not_full.wait_for(lambda: len(records) < self.queue_size, PUT_TIMEOUT):
+                    self.dropped += 1
+                    if self.dropped == 1:
+                        self.logger.warning("File de journalisation pleine, enregistrements abandonnés")
+                    return
+        records.append(record)
+        if self.durability == DURABILITY_IMMEDIATE or len(records) >= WAKE_RECORDS:
+            self._wake.set()
+    
+    def flush(self):
+        """Attend que tous les enregistrements en file soient écrits et vidés"""
+        records = self._records
+        if records is None:
+            return
+        done = threading.Event()
+        records.append((_FLUSH, done))
+        self._wake.set()
+        done.wait()
+    
+    def _writer_loop(self):
+        """Thread d'écriture : vide la file, formate, accumule et écrit par lots"""
+        records = self._records
+        while True:
+            self._wake.wait(max(0.0, self._last_flush + self.flush_interval - time.monotonic()))
+            self._wake.clear()
+            
+            stop = False
+            done = []
+            try:
+                while records:
+                    record = records.popleft()
+                    if record is _STOP:
+                        stop = True
+                        break
+                    if record[0] is _FLUSH:
+                        done.append(record[1])
+                        continue
+                    self._format_record(record)
+                    if (self._csv_pending.tell() + self._json_pending.tell()
+                            + self.journal.pending_bytes >= self.flush_bytes):
+                        self._flush_pending()
+                
+                if (stop or done or self.durability == DURABILITY_IMMEDIATE
+                        or time.monotonic() - self._last_flush >= self.flush_interval):
+                    self._flush_pending()
+            except Exception as e:
+                self.logger.error(f"Erreur écriture journal: {e}")
+            finally:
+                for event in done:
+                    event.set()
+                with self._not_full:
+                    self._not_full.notify_all()
+            if stop:
+                return
+    
+    def _format_record(self, record):
+        """Met en forme un enregistrement dans les tampons CSV/JSON"""
+        kind = record[0]
+        if kind == 'DATA':
+            sample = record[1]
+            timestamp = sample.timestamp.isoformat()
+            if self.session_writer:
+                self.session_writer.append(sample)
+            else:
+                row = [timestamp]
+                row.extend(sample.values())
+                self.csv_writer.writerow(row)
+            
+            # Également log en JSON, avec l'horodatage mural de la ligne CSV
+            event_type = 'DATA'
+            data = {'timestamp': timestamp, **dict(zip(STATUS_FIELDS, sample.values()))}
+        elif kind == 'RAW':
+            _, direction, wall_ns, raw = record
+            if self.journal.raw_encoding == RAW_BINARY and isinstance(raw, bytes):
+                # Enregistrement binaire compact, sans passer par JSON
+                self.journal.append_raw(direction, wall_ns, raw)
+                return
+            timestamp = datetime.fromtimestamp(wall_ns / 1e9).isoformat()
+            event_type = 'RAW'
+            data = {
+                'type': 'RAW',
+                'direction': direction,
+                'timestamp': timestamp,
+                'data_hex': raw.hex() if isinstance(raw, bytes) else raw,
+                'data_length': len(raw)
             }
-            self.json_file.write(json.dumps(log_entry) + '\n')
-            self.json_file.flush()
-        except Exception as e:
-            self.logger.error(f"Erreur écriture JSON: {e}")
+        else:
+            _, event_type, when, data = record
+            timestamp = when.isoformat()
+        
+        log_entry = {
+            'event_type': event_type,
+            'timestamp': timestamp,
+            'data': data
+        }
+        self._json_pending.write(json.dumps(log_entry) + '\n')
+    
+    def _flush_pending(self):
+        """Écrit les tampons dans les fichiers (un write par fichier) selon la durabilité"""
+        self._last_flush = time.monotonic()
+        start = time.perf_counter()
+        fsync = self.durability == DURABILITY_FSYNC
+        if self._csv_pending.tell():
+            self.csv_file.write(self._csv_pending.getvalue())
+            self._csv_pending.seek(0)
+            self._csv_pending.truncate()
+            self.csv_file.flush()
+            if fsync:
+                os.fsync(self.csv_file.fileno())
+        if self._json_pending.tell():
+            self.journal.write_events(self._json_pending.getvalue())
+            self._json_pending.seek(0)
+            self._json_pending.truncate()
+        self.journal.flush(fsync)
+        if self.session_writer:
+            self.session_writer.flush()
+            if fsync:
+                os.fsync(self.session_writer.fileno())
+        metrics.LOG_WRITE_SECONDS.observe(time.perf_counter() - start)
+    
+    @property
+    def index(self):
+        """Catalogue des sessions de mesure (créé au premier accès)"""
+        if self._index is None:
+            from session_index import SessionIndex  # import différé (numpy, sqlite3)
+            self._index = SessionIndex(self.log_dir)
+        return self._index
+    
+    def query(self, channel, t0=None, t1=None):
+        """Valeurs d'une mesure entre t0 et t1 sur toutes les sessions : (temps ns, valeurs)"""
+        return self.index.query(channel, t0, t1)
     
     def get_log_files(self):
-        """Retourne la liste des fichiers de log"""
+        """Retourne la liste des fichiers de log (le catalogue des sessions est mis à jour au passage)"""
         try:
+            self.index.refresh()
             return [f.name for f in self.log_dir.glob("*") if f.is_file()]
         except Exception as e:
             self.logger.error(f"Erreur liste fichiers log: {e}")
@@ -143,6 +319,11 @@ class DataLogger:
             dest_dir = Path(directory)
             dest_dir.mkdir(exist_ok=True)
             
+            # Le catalogue part avec les fichiers : il sera recréé au prochain accès
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+            
             for log_file in self.log_dir.glob("*"):
                 if log_file.is_file():
                     dest_file = dest_dir / log_file.name
@@ -155,16 +336,27 @@ class DataLogger:
             return False
     
     def stop_logging(self):
-        """Arrête la journalisation et ferme les fichiers"""
+        """Arrête la journalisation : vide la file d'écriture puis ferme les fichiers"""
         try:
+            if self._writer_thread:
+                self._records.append(_STOP)
+                self._wake.set()
+                self._writer_thread.join()
+                self._writer_thread = None
+                self._records = None
+                atexit.unregister(self.stop_logging)
+            
             if self.csv_file:
                 self.csv_file.close()
-            if self.json_file:
-                self.json_file.close()
+            if self.session_writer:
+                self.session_writer.close()
+            if self.journal:
+                self.journal.close()
             
             self.csv_writer = None
             self.csv_file = None
-            self.json_file = None
+            self.session_writer = None
+            self.journal = None
             
             self.logger.info("Journalisation arrêtée")
         except Exception as e:
@@ -0,0 +1,340 @@
+"""
+Anneau chauffant virtuel sur pseudo-terminal (POSIX), pour les essais et les
+mesures sans matériel.
+
+VirtualDewController reproduit le protocole de src/main.cpp (order.h) :
+HELLO -> 0x30 0x35 puis 0x33 0x35 une fois connecté, DELTA/OFFSET/FULL
+suivis d'un octet valeur, REGUL, SAVE, STATUS -> [t#h#tube#rosée#pwm#delta#offset]
+puis 0x35, ordre inconnu -> 0x34. Un modèle thermique simple fait évoluer
+les mesures (point de rosée de Magnus-Tetens, tube chauffé par le PWM).
+
+DeviceSimulator sert un ou plusieurs périphériques dans un seul thread (ou
+un processus fils) avec latence, gigue, cadence de la boucle du firmware,
+débit série, fragmentation des réponses et bruit de ligne configurables.
+
+Usage : python device_simulator.py [--count 4] [--latency 0.05] [--jitter 0.02]
+                                   [--baudrate 19200] [--fragment 4] [--noise 0.01]
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import selectors
+import signal
+import sys
+import threading
+import time
+import tty
+
+from protocol import Command
+
+# Commandes suivies d'un octet valeur (read_i8 du firmware)
+VALUE_COMMANDS = (Command.DELTA, Command.OFFSET, Command.FULL)
+# Liaison série 8N1 : 10 bits transmis par octet
+BITS_PER_BYTE = 10
+# Coefficients de Magnus-Tetens (readValues du firmware)
+MAGNUS_A = 17.27
+MAGNUS_B = 237.3
+# Modèle thermique du tube : échauffement à PWM maximal et constante de temps
+TUBE_HEATING = 15.0  # °C au-dessus de l'ambiante à PWM 255
+TUBE_TIME_CONSTANT = 120.0  # s
+# Gain intégral de la régulation simulée (PWM par °C et par seconde)
+REGULATION_GAIN = 20.0
+
+def dew_point(temperature, humidity):
+    """Point de rosée (°C), formule de Magnus-Tetens comme le firmware"""
+    alpha = math.log(max(humidity, 0.1) / 100) + (MAGNUS_A * temperature) / (MAGNUS_B + temperature)
+    return (MAGNUS_B * alpha) / (MAGNUS_A - alpha)
+
+class VirtualDewController:
+    """
+    État et protocole d'un anneau, sans E/S : feed(octets) renvoie la
+    réponse de chaque ordre complet. Un octet valeur arrivant dans un envoi
+    ultérieur est attendu indéfiniment (le firmware abandonne après 100 ms).
+    """
+
+    def __init__(self, temperature=12.0, humidity=80.0, seed=None):
+        self.random = random.Random(seed)
+        self.connected = False
+        self.delta_temp = 0
+        self.dew_offset = 0
+        self.is_full = False
+        self.set_pwm = 0
+        self.output = 0.0
+        self.ambient = temperature
+        self.humidity = humidity
+        self.tube = temperature
+        self.eeprom = None  # réglages enregistrés par SAVE
+        self.commands = 0
+        self._pending = None  # ordre en attente de son octet valeur
+        self._last_step = None
+
+    def feed(self, data):
+        """Octets reçus -> liste des réponses (bytes), une par ordre complet"""
+        replies = []
+        for byte in data:
+            if self._pending is not None:
+                replies.append(self.execute(self._pending, byte))
+                self._pending = None
+            elif byte in VALUE_COMMANDS:
+                self._pending = byte
+            else:
+                replies.append(self.execute(byte))
+        return replies
+
+    def execute(self, order, value=None):
+        """Exécute un ordre comme get_messages_from_serial() ; renvoie la réponse"""
+        self.commands += 1
+        ack = bytes([Command.RECEIVED])
+        if order == Command.HELLO:
+            reply = bytes([Command.ALREADY_CONNECTED if self.connected else Command.HELLO])
+            self.connected = True
+            return reply + ack
+        if order == Command.ALREADY_CONNECTED:
+            self.connected = True
+        elif order == Command.FULL:
+            self.set_pwm, self.is_full = value, True
+        elif order == Command.REGUL:
+            self.set_pwm, self.is_full = 0, False
+        elif order == Command.DELTA:
+            self.delta_temp = value - 0x30
+        elif order == Command.OFFSET:
+            self.dew_offset = value - 0x30
+        elif order == Command.STATUS:
+            self.step(time.monotonic())
+            return self.status_payload() + ack
+        elif order == Command.SAVE:
+            self.eeprom = {'delta_temp': self.delta_temp, 'dew_offset': self.dew_offset,
+                           'set_pwm': self.set_pwm, 'is_full': self.is_full}
+        else:
+            return bytes([Command.ERROR])
+        return ack
+
+    @property
+    def temperature(self):
+        """Température mesurée, corrigée de delta_temp comme dans readValues()"""
+        return self.ambient - self.delta_temp
+
+    def step(self, now):
+        """Fait évoluer l'ambiance, la régulation et le tube jusqu'à l'instant now"""
+        dt = 0.0 if self._last_step is None else max(now - self._last_step, 0.0)
+        self._last_step = now
+        if dt == 0.0:
+            return
+        noise = math.sqrt(dt)
+        self.ambient += self.random.gauss(0, 0.01) * noise
+        self.humidity = min(max(self.humidity + self.random.gauss(0, 0.05) * noise, 5.0), 100.0)
+        if self.is_full:
+            self.output = float(self.set_pwm)
+        else:
+            setpoint = max(dew_point(self.temperature, self.humidity) + self.dew_offset, self.temperature)
+            self.output = min(max(self.output + REGULATION_GAIN * (setpoint - self.tube) * dt, 0.0), 255.0)
+        target = self.ambient + TUBE_HEATING * self.output / 255
+        self.tube = target + (self.tube - target) * math.exp(-dt / TUBE_TIME_CONSTANT)
+
+    def status_payload(self):
+        """Trame STATUS (dtostrf à 2 décimales, entiers pour delta et offset)"""
+        dew = dew_point(self.temperature, self.humidity)
+        return (f"[{self.temperature:.2f}#{self.humidity:.2f}#{self.tube:.2f}#{dew:.2f}#"
+                f"{self.output:.2f}#{self.delta_temp}#{self.dew_offset}]").encode('ascii')
+
+class SimulatedPort:
+    """Un périphérique virtuel derrière un pseudo-terminal ; port = chemin côté application"""
+
+    def __init__(self, device, boot_delay=0.0):
+        self.device = device
+        self.master, self._slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self._slave)  # gardé ouvert : le port survit aux fermetures côté application
+        self.port = os.ttyname(self._slave)
+        self.boot_delay = boot_delay
+        self.booted_at = time.monotonic()
+        self.next_free = 0.0  # fin de la dernière réponse programmée (l'ordre est conservé)
+        self.last_tick = 0.0  # dernier tour de boucle du firmware utilisé
+        self.dropped = 0
+
+    def reboot(self):
+        """Redémarre le périphérique (comme une remise à zéro par DTR)"""
+        self.booted_at = time.monotonic()
+        self.device.connected = False
+
+    def close(self):
+        for fd in (self.master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+class DeviceSimulator:
+    """
+    Sert plusieurs SimulatedPort dans un seul thread (start) ou un processus
+    fils (fork), avec un select() pour tous les ports et un échéancier des
+    écritures :
+
+    - latency, jitter : délai de réponse fixe plus aléatoire uniforme (s)
+    - loop_period : un seul ordre traité par tour de boucle du firmware (s, 0 = immédiat)
+    - baudrate : cadence d'émission des réponses (0 = sans limite)
+    - fragment : taille maximale des morceaux écrits (0 = réponse d'un bloc)
+    - noise : probabilité d'octets parasites avant une réponse
+    - boot_delay : octets ignorés pendant le démarrage du périphérique (s)
+    """
+
+    def __init__(self, count=1, latency=0.0, jitter=0.0, loop_period=0.0, baudrate=0, fragment=0,
+                 noise=0.0, boot_delay=0.0, seed=None, temperature=12.0, humidity=80.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.loop_period = loop_period
+        self.byte_time = BITS_PER_BYTE / baudrate if baudrate else 0.0
+        self.fragment = fragment
+        self.noise = noise
+        self.random = random.Random(seed)
+        self.ports = [SimulatedPort(VirtualDewController(temperature, humidity, self.random.random()), boot_delay)
+                      for _ in range(count)]
+        self._schedule = []  # tas (échéance, n°, port, octets)
+        self._sequence = 0
+        self._selector = None
+        self._wakeup = None
+        self._thread = None
+        self._pid = None
+
+    @property
+    def port_names(self):
+        return [port.port for port in self.ports]
+
+    @property
+    def devices(self):
+        return [port.device for port in self.ports]
+
+    def _reply_time(self, port, now):
+        """Échéance de la réponse à un ordre reçu à l'instant now"""
+        due = now
+        if self.loop_period:
+            # Prochain tour de boucle libre : un ordre par tour
+            tick = port.booted_at + math.ceil((now - port.booted_at) / self.loop_period) * self.loop_period
+            port.last_tick = tick = max(tick, port.last_tick + self.loop_period)
+            due = tick
+        due += self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        return max(due, port.next_free)
+
+    def _schedule_reply(self, port, reply, now):
+        if self.noise and self.random.random() < self.noise:
+            reply = bytes(self.random.randrange(256) for _ in range(self.random.randint(1, 3))) + reply
+        due = self._reply_time(port, now)
+        size = len(reply)
+        offset = 0
+        while offset < size:
+            length = self.random.randint(1, self.fragment) if self.fragment else size
+            chunk = reply[offset:offset + length]
+            self._sequence += 1
+            heapq.heappush(self._schedule, (due, self._sequence, port, chunk))
+            offset += length
+            due += len(chunk) * self.byte_time
+        port.next_free = due
+
+    def _received(self, port):
+        try:
+            data = os.read(port.master, 4096)
+        except OSError:
+            return
+        now = time.monotonic()
+        if now - port.booted_at < port.boot_delay:
+            port.dropped += len(data)
+            return
+        for reply in port.device.feed(data):
+            self._schedule_reply(port, reply, now)
+
+    def serve_forever(self):
+        """Boucle de service (jusqu'à stop() ou la fin du processus)"""
+        self._selector = selectors.DefaultSelector()
+        for port in self.ports:
+            self._selector.register(port.master, selectors.EVENT_READ, port)
+        self._selector.register(self._wakeup[0], selectors.EVENT_READ, None)
+        while True:
+            timeout = max(self._schedule[0][0] - time.monotonic(), 0.0) if self._schedule else None
+            for key, _ in self._selector.select(timeout):
+                if key.data is None:
+                    return
+                self._received(key.data)
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, port, chunk = heapq.heappop(self._schedule)
+                try:
+                    os.write(port.master, chunk)
+                except OSError:
+                    pass
+
+    def start(self):
+        """Sert les ports dans un thread démon ; renvoie les noms des ports"""
+        self._wakeup = os.pipe()
+        self._thread = threading.Thread(target=self.serve_forever, name="DeviceSimulator", daemon=True)
+        self._thread.start()
+        return self.port_names
+
+    def fork(self):
+        """
+        Sert les ports dans un processus fils : le temps CPU du simulateur
+        n'est pas compté dans celui du processus mesuré. À appeler avant de
+        démarrer des threads. Renvoie les noms des ports.
+        """
+        self._wakeup = os.pipe()
+        self._pid = os.fork()
+        if self._pid == 0:
+            try:
+                self.serve_forever()
+            finally:
+                os._exit(0)
+        return self.port_names
+
+    def stop(self):
+        """Arrête le service et ferme les pseudo-terminaux"""
+        if self._pid:
+            os.kill(self._pid, signal.SIGKILL)
+            os.waitpid(self._pid, 0)
+            self._pid = None
+        elif self._thread is not None:
+            os.write(self._wakeup[1], b'\0')
+            self._thread.join()
+            self._thread = None
+        for port in self.ports:
+            port.close()
+        if self._wakeup is not None:
+            for fd in self._wakeup:
+                os.close(fd)
+            self._wakeup = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1, help="nombre de périphériques")
+    parser.add_argument('--latency', type=float, default=0.0, help="délai de réponse (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="gigue ajoutée au délai (s)")
+    parser.add_argument('--loop-period', type=float, default=0.0,
+                        help="période de la boucle du firmware, un ordre par tour (s ; ~3 sur le matériel)")
+    parser.add_argument('--baudrate', type=int, default=19200, help="cadence d'émission (0 = sans limite)")
+    parser.add_argument('--fragment', type=int, default=0, help="taille maximale des morceaux écrits")
+    parser.add_argument('--noise', type=float, default=0.0, help="probabilité d'octets parasites par réponse")
+    parser.add_argument('--boot-delay', type=float, default=0.0, help="démarrage du périphérique (s)")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    simulator = DeviceSimulator(args.count, latency=args.latency, jitter=args.jitter,
+                                loop_period=args.loop_period, baudrate=args.baudrate, fragment=args.fragment,
+                                noise=args.noise, boot_delay=args.boot_delay, seed=args.seed)
+    for name in simulator.start():
+        print(name, flush=True)
+    try:
+        signal.sigwait({signal.SIGINT, signal.SIGTERM})
+    finally:
+        simulator.stop()
+    return 0
+
+if __name__ == '__main__':
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT, signal.SIGTERM})
+    sys.exit(main())
@@ -0,0 +1,74 @@
+from collections import deque
+from datetime import datetime
+
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+
+# Regroupement des ajouts : au plus un rendu par trame (~30 Hz)
+FLUSH_INTERVAL_MS = 33
+
+# Octets non imprimables remplacés par '.' dans la colonne ASCII
+_ASCII_TABLE = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
+
+def format_hex(data):
+    """Octets en hexadécimal majuscule séparés par des espaces"""
+    return data.hex(' ').upper()
+
+def format_ascii(data):
+    """Octets imprimables tels quels, les autres remplacés par '.'"""
+    return data.translate(_ASCII_TABLE).decode('ascii')
+
+class HexConsole(QPlainTextEdit):
+    """
+    Console de trames brutes à capacité fixe : le document ne garde que
+    max_lines lignes (setMaximumBlockCount) et les lignes reçues sont
+    accumulées puis ajoutées en un seul bloc par trame d'affichage. Un port
+    bavard ne provoque donc qu'une mise en page par trame et les lignes qui
+    seraient de toute façon évincées ne sont jamais rendues.
+    """
+
+    def __init__(self, max_lines=100, show_ascii=False, milliseconds=False, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        self.setFont(QFont("Courier", 9))
+        self.show_ascii = show_ascii
+        self.milliseconds = milliseconds
+        self._pending = deque(maxlen=max_lines)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(FLUSH_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+
+    def timestamp(self):
+        """Horodatage des lignes (avec millisecondes si demandé)"""
+        now = datetime.now()
+        if self.milliseconds:
+            return f"{now:%H:%M:%S}.{now.microsecond // 1000:03d}"
+        return f"{now:%H:%M:%S}"
+
+    def append_line(self, text):
+        """Ajoute une ligne (rendue à la prochaine trame)"""
+        self._pending.append(text)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def append_bytes(self, data, direction="RX"):
+        """Ajoute une trame horodatée en hexadécimal (et ASCII si show_ascii)"""
+        if self.show_ascii:
+            self.append_line(f"[{self.timestamp()}] {direction}: {format_hex(data):30} | {format_ascii(data)}")
+        else:
+            self.append_line(f"[{self.timestamp()}] {direction}: {format_hex(data)}")
+
+    def flush(self):
+        """Ajoute les lignes en attente en une seule opération"""
+        self._timer.stop()
+        if self._pending:
+            self.appendPlainText("\n".join(self._pending))
+            self._pending.clear()
+
+    def clear(self):
+        self._pending.clear()
+        super().clear()
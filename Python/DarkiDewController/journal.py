@@ -0,0 +1,301 @@
+import gzip
+import heapq
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # compression zstd optionnelle
+    zstandard = None
+
+# Rotation des segments
+SEGMENT_BYTES = 16 * 2**20
+SEGMENT_AGE = 3600.0
+# Rétention des segments fermés (toutes sessions confondues)
+RETENTION_BYTES = 1024 * 2**20
+RETENTION_DAYS = 30
+
+# Compression des segments fermés
+COMPRESSION_NONE = None
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_ZSTD = 'zstd'
+DEFAULT_COMPRESSION = COMPRESSION_ZSTD if zstandard is not None else COMPRESSION_GZIP
+_COMPRESSED_SUFFIX = {COMPRESSION_GZIP: '.gz', COMPRESSION_ZSTD: '.zst'}
+
+# Encodage des trames RAW
+RAW_HEX = 'hex'        # événement JSON avec data_hex (format historique)
+RAW_BINARY = 'binary'  # segments raw_<session>_<n>.bin d'enregistrements binaires
+
+# Segment binaire : en-tête puis enregistrements (ns epoch, sens, longueur, octets)
+RAW_MAGIC = b'DDRAW\x00\x01\x00'
+RAW_RECORD = struct.Struct('<qBH')
+RAW_DIRECTIONS = ('RX', 'TX')
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(RAW_DIRECTIONS)}
+
+_SEGMENT_NAME = re.compile(r'^(events|raw)_(\d{8}_\d{6})_(\d{4})\.(jsonl|bin)(\.gz|\.zst)?$')
+
+logger = logging.getLogger(__name__)
+
+class SegmentedFile:
+    """
+    Fichier découpé en segments <prefix>_<session>_<n><suffix>.
+    Un nouveau segment est ouvert quand le courant dépasse max_bytes ou
+    max_age secondes ; le segment fermé est compressé en flux dans un thread
+    séparé, puis la politique de rétention est appliquée.
+    """
+
+    def __init__(self, journal, prefix, suffix, header=b''):
+        self.journal = journal
+        self.prefix = prefix
+        self.suffix = suffix
+        self.header = header
+        self.index = 0
+        self.file = None
+        self.path = None
+        self._opened_at = 0.0
+        self._size = 0
+
+    def _open_next(self):
+        self.index += 1
+        self.path = self.journal.directory / f"{self.prefix}_{self.journal.session_id}_{self.index:04d}{self.suffix}"
+        self.file = open(self.path, 'wb')
+        self.file.write(self.header)
+        self._size = len(self.header)
+        self._opened_at = time.monotonic()
+
+    def write(self, data):
+        """Écrit un lot (bytes) en ouvrant un nouveau segment si nécessaire"""
+        if self.file is None:
+            self._open_next()
+        elif (self._size >= self.journal.max_segment_bytes
+              or time.monotonic() - self._opened_at >= self.journal.max_segment_age):
+            self.rotate()
+            self._open_next()
+        self.file.write(data)
+        self._size += len(data)
+
+    def flush(self, fsync=False):
+        if self.file is not None:
+            self.file.flush()
+            if fsync:
+                os.fsync(self.file.fileno())
+
+    def rotate(self):
+        """Ferme le segment courant et le confie à la compression"""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        self.journal._segment_closed(self.path)
+
+class EventJournal:
+    """
+    Journal d'événements d'une session : segments JSONL (et segments binaires
+    pour les trames RAW en encodage RAW_BINARY) avec rotation par taille ou
+    par âge, compression gzip/zstd des segments fermés et rétention.
+    Les lectures passent par read_events(), qui parcourt les segments dans
+    l'ordre quel que soit leur format.
+    """
+
+    def __init__(self, directory, session_id, raw_encoding=RAW_HEX, compression=DEFAULT_COMPRESSION,
+                 max_segment_bytes=SEGMENT_BYTES, max_segment_age=SEGMENT_AGE,
+                 retention_bytes=RETENTION_BYTES, retention_days=RETENTION_DAYS):
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            logger.warning("Module zstandard absent, compression gzip utilisée")
+            compression = COMPRESSION_GZIP
+        self.directory = Path(directory)
+        self.session_id = session_id
+        self.raw_encoding = raw_encoding
+        self.compression = compression
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.retention_bytes = retention_bytes
+        self.retention_days = retention_days
+        self.events = SegmentedFile(self, 'events', '.jsonl')
+        self.raw = SegmentedFile(self, 'raw', '.bin', RAW_MAGIC)
+        self._raw_pending = bytearray()
+        self._compressors = []
+        self._compressing = set()  # segments fermés en cours de compression, exclus de la rétention
+        self._compressing_lock = threading.Lock()
+
+    @property
+    def pending_bytes(self):
+        return len(self._raw_pending)
+
+    def write_events(self, text):
+        """Écrit un lot de lignes JSONL"""
+        self.events.write(text.encode('utf-8'))
+
+    def append_raw(self, direction, wall_ns, data):
+        """Accumule une trame RAW binaire (écrite au prochain flush) ; direction validée par l'appelant"""
+        self._raw_pending += RAW_RECORD.pack(wall_ns, _DIRECTION_CODES[direction], len(data))
+        self._raw_pending += data
+
+    def flush(self, fsync=False):
+        if self._raw_pending:
+            self.raw.write(bytes(self._raw_pending))
+            self._raw_pending.clear()
+        self.events.flush(fsync)
+        self.raw.flush(fsync)
+
+    def close(self):
+        """Écrit les données en attente, ferme et compresse les derniers segments"""
+        self.flush()
+        self.events.rotate()
+        self.raw.rotate()
+        for thread in self._compressors:
+            thread.join()
+        self._compressors.clear()
+
+    def _segment_closed(self, path):
+        self._compressors = [thread for thread in self._compressors if thread.is_alive()]
+        with self._compressing_lock:
+            self._compressing.add(path)
+        thread = threading.Thread(target=self._finish_segment, args=(path,), name="JournalCompressor", daemon=True)
+        thread.start()
+        self._compressors.append(thread)
+
+    def _in_use(self):
+        """Segments courants et segments en cours de compression (source et cible)"""
+        keep = [self.events.path, self.raw.path]
+        with self._compressing_lock:
+            for path in self._compressing:
+                keep.append(path)
+                if self.compression is not None:
+                    keep.append(path.with_name(path.name + _COMPRESSED_SUFFIX[self.compression]))
+        return keep
+
+    def _finish_segment(self, path):
+        """Compresse un segment fermé (fichier temporaire puis renommage) et applique la rétention"""
+        try:
+            try:
+                if self.compression is not None:
+                    target = path.with_name(path.name + _COMPRESSED_SUFFIX[self.compression])
+                    partial = target.with_name(target.name + '.part')
+                    with open(path, 'rb') as source, _open_compressed(partial, self.compression, 'wb') as sink:
+                        shutil.copyfileobj(source, sink, 1024 * 1024)
+                    os.replace(partial, target)
+                    path.unlink()
+            finally:
+                with self._compressing_lock:
+                    self._compressing.discard(path)
+            apply_retention(self.directory, self.retention_bytes, self.retention_days, keep=self._in_use())
+        except Exception as e:
+            logger.error(f"Erreur finalisation segment {path}: {e}")
+
+def _open_compressed(path, compression, mode):
+    """Ouvre un flux (dé)compressé en mode binaire"""
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(path, mode, compresslevel=6)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Module zstandard requis pour lire ce segment")
+        raw = open(path, mode)
+        if 'w' in mode:
+            return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        # Lecture ligne à ligne possible via un tampon
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    return open(path, mode)
+
+def _segment_key(path):
+    """(session, n, type) d'un nom de segment, ou None"""
+    match = _SEGMENT_NAME.match(Path(path).name)
+    if not match:
+        return None
+    return match.group(2), int(match.group(3)), match.group(1)
+
+def list_segments(directory, session_id=None):
+    """Segments (events et raw, compressés ou non) triés par session puis par numéro"""
+    segments = []
+    for path in Path(directory).iterdir():
+        key = _segment_key(path)
+        if key and not path.name.endswith('.part') and (session_id is None or key[0] == session_id):
+            segments.append((key, path))
+    return [path for _, path in sorted(segments)]
+
+def apply_retention(directory, max_bytes=RETENTION_BYTES, max_days=RETENTION_DAYS, keep=()):
+    """Supprime les segments fermés les plus anciens au-delà de max_days ou de max_bytes au total"""
+    keep = {Path(path) for path in keep if path is not None}
+    closed = []
+    for path in list_segments(directory):
+        if path in keep:
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # compressé ou supprimé entre-temps
+        closed.append((stat.st_mtime, stat.st_size, path))
+    closed.sort()
+    total = sum(size for _, size, _ in closed)
+    oldest_allowed = time.time() - max_days * 86400 if max_days else None
+    for mtime, size, path in closed:
+        expired = oldest_allowed is not None and mtime < oldest_allowed
+        if not expired and (max_bytes is None or total <= max_bytes):
+            break
+        total -= size
+        try:
+            path.unlink()
+            logger.info(f"Segment supprimé par la rétention: {path.name}")
+        except FileNotFoundError:
+            pass
+
+def _raw_event(wall_ns, direction, data):
+    """Trame RAW binaire sous la même forme qu'un événement JSONL RAW"""
+    timestamp = datetime.fromtimestamp(wall_ns / 1e9).isoformat()
+    return {
+        'event_type': 'RAW',
+        'timestamp': timestamp,
+        'data': {
+            'type': 'RAW',
+            'direction': RAW_DIRECTIONS[direction],
+            'timestamp': timestamp,
+            'data_hex': data.hex(),
+            'data_length': len(data)
+        }
+    }
+
+def iter_segment(path):
+    """Événements (dict) d'un segment, compressé ou non"""
+    path = Path(path)
+    compression = {'.gz': COMPRESSION_GZIP, '.zst': COMPRESSION_ZSTD}.get(path.suffix)
+    with _open_compressed(path, compression, 'rb') as f:
+        if _segment_key(path)[2] == 'events':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        if f.read(len(RAW_MAGIC)) != RAW_MAGIC:
+            raise ValueError(f"Segment RAW invalide: {path.name}")
+        while True:
+            header = f.read(RAW_RECORD.size)
+            if len(header) < RAW_RECORD.size:
+                return  # fin de fichier (ou dernier enregistrement tronqué)
+            wall_ns, direction, length = RAW_RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            yield _raw_event(wall_ns, direction, data)
+
+def read_events(directory, session_id):
+    """
+    Tous les événements d'une session dans l'ordre chronologique, en flux :
+    segments JSONL et binaires successifs, compressés ou non.
+    """
+    streams = {'events': [], 'raw': []}
+    for path in list_segments(directory, session_id):
+        streams[_segment_key(path)[2]].append(path)
+
+    def chain(paths):
+        for path in paths:
+            yield from iter_segment(path)
+
+    return heapq.merge(chain(streams['events']), chain(streams['raw']), key=lambda event: event['timestamp'])
@@ -0,0 +1,122 @@
+import numpy as np
+
+from ring_buffer import ColumnarRingBuffer
+
+# Nombre de points transmis à la courbe par pixel horizontal
+POINTS_PER_PIXEL = 2
+
+class MinMaxPyramid:
+    """
+    Niveaux de détail d'une série temporelle, à la manière d'une pyramide de
+    mipmaps : le niveau k résume chaque bloc de factor**(k+1) points bruts par
+    son temps de début, son minimum et son maximum.
+    Les blocs sont alignés sur le nombre total de points ajoutés ; append()
+    est en O(1) amorti et envelope() ne lit que les blocs visibles, si bien
+    que le coût d'un rendu dépend de la largeur en pixels et non de la
+    longueur de l'historique.
+    """
+
+    def __init__(self, capacity, factor=2):
+        if factor < 2:
+            raise ValueError(f"Facteur invalide: {factor}")
+        self.factor = factor
+        self.capacity = capacity
+        self.levels = []  # (taille de bloc, ColumnarRingBuffer(('min', 'max')))
+        block = factor
+        while block < capacity:
+            self.levels.append((block, ColumnarRingBuffer(capacity // block + 1, ('min', 'max'))))
+            block *= factor
+        self.clear()
+
+    def clear(self):
+        """Vide tous les niveaux"""
+        self.count = 0
+        for _, ring in self.levels:
+            ring.clear()
+        depth = len(self.levels)
+        # Bloc en cours de remplissage à chaque niveau
+        self._start = [0.0] * depth
+        self._min = [0.0] * depth
+        self._max = [0.0] * depth
+        self._filled = [0] * depth  # blocs (ou points) du niveau inférieur déjà agrégés
+
+    def append(self, t, value):
+        """Ajoute un point brut et propage les blocs complets vers les niveaux supérieurs"""
+        self.count += 1
+        start, low, high = t, value, value
+        for level in range(len(self.levels)):
+            filled = self._filled[level]
+            if filled == 0:
+                self._start[level] = start
+                self._min[level] = low
+                self._max[level] = high
+            else:
+                if low < self._min[level]:
+                    self._min[level] = low
+                if high > self._max[level]:
+                    self._max[level] = high
+            filled += 1
+            if filled < self.factor:
+                self._filled[level] = filled
+                return
+            # Bloc complet : il est enregistré puis agrégé au niveau suivant
+            self._filled[level] = 0
+            start, low, high = self._start[level], self._min[level], self._max[level]
+            self.levels[level][1].append(start, (low, high))
+
+    def rebuild(self, times, values):
+        """Reconstruit tous les niveaux à partir de séries complètes (vectorisé)"""
+        self.clear()
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        self.count = n
+        child = 1
+        for level, (block, ring) in enumerate(self.levels):
+            full = n // block
+            if full:
+                blocks = values[:full * block].reshape(full, block)
+                ring.extend(times[:full * block:block],
+                            np.column_stack((blocks.min(axis=1), blocks.max(axis=1))))
+            # Bloc partiel : enfants complets qui suivent le dernier bloc complet
+            begin, end = full * block, (n // child) * child
+            self._filled[level] = (end - begin) // child
+            if end > begin:
+                self._start[level] = times[begin]
+                self._min[level] = values[begin:end].min()
+                self._max[level] = values[begin:end].max()
+            child = block
+
+    def envelope(self, times, values, first, max_points):
+        """
+        Points à tracer pour times[first:] / values[first:] (vues du tampon brut
+        dont la fin correspond au dernier point ajouté) : les points bruts s'ils
+        sont au plus max_points, sinon l'enveloppe min/max du niveau le plus fin
+        qui tient dans max_points, complétée par les points pas encore agrégés.
+        """
+        n = len(times) - first
+        if n <= max_points or not self.levels:
+            return times[first:], values[first:]
+
+        for block, ring in self.levels:
+            if 2 * n <= max_points * block:
+                break
+
+        block_times = ring.times()
+        i = int(np.searchsorted(block_times, times[first]))
+        count = len(block_times) - i
+        x = np.empty(2 * count)
+        y = np.empty(2 * count)
+        x[0::2] = block_times[i:]
+        x[1::2] = block_times[i:]
+        y[0::2] = ring.column('min')[i:]
+        y[1::2] = ring.column('max')[i:]
+
+        # Points bruts qui n'appartiennent encore à aucun bloc complet de ce niveau
+        tail = min(self.count % block, n)
+        if tail:
+            tail_values = values[len(values) - tail:]
+            tail_time = times[len(times) - tail]
+            x = np.concatenate((x, (tail_time, tail_time, times[-1])))
+            y = np.concatenate((y, (tail_values.min(), tail_values.max(), values[-1])))
+        return x, y
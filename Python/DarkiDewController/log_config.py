@@ -0,0 +1,114 @@
+"""
+Configuration du logging partagée par l'application graphique et le démon.
+
+Les loggers n'écrivent que dans une file (QueueHandler) : le formatage des
+messages et les écritures fichier/console se font dans le thread du
+QueueListener, jamais dans le thread d'E/S du port série. Les messages
+des chemins critiques utilisent le formatage paresseux de logging
+(logger.debug("Reçu %d octets", n)) : rien n'est formaté si le niveau est
+filtré, et le formatage restant se fait côté QueueListener.
+
+La trace détaillée du SerialWorker (chaque bloc reçu, chaque trame) est au
+niveau DEBUG, écrite dans serial_corrected.log avec l'état du décodeur ; elle
+est désactivée par défaut (set_serial_trace).
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Format des journaux application (fichier et console)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Format de la trace série, avec l'état du décodeur (extra={'state': ...})
+SERIAL_FORMAT = '%(asctime)s.%(msecs)03d - STATE:%(state)s - %(message)s'
+SERIAL_LOGGER = 'SerialWorker'
+SERIAL_LOG_FILE = 'serial_corrected.log'
+
+_listener = None
+
+class HexBytes:
+    """Octets affichés en hexadécimal au formatage seulement ("%.50s" tronque)"""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return self.data.hex()
+
+class StateLoggerAdapter(logging.LoggerAdapter):
+    """
+    Ajoute aux enregistrements l'état du décodeur (extra={'state': state()})
+    attendu par SERIAL_FORMAT ; state n'est appelé que si le niveau est actif.
+    """
+
+    def __init__(self, logger, state):
+        super().__init__(logger, {})
+        self.state = state
+
+    def process(self, msg, kwargs):
+        if 'extra' not in kwargs:
+            kwargs['extra'] = {'state': self.state()}
+        return msg, kwargs
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler sans formatage côté producteur : l'enregistrement est mis en
+    file tel quel et formaté par les handlers du QueueListener. Les arguments
+    des messages doivent donc être immuables (octets, nombres, tuples).
+    """
+
+    def prepare(self, record):
+        return record
+
+def configure_logging(level=logging.INFO, log_file='app.log', console=True, stream=None):
+    """
+    Installe la configuration unique du logging (un nouvel appel remplace la
+    précédente) : le logger racine écrit dans une file, un QueueListener
+    dessert log_file (None : pas de fichier), la console (stream, stderr par
+    défaut) et la trace série. Renvoie le QueueListener.
+    """
+    global _listener
+    root = logging.getLogger()
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    if console:
+        handlers.append(logging.StreamHandler(stream or sys.stderr))
+    for handler in handlers:
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
+
+    serial_handler = logging.FileHandler(SERIAL_LOG_FILE, mode='w', delay=True)
+    serial_handler.setFormatter(logging.Formatter(SERIAL_FORMAT, datefmt='%H:%M:%S'))
+    serial_handler.addFilter(logging.Filter(SERIAL_LOGGER))
+    handlers.append(serial_handler)
+
+    records = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(records))
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def set_serial_trace(enabled):
+    """Active la trace DEBUG du SerialWorker (serial_corrected.log)"""
+    logging.getLogger(SERIAL_LOGGER).setLevel(logging.DEBUG if enabled else logging.NOTSET)
+
+def shutdown_logging():
+    """Vide la file et arrête le QueueListener (appelé aussi à la sortie)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(shutdown_logging)
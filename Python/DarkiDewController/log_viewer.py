@@ -0,0 +1,366 @@
+import json
+import mmap
+import os
+import tempfile
+import threading
+
+import numpy as np
+from PyQt6.QtWidgets import *
+from PyQt6.QtCore import *
+from PyQt6.QtGui import *
+
+from journal import iter_segment
+from session_store import load_session, write_csv
+
+# Lecture par blocs pour l'indexation des fins de ligne
+INDEX_CHUNK = 4 * 2**20
+# Longueur maximale affichée d'une ligne
+MAX_LINE_CHARS = 4000
+# Période de surveillance du fichier en mode suivi
+TAIL_INTERVAL_MS = 500
+
+def decode_to_text(path, dest):
+    """Convertit une session .npy ou un segment de journal (.gz, .zst, .bin) en texte dans dest"""
+    with open(dest, 'w', newline='') as f:
+        if path.endswith('.npy'):
+            write_csv(load_session(path), f)
+        else:
+            for event in iter_segment(path):
+                f.write(json.dumps(event) + '\n')
+
+class LineIndexer(QObject):
+    """Repère les fins de ligne d'un fichier dans un thread, par blocs"""
+    lines_found = pyqtSignal(object)  # positions (int64) juste après chaque '\n'
+    finished = pyqtSignal(int)        # position de fin de la zone indexée
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._thread = None
+        self._cancelled = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, begin, end):
+        """Indexe [begin, end) en arrière-plan"""
+        self._thread = threading.Thread(target=self._run, args=(begin, end), daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _run(self, begin, end):
+        with open(self.path, 'rb') as f:
+            f.seek(begin)
+            position = begin
+            while position < end and not self._cancelled:
+                chunk = f.read(min(INDEX_CHUNK, end - position))
+                if not chunk:
+                    break
+                ends = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 0x0A) + (position + 1)
+                if len(ends):
+                    self.lines_found.emit(ends)
+                position += len(chunk)
+        if not self._cancelled:
+            self.finished.emit(position)
+
+class LogLineModel(QAbstractListModel):
+    """
+    Modèle virtualisé d'un fichier texte : le fichier est projeté en mémoire
+    (mmap) et seules les lignes demandées par la vue sont décodées. L'index
+    des fins de ligne est construit en arrière-plan et s'étend quand le
+    fichier grandit (suivi « tail -f »).
+    """
+    indexing_changed = pyqtSignal(bool)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._ends = np.zeros(4096, dtype=np.int64)
+        self._count = 0
+        self._indexed = 0  # octets déjà indexés
+        self._partial = False  # dernière ligne indexée sans '\n' (fin de fichier)
+        self.tailing = False   # suivi actif : une ligne sans '\n' est encore en cours d'écriture
+        self._file = open(path, 'rb')
+        self._map = None
+        self._mapped = 0
+        self._indexer = LineIndexer(path, self)
+        self._indexer.lines_found.connect(self._add_lines)
+        self._indexer.finished.connect(self._indexing_done)
+
+    def start(self):
+        """Lance l'indexation du contenu actuel"""
+        self.refresh()
+
+    def close(self):
+        self._indexer.cancel()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def indexing(self):
+        return self._indexer.running
+
+    def refresh(self):
+        """Indexe les octets ajoutés depuis la dernière indexation ; renvoie True si le fichier a grandi"""
+        if self._indexer.running:
+            return False
+        size = os.fstat(self._file.fileno()).st_size
+        if size <= self._indexed:
+            return False
+        self.indexing_changed.emit(True)
+        self._indexer.start(self._indexed, size)
+        return True
+
+    def _remap(self, size):
+        """Projette le fichier jusqu'à `size` octets au moins"""
+        if size <= self._mapped:
+            return
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped = len(self._map)
+
+    def _add_lines(self, ends):
+        needed = self._count + len(ends)
+        if needed > len(self._ends):
+            self._ends = np.resize(self._ends, max(needed, 2 * len(self._ends)))
+        self._remap(int(ends[-1]))
+        self.beginInsertRows(QModelIndex(), self._count, needed - 1)
+        self._ends[self._count:needed] = ends
+        self._count = needed
+        self.endInsertRows()
+
+    def _indexing_done(self, position):
+        self._indexed = int(self._ends[self._count - 1]) if self._count else 0
+        if position > self._indexed and not self.tailing:
+            # Dernière ligne sans '\n' : affichée jusqu'à la fin du fichier
+            self._add_lines(np.array([position], dtype=np.int64))
+            self._indexed = position
+            self._partial = True
+        # En suivi, elle sera indexée au prochain passage, une fois terminée
+        self.indexing_changed.emit(False)
+
+    def set_tailing(self, enabled):
+        """Active le suivi ; une dernière ligne sans '\n' redevient « en cours d'écriture »"""
+        self.tailing = enabled
+        if enabled and self._partial and not self._indexer.running:
+            self._partial = False
+            row = self._count - 1
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._count = row
+            self.endRemoveRows()
+            self._indexed = int(self._ends[row - 1]) if row else 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def _line_bounds(self, row):
+        start = int(self._ends[row - 1]) if row else 0
+        return start, int(self._ends[row])
+
+    def line(self, row):
+        """Texte de la ligne `row` (sans fin de ligne)"""
+        start, end = self._line_bounds(row)
+        end = min(end, start + MAX_LINE_CHARS * 4)
+        return self._map[start:end].decode('utf-8', 'replace').rstrip('\r\n')[:MAX_LINE_CHARS]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.line(index.row())
+
+    def find(self, text, from_row=0, backwards=False, inclusive=False):
+        """
+        Ligne suivante (ou précédente) contenant `text`, en cherchant
+        directement dans le fichier projeté ; recommence au début (ou à la
+        fin) si besoin. inclusive : la recherche vers l'avant commence à
+        from_row elle-même. Renvoie -1 si le texte est absent.
+        """
+        if not text or self._count == 0:
+            return -1
+        needle = text.encode('utf-8')
+        limit = int(self._ends[self._count - 1])
+        from_row = min(max(from_row, 0), self._count - 1)
+        if backwards:
+            start, _ = self._line_bounds(from_row)
+            position = self._map.rfind(needle, 0, start)
+            if position < 0:
+                position = self._map.rfind(needle, start, limit)
+        else:
+            start, end = self._line_bounds(from_row)
+            if inclusive:
+                end = start
+            position = self._map.find(needle, end, limit)
+            if position < 0:
+                position = self._map.find(needle, 0, end)
+        if position < 0:
+            return -1
+        return int(np.searchsorted(self._ends[:self._count], position, side='right'))
+
+class LogViewerDialog(QDialog):
+    """Visionneuse de journaux : liste virtualisée, recherche incrémentale et suivi en direct"""
+    decoded = pyqtSignal(str)  # fin de conversion d'un format binaire (message d'erreur éventuel)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Log: {os.path.basename(path)}")
+        self.resize(900, 600)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.path = path
+        self.model = None
+        self._temp_path = None
+
+        layout = QVBoxLayout(self)
+
+        # Barre de recherche
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(QLabel("Rechercher:"))
+        self.search_edit = QLineEdit()
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start())
+        self.search_edit.returnPressed.connect(self.find_next)
+        search_layout.addWidget(self.search_edit)
+
+        prev_btn = QPushButton("Précédent")
+        prev_btn.clicked.connect(self.find_previous)
+        search_layout.addWidget(prev_btn)
+        next_btn = QPushButton("Suivant")
+        next_btn.clicked.connect(self.find_next)
+        search_layout.addWidget(next_btn)
+
+        self.tail_check = QCheckBox("Suivre (tail -f)")
+        self.tail_check.toggled.connect(self.toggle_tail)
+        search_layout.addWidget(self.tail_check)
+        layout.addLayout(search_layout)
+
+        # Liste virtualisée : seules les lignes visibles sont demandées au modèle
+        self.view = QListView()
+        self.view.setUniformItemSizes(True)
+        self.view.setFont(QFont("Courier", 9))
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.view)
+
+        self.status_label = QLabel("Ouverture...")
+        layout.addWidget(self.status_label)
+
+        # Recherche incrémentale après une courte pause de frappe
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.incremental_search)
+
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setInterval(TAIL_INTERVAL_MS)
+        self.tail_timer.timeout.connect(self.poll_file)
+
+        QShortcut(QKeySequence.StandardKey.Find, self, self.search_edit.setFocus)
+        QShortcut(QKeySequence.StandardKey.Copy, self, self.copy_selection)
+
+        if path.endswith(('.npy', '.gz', '.zst', '.bin')):
+            # Format binaire ou compressé : converti en texte dans un fichier temporaire
+            self.tail_check.setEnabled(False)
+            fd, self._temp_path = tempfile.mkstemp(suffix='.txt', prefix='darkidew_')
+            os.close(fd)
+            self.decoded.connect(self._decoded)
+            threading.Thread(target=self._decode, daemon=True).start()
+        else:
+            self._open(path)
+
+    def _decode(self):
+        try:
+            decode_to_text(self.path, self._temp_path)
+            self.decoded.emit("")
+        except Exception as e:
+            self.decoded.emit(str(e))
+
+    def _decoded(self, error):
+        if error:
+            self.status_label.setText(f"Erreur lecture: {error}")
+            return
+        self._open(self._temp_path)
+
+    def _open(self, path):
+        try:
+            self.model = LogLineModel(path, self)
+        except OSError as e:
+            self.status_label.setText(f"Erreur lecture: {e}")
+            return
+        self.model.rowsInserted.connect(self.rows_added)
+        self.model.indexing_changed.connect(self.update_status)
+        self.view.setModel(self.model)
+        self.model.start()
+        self.update_status(self.model.indexing)
+
+    def update_status(self, indexing=False):
+        if self.model is None:
+            return
+        count = self.model.rowCount()
+        state = " (indexation...)" if indexing else ""
+        tail = " | suivi actif" if self.tail_timer.isActive() else ""
+        self.status_label.setText(f"{count} lignes{state}{tail}")
+
+    def rows_added(self):
+        self.update_status(self.model.indexing)
+        if self.tail_check.isChecked():
+            self.view.scrollToBottom()
+
+    def toggle_tail(self, enabled):
+        if self.model is not None:
+            self.model.set_tailing(enabled)
+        if enabled:
+            self.tail_timer.start()
+            self.view.scrollToBottom()
+        else:
+            self.tail_timer.stop()
+        self.update_status(self.model.indexing if self.model else False)
+
+    def poll_file(self):
+        if self.model is not None:
+            self.model.refresh()
+
+    def _current_row(self):
+        index = self.view.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def _select(self, row):
+        if row < 0:
+            self.search_edit.setStyleSheet("background-color: #ffcccc;")
+            return
+        self.search_edit.setStyleSheet("")
+        index = self.model.index(row)
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index, QAbstractItemView.ScrollHint.PositionAtCenter)
+
+    def incremental_search(self):
+        """Recherche pendant la frappe, à partir de la ligne courante incluse"""
+        if self.model is None:
+            return
+        self._select(self.model.find(self.search_edit.text(), self._current_row(), inclusive=True))
+
+    def find_next(self):
+        if self.model is not None:
+            self._select(self.model.find(self.search_edit.text(), self._current_row()))
+
+    def find_previous(self):
+        if self.model is not None:
+            self._select(self.model.find(self.search_edit.text(), max(self._current_row(), 0), backwards=True))
+
+    def copy_selection(self):
+        rows = sorted(index.row() for index in self.view.selectedIndexes())
+        if rows:
+            QApplication.clipboard().setText("\n".join(self.model.line(row) for row in rows))
+
+    def closeEvent(self, event):
+        self.tail_timer.stop()
+        if self.model is not None:
+            self.model.close()
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+        super().closeEvent(event)
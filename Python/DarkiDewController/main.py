@@ -5,111 +5,146 @@ import serial.tools.list_ports
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
-import pyqtgraph as pg
-import numpy as np
 from datetime import datetime, timedelta
 import threading
 import time
 import csv
 import json
 from collections import deque
+from concurrent.futures import Future
 import logging
 
 # Imports locaux
-from protocol import ProtocolHandler, Command
-from data_logger import DataLogger
-from realtime_plots import RealTimePlot, MultiPlotWidget
+from protocol import ProtocolHandler, Command, STATUS_FIELDS, HISTORY_CAPACITY, WALL_CLOCK_OFFSET_NS
+from data_logger import DataLogger, STORAGE_CSV, STORAGE_NPY
+from journal import RAW_BINARY, RAW_HEX
+from command_queue import CommandError, CommandRejected
+from hex_console import HexConsole
+import metrics
+from log_config import SERIAL_LOGGER, StateLoggerAdapter, configure_logging, set_serial_trace
+from status_scheduler import StatusScheduler
+from transport import EventLoopThread, SerialTransport
+# pyqtgraph/numpy (graphiques, historique, visionneuse, multi-appareils) sont
+# importés à la première utilisation : voir MainWindow.add_lazy_tab
+
+# Période de la sonde de retard de la boucle d'événements Qt (ms)
+LAG_PROBE_INTERVAL = 100
+# Rafraîchissement du tableau des métriques (onglet Diagnostic, ms)
+METRICS_REFRESH_INTERVAL = 1000
 
 class SerialWorker(QObject):
-    """Version corrigée avec tous les signaux nécessaires"""
+    """
+    Appareil principal de l'interface : un SerialTransport exécuté dans une
+    boucle asyncio dédiée (EventLoopThread) porte les E/S du port, la file
+    de commandes et les délais ; ses événements sont relayés par les
+    signaux Qt. Les Future des commandes sont résolus dans le thread de la
+    boucle.
+    """
     
     # Tous les signaux requis
-    data_received = pyqtSignal(dict)
+    data_received = pyqtSignal(object)  # StatusSample
     status_update = pyqtSignal(str)
     command_ack = pyqtSignal(str, bool)
     raw_data_received = pyqtSignal(bytes)  # Ajouté ici !
     
     def __init__(self):
         super().__init__()
-        self.serial_port = None
         self.running = False
         self.baudrate = 19200
         self.protocol = ProtocolHandler()
         self.data_logger = DataLogger()
         
-        # États améliorés
-        self.awaiting_response = False
-        self.current_command = None
-        self.response_buffer = bytearray()
-        self.status_parsing_state = "WAITING_START"  # WAITING_START, IN_DATA, WAITING_ACK
+        # Boucle d'E/S, créée à la connexion
+        self.io = None
         
-        # Timeout
-        self.command_start_time = None
-        self.timeout_duration = 10  # 10 secondes par défaut
+        # Démarrage du périphérique
+        self.device_boot_delay = 10  # secondes
+        self.device_ready = False
+        self._startup = None  # HELLO différé (TimerHandle de la boucle)
         
         self.setup_logging()
+        
+        # Une seule commande en vol, la suivante part dès la réponse
+        self.transport = SerialTransport(None, data_logger=self.data_logger,
+                                         on_sample=self.data_received.emit,
+                                         on_raw=self.raw_data_received.emit,
+                                         on_done=self._command_done, logger=self.logger)
     
     def setup_logging(self):
-        import logging
-        self.logger = logging.getLogger('SerialWorker')
-        self.logger.setLevel(logging.DEBUG)
-        
-        handler = logging.FileHandler('serial_corrected.log', mode='w')
-        handler.setLevel(logging.DEBUG)
-        
-        formatter = logging.Formatter(
-            '%(asctime)s.%(msecs)03d - STATE:%(state)s - %(message)s',
-            datefmt='%H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        
+        # Fichier serial_corrected.log et trace DEBUG : voir log_config
+        self.logger = StateLoggerAdapter(logging.getLogger(SERIAL_LOGGER), lambda: self.decoder.state)
         self.logger.info("SerialWorker corrigé initialisé", extra={'state': 'INIT'})
     
-    def _log_with_state(self, message, level=logging.INFO):
-        """Log avec l'état courant"""
-        self.logger.log(level, message, extra={'state': self.status_parsing_state})
+    def _log_with_state(self, message, level=logging.INFO, *args):
+        """Log avec l'état courant ; message formaté avec args seulement si le niveau est actif"""
+        self.logger.log(level, message, *args)
+    
+    @property
+    def commands(self):
+        return self.transport.commands
+    
+    @property
+    def decoder(self):
+        return self.transport.decoder  # IDLE, HELLO, IN_DATA, WAITING_ACK
+    
+    @property
+    def serial_port(self):
+        return self.transport.serial_port
+    
+    @property
+    def awaiting_response(self):
+        """Une commande attend sa réponse"""
+        return self.commands.current is not None
+    
+    @property
+    def current_command(self):
+        """Nom de la commande en vol, ou None"""
+        current = self.commands.current
+        return current.name if current is not None else None
+    
+    @property
+    def is_device_ready(self):
+        """Port ouvert et délai de démarrage du périphérique écoulé"""
+        return self.running and self.device_ready and self.transport.is_open
     
     def connect(self, port, baudrate=19200):
-        """Connexion simple"""
+        """Ouvre le port dans la boucle d'E/S ; HELLO puis STATUS après device_boot_delay"""
+        self.transport.port_name = port
+        self.transport.baudrate = baudrate
+        self.baudrate = baudrate
+        self.running = True
+        self.io = EventLoopThread("SerialIO")
         try:
-            self.serial_port = serial.Serial(
-                port=port,
-                baudrate=baudrate,
-                timeout=0.1,
-                write_timeout=2.0
-            )
-            self.baudrate = baudrate
-            self.running = True
-            
-            # Démarrer la lecture
-            self.read_thread = threading.Thread(target=self.read_data, daemon=True)
-            self.read_thread.start()
-            
-            # Attendre le démarrage puis envoyer HELLO
-            threading.Thread(target=self._delayed_startup, daemon=True).start()
-            
-            self.status_update.emit(f"Connecté à {port}. Attente démarrage...")
-            return True
-            
+            self.io.submit(self._open()).result()
         except Exception as e:
-            self._log_with_state(f"Erreur connexion: {e}", logging.ERROR)
+            self.running = False
+            self.io.stop()
+            self.io = None
+            self._log_with_state("Erreur connexion: %s", logging.ERROR, e)
             self.status_update.emit(f"Erreur: {e}")
             return False
+        
+        self.status_update.emit(f"Connecté à {port}. Attente démarrage...")
+        return True
+    
+    async def _open(self):
+        await self.transport.open()
+        self.data_logger.start_new_session()
+        # Attendre le démarrage du périphérique puis envoyer HELLO
+        self._startup = self.transport.loop.call_later(self.device_boot_delay, self._device_started)
     
-    def _delayed_startup(self):
-        """Procédure de démarrage avec délai"""
-        time.sleep(10)  # Attendre le démarrage du périphérique
-        if self.running:
-            self._log_with_state("Envoi HELLO après démarrage")
-            self.send_hello()
-            time.sleep(5.0)
-            self._log_with_state("Envoi STATUS après démarrage")
-            self.request_status()
+    def _device_started(self):
+        """Procédure de démarrage après le délai (thread de la boucle)"""
+        self._startup = None
+        self.device_ready = True
+        # STATUS part dès la réponse à HELLO
+        self._log_with_state("Envoi HELLO puis STATUS après démarrage")
+        self.send_hello()
+        self.request_status()
     
     def send_hello(self):
         """Envoie HELLO"""
-        self._send_command(b'\x30', "HELLO")
+        return self._send_command(b'\x30', "HELLO")
     
     def send_delta_temp(self, value):
         """Envoie SET DELTA TEMP"""
@@ -117,8 +152,8 @@ class SerialWorker(QObject):
             cmd = self.protocol.create_delta_command(value)
             return self._send_command(cmd, "DELTA")
         except ValueError as e:
-            self._log_with_state(f"Erreur DELTA: {e}", logging.ERROR)
-            return False
+            self._log_with_state("Erreur DELTA: %s", logging.ERROR, e)
+            return self._failed(e)
     
     def send_dew_offset(self, value):
         """Envoie SET OFFSET"""
@@ -126,316 +161,88 @@ class SerialWorker(QObject):
             cmd = self.protocol.create_offset_command(value)
             return self._send_command(cmd, "OFFSET")
         except ValueError as e:
-            self._log_with_state(f"Erreur OFFSET: {e}", logging.ERROR)
-            return False
+            self._log_with_state("Erreur OFFSET: %s", logging.ERROR, e)
+            return self._failed(e)
     
     def send_mode(self, is_maxi=True, value=255):
         """Envoie SET MODE"""
         cmd = self.protocol.create_mode_command(is_maxi, value)
         cmd_name = "FULL" if is_maxi else "REGUL"
-        self._send_command(cmd, cmd_name)
+        return self._send_command(cmd, cmd_name)
     
     def request_status(self):
-        """Envoie STATUS avec parsing d'état"""
-        self._send_command(b'\x38', "STATUS")
+        """Envoie STATUS ; une requête déjà en attente d'envoi n'est pas dupliquée"""
+        return self._send_command(b'\x38', "STATUS", coalesce=True)
 
     def send_save(self):
         """Envoie SAVE avec parsing d'état"""
-        self._send_command(b'\x39', "SAVE")
+        return self._send_command(b'\x39', "SAVE")
 
-    def _send_command(self, cmd_bytes, cmd_name):
-        """Envoie une commande"""
-        if not self.serial_port or not self.serial_port.is_open:
-            self._log_with_state("Port série non ouvert", logging.ERROR)
-            return False
-        
-        # Si une commande est en cours, attendre
-        if self.awaiting_response:
-            self._log_with_state(f"Impossible d'envoyer {cmd_name}: commande en cours", logging.WARNING)
-            return False
-        
-        try:
-            # Petit délai avant envoi
-            time.sleep(0.1)
-            
-            # Réinitialiser l'état de parsing
-            self.status_parsing_state = "WAITING_START" if cmd_name == "STATUS" else "IDLE"
-            self.response_buffer.clear()
-            
-            # Envoyer la commande
-            self._log_with_state(f"Envoi {cmd_name}: {cmd_bytes.hex()}")
-            self.serial_port.write(cmd_bytes)
-            self.serial_port.flush()
-            
-            # Configurer l'attente
-            self.awaiting_response = True
-            self.current_command = cmd_name
-            self.command_start_time = time.time()
-            
-            self.status_update.emit(f"{cmd_name} envoyé")
-            self.data_logger.log_raw_data(cmd_bytes, direction="TX")
-            
-            return True
-            
-        except Exception as e:
-            error_msg = f"Erreur envoi {cmd_name}: {str(e)}"
-            self._log_with_state(error_msg, logging.ERROR)
-            self.status_update.emit(error_msg)
-            return False
-    
-    def read_data(self):
-        """Lecture des données avec machine à états"""
-        self._log_with_state("Démarrage lecture")
-        
-        while self.running and self.serial_port and self.serial_port.is_open:
-            try:
-                # Lire les données disponibles
-                if self.serial_port.in_waiting:
-                    data = self.serial_port.read(self.serial_port.in_waiting)
-                    
-                    if data:
-                        self._log_with_state(f"Reçu {len(data)} octets: {data.hex()[:50]}...")
-                        self.data_logger.log_raw_data(data, direction="RX")
-                        
-                        # Émettre les données brutes pour la console
-                        self.raw_data_received.emit(data)  # <-- CORRECTION ICI
-                        
-                        # Traiter selon la commande en cours
-                        if self.awaiting_response:
-                            self.response_buffer.extend(data)
-                            self._process_received_data()
-                
-                # Vérifier le timeout
-                self._check_timeout()
-                
-                time.sleep(0.01)
-                
-            except Exception as e:
-                self._log_with_state(f"Erreur lecture: {e}", logging.ERROR)
-                time.sleep(1)
-        
-        self._log_with_state("Arrêt lecture")
-    
-    def _check_timeout(self):
-        """Vérifie si la commande courante a expiré"""
-        if self.awaiting_response and self.command_start_time:
-            elapsed = time.time() - self.command_start_time
-            
-            # Timeout plus long pour STATUS (15 secondes)
-            timeout = 15 if self.current_command == "STATUS" else 5
-            
-            if elapsed > timeout:
-                self._log_with_state(f"Timeout {self.current_command} ({elapsed:.1f}s)", logging.ERROR)
-                self.status_update.emit(f"Timeout {self.current_command}")
-                self.command_ack.emit(self.current_command, False)
-                
-                # Réinitialiser
-                self._reset_state()
-    
-    def _reset_state(self):
-        """Réinitialise l'état du worker"""
-        self.awaiting_response = False
-        self.current_command = None
-        self.status_parsing_state = "IDLE"
-        self.response_buffer.clear()
-        self.command_start_time = None
-    
-    def _process_received_data(self):
-        """Traite les données reçues selon la commande"""
-        if not self.awaiting_response:
-            return
-        
-        self._log_with_state(f"Buffer: {self.response_buffer.hex()[:100]}...")
-        
-        if self.current_command == "STATUS":
-            self._process_status_response_smart()
-        elif self.current_command == "HELLO":
-            self._process_hello_response()
-        else:  # DELTA, OFFSET, FULL, REGUL, SAVE
-            self._process_simple_response()
-    
-    def _process_status_response_smart(self):
+    def send_raw(self, data):
         """
-        Traite la réponse STATUS intelligemment
-        - Ne cherche pas 0x34 dans les données
-        - Cherche seulement [données] + 0x35 à la fin
+        Envoie des octets saisis à la main (onglet Diagnostic) par la file de
+        commandes : nommée d'après son premier octet, la commande attend sa
+        réponse comme les autres (un ordre inconnu reçoit NAK).
         """
+        if not data:
+            return self._failed(ValueError("Commande vide"))
         try:
-            # Convertir en string pour analyse
-            buffer_str = ""
-            for byte in self.response_buffer:
-                if 32 <= byte <= 126:  # Caractères ASCII imprimables
-                    buffer_str += chr(byte)
-                elif byte == 0x5B:  # '['
-                    buffer_str += '['
-                elif byte == 0x5D:  # ']'
-                    buffer_str += ']'
-                elif byte == 0x23:  # '#'
-                    buffer_str += '#'
-                else:
-                    buffer_str += f"\\x{byte:02X}"
-            
-            self._log_with_state(f"Buffer ASCII: {buffer_str[:100]}...")
-            
-            # État 1: Attente du début '['
-            if self.status_parsing_state == "WAITING_START":
-                if '[' in buffer_str:
-                    self._log_with_state("Début '[' détecté")
-                    self.status_parsing_state = "IN_DATA"
-                else:
-                    # Pas encore de début, continuer d'attendre
-                    return
-            
-            # État 2: Dans les données, attendre la fin ']'
-            if self.status_parsing_state == "IN_DATA":
-                if ']' in buffer_str:
-                    # Trouver la position du ']' dans le buffer d'octets
-                    # Nous devons trouver le byte 0x5D dans self.response_buffer
-                    for i, byte in enumerate(self.response_buffer):
-                        if byte == 0x5D:  # ']'
-                            self._log_with_state(f"Fin ']' détectée à la position {i}")
-                            
-                            # Vérifier si on a le byte suivant pour l'ACK
-                            if len(self.response_buffer) > i + 1:
-                                next_byte = self.response_buffer[i + 1]
-                                
-                                if next_byte == 0x35:  # ACK
-                                    self._log_with_state("ACK 0x35 détecté après ']'")
-                                    self._parse_and_emit_status(i)
-                                    self.command_ack.emit("STATUS", True)
-                                    self._reset_state()
-                                    return
-                                elif next_byte == 0x34:  # NAK
-                                    # C'est un vrai NAK, pas un chiffre 4
-                                    self._log_with_state("NAK 0x34 détecté après ']'", logging.ERROR)
-                                    self.command_ack.emit("STATUS", False)
-                                    self._reset_state()
-                                    return
-                                else:
-                                    self._log_with_state(f"Byte inattendu après ']': 0x{next_byte:02X}", logging.WARNING)
-                                    # Attendre plus de données
-                                    return
-                            else:
-                                # On a le ']' mais pas encore l'ACK, attendre
-                                self.status_parsing_state = "WAITING_ACK"
-                                return
-                    # Si on arrive ici, on a trouvé ']' dans la string mais pas dans les bytes? Impossible
-                    return
-            
-            # État 3: On a le ']', on attend l'ACK
-            if self.status_parsing_state == "WAITING_ACK":
-                # Trouver le dernier ']' dans le buffer
-                for i, byte in enumerate(self.response_buffer):
-                    if byte == 0x5D:  # ']'
-                        last_bracket_pos = i
-                
-                if last_bracket_pos is not None and len(self.response_buffer) > last_bracket_pos + 1:
-                    next_byte = self.response_buffer[last_bracket_pos + 1]
-                    
-                    if next_byte == 0x35:
-                        self._log_with_state("ACK 0x35 reçu après attente")
-                        self._parse_and_emit_status(last_bracket_pos)
-                        self.command_ack.emit("STATUS", True)
-                        self._reset_state()
-                    elif next_byte == 0x34:
-                        self._log_with_state("NAK 0x34 reçu après attente", logging.ERROR)
-                        self.command_ack.emit("STATUS", False)
-                        self._reset_state()
-                    # Sinon, continuer d'attendre
-            
-        except Exception as e:
-            self._log_with_state(f"Erreur traitement STATUS: {e}", logging.ERROR)
-            self._reset_state()
-    
-    def _parse_and_emit_status(self, bracket_pos):
-        """Parse et émet les données STATUS"""
-        try:
-            # Extraire les données jusqu'au ']'
-            # On sait que le buffer commence par '[' (0x5B)
-            if self.response_buffer[0] != 0x5B:
-                self._log_with_state("Buffer STATUS ne commence pas par '['", logging.ERROR)
-                return
-            
-            # Extraire les données entre '[' et ']'
-            data_bytes = self.response_buffer[1:bracket_pos]  # Exclure le ']'
-            data_str = data_bytes.decode('ascii', errors='ignore')
-            
-            self._log_with_state(f"Données STATUS brutes: {data_str}")
-            
-            # Parser selon le format: valeur#valeur#...
-            parts = data_str.split('#')
-            if len(parts) == 7:
-                parsed = {
-                    'temperature': float(parts[0]),
-                    'humidity': float(parts[1]),
-                    'tube_temperature': float(parts[2]),
-                    'dew_point': float(parts[3]),
-                    'pwm': float(parts[4]),
-                    'delta_temp': int(parts[5]),
-                    'dew_offset': int(parts[6])
-                }
-                self.data_received.emit(parsed)
-                self._log_with_state(f"STATUS parsé: {parsed}")
-            else:
-                self._log_with_state(f"Format STATUS invalide: {len(parts)} parties au lieu de 7", logging.ERROR)
-                
-        except Exception as e:
-            self._log_with_state(f"Erreur parsing STATUS: {e}", logging.ERROR)
-    
-    def _process_hello_response(self):
-        """Traite la réponse HELLO"""
+            name = Command(data[0]).name
+        except ValueError:
+            name = f"0x{data[0]:02x}"
+        return self._send_command(bytes(data), name)
+
+    @staticmethod
+    def _failed(error):
+        """Future déjà en échec (commande refusée avant envoi)"""
+        future = Future()
+        future.set_exception(error)
+        return future
+
+    def _send_command(self, cmd_bytes, cmd_name, coalesce=False):
+        """
+        Met une commande en file et renvoie un Future : résultat True (ou
+        StatusSample pour STATUS) à l'ACK, CommandRejected au NAK,
+        CommandTimeout si le délai et les renvois sont épuisés.
+        """
         try:
-            # Format attendu: 0x30 0x35 ou 0x33 0x35
-            if len(self.response_buffer) >= 2:
-                if self.response_buffer[0] == 0x30 and self.response_buffer[1] == 0x35:
-                    self._log_with_state("HELLO: Première connexion")
-                    self.status_update.emit("Première connexion établie")
-                    self.command_ack.emit("HELLO", True)
-                    self._reset_state()
-                elif self.response_buffer[0] == 0x33 and self.response_buffer[1] == 0x35:
-                    self._log_with_state("HELLO: Déjà connecté")
-                    self.status_update.emit("Déjà connecté")
-                    self.command_ack.emit("HELLO", True)
-                    self._reset_state()
-            
-            # Erreur 0x34 (attention: seul, pas dans des données)
-            elif len(self.response_buffer) >= 1 and self.response_buffer[0] == 0x34:
-                self._log_with_state("HELLO: Erreur 0x34", logging.ERROR)
-                self.command_ack.emit("HELLO", False)
-                self._reset_state()
-                
-        except Exception as e:
-            self._log_with_state(f"Erreur traitement HELLO: {e}", logging.ERROR)
-            self._reset_state()
+            future = self.transport.submit(cmd_name, cmd_bytes, coalesce)
+        except CommandError as e:
+            self._log_with_state("%s non envoyé: %s", logging.ERROR, cmd_name, e)
+            return self._failed(e)
+        if self.awaiting_response:
+            self._log_with_state("%s en file (%d en attente)", logging.DEBUG, cmd_name, len(self.commands))
+        return future
     
-    def _process_simple_response(self):
-        """Traite les réponses simples (DELTA, OFFSET, MODE)"""
-        try:
-            # Ces commandes renvoient juste 0x35 (ACK) ou 0x34 (NAK)
-            # On peut les chercher car il n'y a pas de données
-            if 0x35 in self.response_buffer:
-                self._log_with_state(f"{self.current_command}: ACK reçu")
-                self.command_ack.emit(self.current_command, True)
-                self._reset_state()
-            elif 0x34 in self.response_buffer:
-                self._log_with_state(f"{self.current_command}: NAK reçu", logging.ERROR)
-                self.command_ack.emit(self.current_command, False)
-                self._reset_state()
-                
-        except Exception as e:
-            self._log_with_state(f"Erreur traitement {self.current_command}: {e}", logging.ERROR)
-            self._reset_state()
+    def _command_done(self, pending):
+        """Commande terminée (thread de la boucle) : relais par les signaux"""
+        error = pending.future.exception()
+        if error is None:
+            if pending.name == "HELLO":
+                self.status_update.emit("Première connexion établie" if pending.future.result() else "Déjà connecté")
+        elif not isinstance(error, CommandRejected):
+            self.status_update.emit(str(error))  # délai dépassé ou erreur d'envoi
+        self.command_ack.emit(pending.name, error is None)
     
     def disconnect(self):
         """Déconnexion"""
         self._log_with_state("Déconnexion")
         self.running = False
-        
-        if self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
+        self.device_ready = False
+        if self.io is not None:
+            self.io.submit(self._close()).result()
+            self.io.stop()
+            self.io = None
+        self.data_logger.stop_logging()
         
         self.status_update.emit("Déconnecté")
-        
+    
+    async def _close(self):
+        if self._startup is not None:
+            self._startup.cancel()
+            self._startup = None
+        await self.transport.close()
+    
     def _attempt_reconnect(self):
         """Tente de se reconnecter"""
         if self.serial_port and self.serial_port.port:
@@ -454,39 +261,66 @@ class SerialWorker(QObject):
         return self.data_logger.export_logs(directory)
 
 class MainWindow(QMainWindow):
+    variables_sent = pyqtSignal(bool)  # fin de l'envoi DELTA/OFFSET
+    status_polled = pyqtSignal(object, float)  # Future du STATUS automatique, aller-retour (s)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Contrôleur de Buée avec Anneau Chauffant - Protocole Binaire")
         self.setGeometry(100, 100, 1400, 900)
         
-        # Initialisation des données
-        self.plot_data = {
-            'temperature': deque(maxlen=1000),
-            'humidity': deque(maxlen=1000),
-            'tube_temperature': deque(maxlen=1000),
-            'dew_point': deque(maxlen=1000),
-            'pwm': deque(maxlen=1000),
-            'delta_temp': deque(maxlen=1000),
-            'dew_offset': deque(maxlen=1000)
+        # Historique en colonnes (temps monotone en s), créé au premier échantillon
+        self._history = None
+        
+        # Onglets construits à leur première ouverture (page -> fonction de construction)
+        self._lazy_tabs = {}
+        self.multi_plot = None
+        self.dashboard = None
+        self.status_interval = 30  # s, période STATUS de base (onglet Graphiques)
+        self.auto_status = True    # requête STATUS automatique (onglet Configuration)
+        self.stats_labels = {}
+        self.metrics_table = None
+        self.diagnostic_stats = {
+            'sent_count': 0,
+            'received_count': 0,
+            'error_count': 0,
+            'timeout_count': 0,
+            'last_command': '',
+            'last_response': ''
         }
-        self.timestamps = deque(maxlen=1000)
+        
+        # Configuration du logging
+        self.setup_logging()
         
         # Initialiser le worker série
         self.serial_worker = SerialWorker()
-        self.worker_thread = QThread()
+        
+        # Sonde de retard de la boucle d'événements (métrique gui_event_loop_lag_seconds)
+        # et rafraîchissement des métriques : actifs seulement si un appareil est
+        # connecté ou l'onglet Diagnostic affiché (voir _update_background_timers)
+        self.lag_timer = QTimer(self)
+        self.lag_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.lag_timer.timeout.connect(self._probe_event_loop)
+        self._lag_expected = 0.0
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics_view)
         
         # Configuration de l'interface
         self.init_ui()
-        self.init_serial_thread()
+        self.connect_serial_signals()
+        self.variables_sent.connect(self._on_commands_sent)
         self.refresh_ports()
         
-        # Timer pour les mises à jour automatiques
-        self.status_timer = QTimer()
-        self.status_timer.timeout.connect(self.auto_request_status)
-        self.status_timer.start(5000)  # Toutes les 5 secondes
+        # Requêtes STATUS automatiques : une seule à la fois, période adaptative
+        self.status_scheduler = StatusScheduler(self.status_interval)
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.timeout.connect(self.poll_status)
+        self.status_polled.connect(self._on_status_polled)
+        self._status_polling = False
+        self._status_future = None
+        self.status_period_label = QLabel("")  # période effective (onglet Graphiques)
         
-        # Configuration du logging
-        self.setup_logging()
         # Ajouter un indicateur de statut de connexion
         self.connection_status = QLabel("Non connecté")
         self.connection_status.setStyleSheet("""
@@ -513,14 +347,40 @@ class MainWindow(QMainWindow):
         # Ajouter à la barre de statut
         #self.status_bar.addWidget(self.connection_status)
         
-        # Timer pour les requêtes automatiques
-        self.auto_status_timer = QTimer()
-        self.auto_status_timer.timeout.connect(self.auto_request_status)
-        
         # Configuration des délais
         self.device_boot_time = 12  # secondes
         self.command_delay = 5      # secondes
         
+    def _update_background_timers(self):
+        """Démarre ou arrête la sonde de retard et le rafraîchissement des métriques"""
+        diagnostic = self.tab_widget.currentWidget() is self.diagnostic_page
+        if diagnostic != self.metrics_timer.isActive():
+            if diagnostic:
+                self.metrics_timer.start(METRICS_REFRESH_INTERVAL)
+            else:
+                self.metrics_timer.stop()
+        probe = diagnostic or self.serial_worker.running
+        if probe != self.lag_timer.isActive():
+            if probe:
+                self._lag_expected = time.perf_counter() + LAG_PROBE_INTERVAL / 1000
+                self.lag_timer.start(LAG_PROBE_INTERVAL)
+            else:
+                self.lag_timer.stop()
+    
+    def _probe_event_loop(self):
+        """Mesure le retard du timer sur son échéance : temps où la boucle était occupée"""
+        now = time.perf_counter()
+        metrics.GUI_LAG_SECONDS.observe(max(0.0, now - self._lag_expected))
+        self._lag_expected = now + LAG_PROBE_INTERVAL / 1000
+    
+    @property
+    def history(self):
+        """Historique des échantillons ; numpy n'est chargé qu'à la première utilisation"""
+        if self._history is None:
+            from ring_buffer import ColumnarRingBuffer
+            self._history = ColumnarRingBuffer(HISTORY_CAPACITY, STATUS_FIELDS)
+        return self._history
+    
     def toggle_connection(self):
         """Connecte/Déconnecte avec gestion des délais"""
         if self.serial_worker.serial_port and self.serial_worker.serial_port.is_open:
@@ -530,7 +390,8 @@ class MainWindow(QMainWindow):
             self.connection_status.setText("Non connecté")
             self.connection_status.setProperty("status", "disconnected")
             self.connection_status.style().polish(self.connection_status)
-            self.auto_status_timer.stop()
+            self.stop_status_polling()
+            self._update_background_timers()
             
         else:
             # Connexion
@@ -555,6 +416,7 @@ class MainWindow(QMainWindow):
             
             # Réactiver le bouton
             self.connect_btn.setEnabled(True)
+            self._update_background_timers()
             
             # Démarrer le timer pour vérifier quand le périphérique est prêt
             QTimer.singleShot(11000, self._check_device_ready)  # 11s pour être sûr
@@ -571,15 +433,16 @@ class MainWindow(QMainWindow):
             self.connection_status.style().polish(self.connection_status)
             
             # Démarrer les requêtes automatiques de STATUS
-            self.auto_status_timer.start(10000)  # Toutes les 10 secondes
-        else:
-            # Réessayer dans 1 seconde
+            self.start_status_polling()
+        elif self.serial_worker.running:
+            # Réessayer dans 1 seconde (sauf si déconnecté entre-temps)
             QTimer.singleShot(1000, self._check_device_ready)
     
     def update_status_bar(self, message):
         """Met à jour la barre de statut avec indication de temporisation"""
         # Afficher le message
-        self.status_bar.showMessage(message, 5000)
+        self.status_bar.showMessage(message, 3000)
+        self.logger.info(message)
         
         # Si c'est un message d'attente, l'afficher dans l'indicateur de connexion
         if "Attente" in message or "waiting" in message.lower():
@@ -600,19 +463,15 @@ class MainWindow(QMainWindow):
         delta = self.delta_spin.value()
         offset = self.offset_spin.value()
         
-        # Envoyer dans un thread séparé
-        def send_commands():
-            # Envoyer DELTA
-            success1 = self.serial_worker.send_delta_temp(delta)
-            time.sleep(0.5)  # Petit délai entre les commandes
-            
-            # Envoyer OFFSET
-            success2 = self.serial_worker.send_dew_offset(offset)
-            
-            # Réactiver le bouton
-            QTimer.singleShot(0, lambda: self._on_commands_sent(success1 and success2))
+        # OFFSET part dès l'ACK de DELTA ; la file garantit l'ordre des réponses
+        futures = (self.serial_worker.send_delta_temp(delta),
+                   self.serial_worker.send_dew_offset(offset))
+        
+        def on_done(_):
+            # Appelé dans le thread de la boucle d'E/S : retour au thread GUI par signal
+            self.variables_sent.emit(all(f.exception() is None for f in futures))
         
-        threading.Thread(target=send_commands, daemon=True).start()
+        futures[-1].add_done_callback(on_done)
     
     def _on_commands_sent(self, success):
         """Callback après envoi des commandes"""
@@ -624,45 +483,55 @@ class MainWindow(QMainWindow):
         else:
             self.status_bar.showMessage("Erreur lors de l'envoi des commandes", 3000)
     
-    def auto_request_status(self):
-        """Requête automatique de STATUS avec vérification"""
-        if (self.serial_worker.serial_port and 
-            self.serial_worker.serial_port.is_open and
-            self.serial_worker.is_device_ready and
-            self.auto_status_check.isChecked()):
-            
-            # Vérifier qu'aucune autre commande n'est en cours
-            if not self.serial_worker.awaiting_response:
-                self.serial_worker.request_status()
-            else:
-                self.logger.debug("STATUS automatique reporté: commande en cours")
+    def start_status_polling(self):
+        """Démarre les requêtes STATUS automatiques (périphérique prêt)"""
+        self._status_polling = True
+        self.status_scheduler.reset()
+        self._arm_status_timer(self.status_scheduler.next_delay)
+    
+    def stop_status_polling(self):
+        """Arrête les requêtes STATUS automatiques (déconnexion)"""
+        self._status_polling = False
+        self.status_timer.stop()
+    
+    def _arm_status_timer(self, delay):
+        self.status_timer.start(int(delay * 1000))
+        self.status_period_label.setText(f"(actuel : {self.status_scheduler.next_delay:.1f} s)")
+    
+    def poll_status(self):
+        """Requête STATUS automatique ; la suivante est programmée à la réponse"""
+        if not (self._status_polling and self.auto_status and self.serial_worker.is_device_ready):
+            return
+        if self._status_future is not None and not self._status_future.done():
+            return  # réponse attendue : _on_status_polled reprogrammera
+        sent = time.monotonic()
+        self._status_future = future = self.serial_worker.request_status()
+        # Appelé dans le thread de la boucle d'E/S : retour au thread GUI par signal
+        future.add_done_callback(lambda f: self.status_polled.emit(f, time.monotonic() - sent))
+    
+    def _on_status_polled(self, future, round_trip):
+        """Réponse (ou échec) du STATUS automatique : programme le suivant"""
+        if not self._status_polling or not self.auto_status:
+            return
+        sample = future.result() if future.exception() is None else None
+        if sample is not None:
+            delay = self.status_scheduler.on_sample(sample, round_trip)
+        else:
+            delay = self.status_scheduler.on_failure()
+        # Délai compté depuis l'envoi
+        self._arm_status_timer(max(0.0, delay - round_trip))
     
     def setup_logging(self):
-        """Configure le système de logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('app.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Configure le système de logging (app.log, console, trace série) avant la création du worker"""
+        configure_logging(logging.INFO, 'app.log')
         self.logger = logging.getLogger(__name__)
     
-    def init_serial_thread(self):
-        """Initialise le thread pour la communication série"""
-        self.serial_worker.moveToThread(self.worker_thread)
-        
-        # Connexion des signaux
+    def connect_serial_signals(self):
+        """Relie les signaux du worker série, émis depuis sa boucle d'E/S (connexions en file)"""
         self.serial_worker.data_received.connect(self.update_display)
         self.serial_worker.status_update.connect(self.update_status_bar)
         self.serial_worker.raw_data_received.connect(self.update_raw_console)
         self.serial_worker.command_ack.connect(self.handle_command_ack)
-        
-        self.worker_thread.start()
-        
-        # Démarrer la lecture dans le thread
-        QTimer.singleShot(100, self.serial_worker.read_data)
     
     def init_ui(self):
         """Initialise l'interface utilisateur"""
@@ -670,26 +539,53 @@ class MainWindow(QMainWindow):
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
         
-        # Onglet 1: Contrôle principal
+        # Onglet 1: Contrôle principal (seul onglet construit au démarrage)
         self.create_control_tab()
         
         # Onglet 2: Graphiques
-        self.create_plots_tab()
+        self.add_lazy_tab("Graphiques", self.create_plots_tab)
         
         # Onglet 3: Journalisation
-        self.create_logging_tab()
+        self.add_lazy_tab("Journalisation", self.create_logging_tab)
         
         # Onglet 4: Configuration
-        self.create_config_tab()
+        self.add_lazy_tab("Configuration", self.create_config_tab)
     
         # Onglet 5: Diagnostics
-        self.create_diagnostic_tab()
+        self.diagnostic_page = self.add_lazy_tab("Diagnostic", self.create_diagnostic_tab)
+        
+        # Onglet 6: Plusieurs anneaux sur d'autres ports
+        self.add_lazy_tab("Multi-appareils", self.create_dashboard_tab)
+        self.tab_widget.currentChanged.connect(self.ensure_tab)
+        self.tab_widget.currentChanged.connect(self._update_background_timers)
         
         # Barre de statut
         self.status_bar = self.statusBar()
         self.status_label = QLabel("Prêt")
         self.status_bar.addPermanentWidget(self.status_label)
     
+    def add_lazy_tab(self, title, builder):
+        """
+        Ajoute un onglet vide, rempli par builder(page) à sa première ouverture
+        (ou par ensure_tab) : pyqtgraph et les graphiques ne coûtent rien au
+        démarrage tant que l'onglet n'est pas affiché.
+        """
+        page = QWidget()
+        self.tab_widget.addTab(page, title)
+        self._lazy_tabs[page] = builder
+        return page
+    
+    def ensure_tab(self, index):
+        """Construit l'onglet d'indice index s'il ne l'est pas encore"""
+        builder = self._lazy_tabs.pop(self.tab_widget.widget(index), None)
+        if builder is not None:
+            builder(self.tab_widget.widget(index))
+    
+    def ensure_all_tabs(self):
+        """Construit tous les onglets (sauvegarde/chargement de la configuration)"""
+        for index in range(self.tab_widget.count()):
+            self.ensure_tab(index)
+    
     def create_control_tab(self):
         """Crée l'onglet de contrôle principal"""
         control_tab = QWidget()
@@ -813,22 +709,22 @@ class MainWindow(QMainWindow):
         for i, (label, key, unit) in enumerate(status_fields):
             status_layout.addWidget(QLabel(f"{label}:"), i, 0)
             value_label = QLabel("--")
-            value_label.setStyleSheet("font: 12pt; padding: 2px;")
+            value_label.setObjectName("value")
             value_label.setMinimumWidth(80)
             self.status_labels[key] = value_label
             status_layout.addWidget(value_label, i, 1)
             status_layout.addWidget(QLabel(unit), i, 2)
         
         status_group.setLayout(status_layout)
+        # Une feuille de style pour le groupe plutôt qu'une par label : analysée une seule fois
+        status_group.setStyleSheet("QLabel#value { font: 12pt; padding: 2px; }")
         
         # Console HEX
         console_group = QGroupBox("Console HEX")
         console_layout = QVBoxLayout()
         
-        self.hex_console = QTextEdit()
-        self.hex_console.setReadOnly(True)
+        self.hex_console = HexConsole(max_lines=100)
         self.hex_console.setMaximumHeight(150)
-        self.hex_console.setFont(QFont("Courier", 9))
         
         console_layout.addWidget(self.hex_console)
         console_group.setLayout(console_layout)
@@ -841,13 +737,14 @@ class MainWindow(QMainWindow):
         
         self.tab_widget.addTab(control_tab, "Contrôle")
     
-    def create_plots_tab(self):
+    def create_plots_tab(self, plots_tab):
         """Crée l'onglet des graphiques"""
-        plots_tab = QWidget()
+        from realtime_plots import MultiPlotWidget
         layout = QVBoxLayout(plots_tab)
         
-        # Widget avec plusieurs graphiques
-        self.multi_plot = MultiPlotWidget()
+        # Widget avec plusieurs graphiques, rempli avec l'historique déjà reçu
+        self.multi_plot = MultiPlotWidget(self.history.capacity)
+        self.multi_plot.update_data(self.history)
         layout.addWidget(self.multi_plot)
         
         # Contrôles des graphiques
@@ -858,10 +755,13 @@ class MainWindow(QMainWindow):
         controls_layout.addWidget(QLabel("Intervalle STATUS:"))
         self.update_interval = QSpinBox()
         self.update_interval.setRange(1, 30)
-        self.update_interval.setValue(30)
+        self.update_interval.setValue(self.status_interval)
         self.update_interval.setSuffix(" s")
+        self.update_interval.setToolTip("Période de base : raccourcie pendant un épisode de buée, "
+                                        "allongée quand les mesures sont stables")
         self.update_interval.valueChanged.connect(self.update_status_interval)
         controls_layout.addWidget(self.update_interval)
+        controls_layout.addWidget(self.status_period_label)
         
         # Bouton pause
         self.pause_plots_btn = QPushButton("Pause Graphiques")
@@ -882,12 +782,9 @@ class MainWindow(QMainWindow):
         controls_layout.addStretch()
         
         layout.addWidget(controls_frame)
-        
-        self.tab_widget.addTab(plots_tab, "Graphiques")
     
-    def create_logging_tab(self):
+    def create_logging_tab(self, logging_tab):
         """Crée l'onglet de journalisation"""
-        logging_tab = QWidget()
         layout = QVBoxLayout(logging_tab)
         
         # Configuration logging
@@ -906,7 +803,7 @@ class MainWindow(QMainWindow):
         # Format de log
         config_layout.addWidget(QLabel("Format:"), 1, 0)
         self.log_format_combo = QComboBox()
-        self.log_format_combo.addItems(["CSV", "JSON", "Les deux"])
+        self.log_format_combo.addItems(["CSV", "JSON", "Les deux", "Binaire (.npy)"])
         config_layout.addWidget(self.log_format_combo, 1, 1)
         
         # Niveau de log
@@ -915,10 +812,14 @@ class MainWindow(QMainWindow):
         self.log_level_combo.addItems(["DEBUG", "INFO", "WARNING", "ERROR"])
         config_layout.addWidget(self.log_level_combo, 2, 1)
         
+        # Encodage des trames brutes dans le journal
+        self.raw_binary_check = QCheckBox("Trames RAW en binaire (sans hexadécimal)")
+        config_layout.addWidget(self.raw_binary_check, 3, 0, 1, 3)
+        
         # Bouton appliquer
         apply_btn = QPushButton("Appliquer Configuration")
         apply_btn.clicked.connect(self.apply_log_config)
-        config_layout.addWidget(apply_btn, 3, 0, 1, 3)
+        config_layout.addWidget(apply_btn, 4, 0, 1, 3)
         
         config_group.setLayout(config_layout)
         
@@ -940,12 +841,9 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(config_group)
         layout.addWidget(view_group)
-        
-        self.tab_widget.addTab(logging_tab, "Journalisation")
     
-    def create_config_tab(self):
+    def create_config_tab(self, config_tab):
         """Crée l'onglet de configuration"""
-        config_tab = QWidget()
         layout = QVBoxLayout(config_tab)
 
         # Configuration des délais
@@ -992,6 +890,7 @@ class MainWindow(QMainWindow):
         self.timeout_spin.setRange(1, 30)
         self.timeout_spin.setValue(5)
         self.timeout_spin.setSuffix(" s")
+        self.timeout_spin.valueChanged.connect(self.set_command_timeout)
         proto_layout.addRow("Timeout commande:", self.timeout_spin)
         
         # Tentatives de reconnexion
@@ -1000,9 +899,19 @@ class MainWindow(QMainWindow):
         self.reconnect_spin.setValue(3)
         proto_layout.addRow("Tentatives reconnexion:", self.reconnect_spin)
         
+        # Capacité de l'historique des graphiques
+        self.history_spin = QSpinBox()
+        self.history_spin.setRange(100, 1000000)
+        self.history_spin.setSingleStep(3600)
+        self.history_spin.setValue(self.history.capacity)
+        self.history_spin.setSuffix(" points")
+        self.history_spin.valueChanged.connect(self.resize_history)
+        proto_layout.addRow("Historique graphiques:", self.history_spin)
+        
         # Auto-status
         self.auto_status_check = QCheckBox("Requête STATUS automatique")
-        self.auto_status_check.setChecked(True)
+        self.auto_status_check.setChecked(self.auto_status)
+        self.auto_status_check.toggled.connect(self.set_auto_status)
         proto_layout.addRow(self.auto_status_check)
         
         proto_group.setLayout(proto_layout)
@@ -1026,14 +935,19 @@ class MainWindow(QMainWindow):
         layout.addWidget(save_group)
 #        layout.addWidget(delays_group)
         layout.addStretch()
-        
-        self.tab_widget.addTab(config_tab, "Configuration")
+
+    def set_command_timeout(self, seconds):
+        """Délai de réponse des commandes de réglage (HELLO, consignes, SAVE)"""
+        for name in ('HELLO', 'DELTA', 'OFFSET', 'FULL', 'REGUL', 'SAVE'):
+            self.serial_worker.commands.set_timeout(name, seconds)
 
     def apply_delays(self):
         """Applique les délais configurés"""
         self.serial_worker.device_boot_delay = self.boot_delay_spin.value()
-        self.serial_worker.command_timeout = self.cmd_delay_spin.value() + 1  # +1 pour marge
-        self.serial_worker.status_timeout = self.status_delay_spin.value() + 1
+        commands = self.serial_worker.commands
+        for name in ('HELLO', 'DELTA', 'OFFSET', 'FULL', 'REGUL', 'SAVE'):
+            commands.set_timeout(name, self.cmd_delay_spin.value() + 1)  # +1 pour marge
+        commands.set_timeout('STATUS', self.status_delay_spin.value() + 1)
         
         QMessageBox.information(self, "Délais mis à jour", 
                               f"Délais appliqués:\n"
@@ -1041,9 +955,8 @@ class MainWindow(QMainWindow):
                               f"- STATUS: {self.status_delay_spin.value()}s\n"
                               f"- Commandes: {self.cmd_delay_spin.value()}s")
 
-    def create_diagnostic_tab(self):
+    def create_diagnostic_tab(self, diag_tab):
         """Crée l'onglet de diagnostic"""
-        diag_tab = QWidget()
         layout = QVBoxLayout(diag_tab)
         
         # Section test manuel
@@ -1078,16 +991,19 @@ class MainWindow(QMainWindow):
         send_preset_btn.clicked.connect(self.send_preset_command)
         test_layout.addWidget(send_preset_btn, 1, 2)
         
+        # Trace détaillée du worker (chaque bloc reçu et chaque trame)
+        self.serial_trace_check = QCheckBox("Trace série détaillée (DEBUG, serial_corrected.log)")
+        self.serial_trace_check.toggled.connect(set_serial_trace)
+        test_layout.addWidget(self.serial_trace_check, 2, 0, 1, 3)
+        
         test_group.setLayout(test_layout)
         
         # Section analyse des réponses
         analyze_group = QGroupBox("Analyse des Réponses")
         analyze_layout = QVBoxLayout()
         
-        self.raw_log = QTextEdit()
-        self.raw_log.setReadOnly(True)
+        self.raw_log = HexConsole(max_lines=1000, show_ascii=True, milliseconds=True)
         self.raw_log.setMaximumHeight(200)
-        self.raw_log.setFont(QFont("Courier", 9))
         
         analyze_layout.addWidget(self.raw_log)
         
@@ -1115,33 +1031,52 @@ class MainWindow(QMainWindow):
         for i, (label, key) in enumerate(stats):
             stats_layout.addWidget(QLabel(f"{label}:"), i, 0)
             value_label = QLabel("0")
-            value_label.setStyleSheet("font: 10pt; background-color: #333; padding: 2px;")
+            value_label.setObjectName("value")
             self.stats_labels[key] = value_label
             stats_layout.addWidget(value_label, i, 1)
         
         stats_group.setLayout(stats_layout)
+        stats_group.setStyleSheet("QLabel#value { font: 10pt; background-color: #333; padding: 2px; }")
         
         # Bouton reset statistiques
         reset_stats_btn = QPushButton("Réinitialiser Statistiques")
         reset_stats_btn.clicked.connect(self.reset_diagnostic_stats)
         stats_layout.addWidget(reset_stats_btn, len(stats), 0, 1, 2)
         
+        # Section métriques de la chaîne série (registre metrics.REGISTRY)
+        metrics_group = QGroupBox("Métriques")
+        metrics_layout = QVBoxLayout()
+        
+        self.metrics_table = QTableWidget(0, 5)
+        self.metrics_table.setHorizontalHeaderLabels(["Métrique", "Valeur", "p50", "p95", "p99"])
+        self.metrics_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.metrics_table.verticalHeader().setVisible(False)
+        self.metrics_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        metrics_layout.addWidget(self.metrics_table)
+        
+        export_metrics_btn = QPushButton("Exporter les Métriques (JSON)")
+        export_metrics_btn.clicked.connect(self.export_metrics)
+        metrics_layout.addWidget(export_metrics_btn)
+        
+        metrics_group.setLayout(metrics_layout)
+        
         # Assemblage
         layout.addWidget(test_group)
         layout.addWidget(analyze_group)
-        layout.addWidget(stats_group)
-        
-        self.tab_widget.addTab(diag_tab, "Diagnostic")
-        
-        # Initialiser les statistiques
-        self.diagnostic_stats = {
-            'sent_count': 0,
-            'received_count': 0,
-            'error_count': 0,
-            'timeout_count': 0,
-            'last_command': '',
-            'last_response': ''
-        }
+        stats_row = QHBoxLayout()
+        stats_row.addWidget(stats_group)
+        stats_row.addWidget(metrics_group, 1)
+        layout.addLayout(stats_row)
+        self.update_diagnostic_stats()
+        self.update_metrics_view()
+    
+    def create_dashboard_tab(self, dashboard_tab):
+        """Crée l'onglet multi-appareils"""
+        from dashboard import ControllerDashboard
+        layout = QVBoxLayout(dashboard_tab)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.dashboard = ControllerDashboard()
+        layout.addWidget(self.dashboard)
 
     def send_manual_command(self):
         """Envoie une commande manuelle"""
@@ -1161,10 +1096,10 @@ class MainWindow(QMainWindow):
                     cmd_text = cmd_text[2:]
                 cmd_bytes = bytes.fromhex(cmd_text)
             
-            # Envoyer la commande
-            #self.serial_worker._send_bytes(cmd_bytes)
-            self.serial_worker.serial_port.write(cmd_bytes)
-            self.serial_worker.serial_port.flush()
+            # Envoyer la commande par la file du worker (réponse dans command_ack)
+            future = self.serial_worker.send_raw(cmd_bytes)
+            if future.done() and future.exception() is not None:
+                raise future.exception()  # refusée avant envoi (port fermé)
 
             # Mettre à jour les statistiques
             self.diagnostic_stats['sent_count'] += 1
@@ -1190,9 +1125,10 @@ class MainWindow(QMainWindow):
         }
         
         if cmd_text in cmd_map:
-            #self.serial_worker._send_bytes(cmd_map[cmd_text])
-            self.serial_worker.serial_port.write(cmd_map[cmd_text])
-            self.serial_worker.serial_port.flush()
+            future = self.serial_worker.send_raw(cmd_map[cmd_text])
+            if future.done() and future.exception() is not None:
+                self.status_bar.showMessage(f"Erreur commande: {future.exception()}", 3000)
+                return
             
             # Mettre à jour les statistiques
             self.diagnostic_stats['sent_count'] += 1
@@ -1201,26 +1137,17 @@ class MainWindow(QMainWindow):
 
     def update_raw_log(self, data):
         """Met à jour le log des données brutes"""
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        
         if isinstance(data, bytes):
-            hex_str = ' '.join(f'{b:02X}' for b in data)
-            ascii_str = ''.join(chr(b) if 32 <= b <= 126 else '.' for b in data)
-            log_entry = f"[{timestamp}] RX: {hex_str:30} | {ascii_str}\n"
+            self.raw_log.append_bytes(data)
         else:
-            log_entry = f"[{timestamp}] {data}\n"
-        
-        self.raw_log.append(log_entry)
-        
-        # Limiter la taille
-        if self.raw_log.document().lineCount() > 1000:
-            cursor = self.raw_log.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.Start)
-            cursor.select(QTextCursor.SelectionType.LineUnderCursor)
-            cursor.removeSelectedText()
+            self.raw_log.append_line(f"[{self.raw_log.timestamp()}] {data}")
 
     def update_diagnostic_stats(self):
         """Met à jour les statistiques d'affichage"""
+        # Compteurs de la chaîne série (toutes les commandes, pas seulement les manuelles)
+        self.diagnostic_stats['received_count'] = sum(counter.value for counter in metrics.FRAMES.values())
+        self.diagnostic_stats['error_count'] = metrics.COMMAND_FAILURES.value
+        self.diagnostic_stats['timeout_count'] = metrics.COMMAND_TIMEOUTS.value
         for key, label in self.stats_labels.items():
             if key in self.diagnostic_stats:
                 label.setText(str(self.diagnostic_stats[key]))
@@ -1232,7 +1159,43 @@ class MainWindow(QMainWindow):
                 self.diagnostic_stats[key] = 0
             else:
                 self.diagnostic_stats[key] = ''
-        self.update_diagnostic_stats()    
+        metrics.REGISTRY.reset()
+        self.update_diagnostic_stats()
+        self.update_metrics_view()
+    
+    def update_metrics_view(self):
+        """Recopie le registre des métriques dans le tableau de l'onglet Diagnostic"""
+        if self.metrics_table is None or not self.metrics_table.isVisible():
+            return
+        self.update_diagnostic_stats()
+        snapshot = metrics.REGISTRY.snapshot()['metrics']
+        self.metrics_table.setRowCount(len(snapshot))
+        for row, key in enumerate(sorted(snapshot)):
+            value = snapshot[key]
+            if isinstance(value, dict):  # histogramme : nombre et percentiles en ms
+                cells = [key, str(value['count'])] + [
+                    "" if value[name] is None else f"{value[name] * 1e3:.3f} ms" for name in ('p50', 'p95', 'p99')]
+            else:
+                cells = [key, str(value), "", "", ""]
+            for column, text in enumerate(cells):
+                item = self.metrics_table.item(row, column)
+                if item is None:
+                    self.metrics_table.setItem(row, column, QTableWidgetItem(text))
+                else:
+                    item.setText(text)
+    
+    def export_metrics(self):
+        """Enregistre un instantané JSON du registre des métriques"""
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Exporter les métriques", "metrics.json", "JSON Files (*.json);;All Files (*)"
+        )
+        if filename:
+            try:
+                with open(filename, 'w') as f:
+                    f.write(metrics.REGISTRY.to_json())
+                self.status_bar.showMessage(f"Métriques exportées vers {filename}", 3000)
+            except Exception as e:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export: {str(e)}")
 
     def refresh_ports(self):
         """Rafraîchit la liste des ports série disponibles"""
@@ -1245,94 +1208,56 @@ class MainWindow(QMainWindow):
         if not ports:
             self.port_combo.addItem("Aucun port détecté", "")
     
-    def toggle_connection(self):
-        """Connecte/Déconnecte du port série"""
-        if self.serial_worker.serial_port and self.serial_worker.serial_port.is_open:
-            self.serial_worker.disconnect()
-            self.connect_btn.setText("Connecter")
-            self.status_timer.stop()
-        else:
-            port = self.port_combo.currentData()
-            baudrate = int(self.baudrate_combo.currentText())
-            if port and self.serial_worker.connect(port, baudrate):
-                self.connect_btn.setText("Déconnecter")
-                self.status_timer.start(self.update_interval.value() * 1000)
-    
-    def update_display(self, data):
-        """Met à jour l'affichage avec les données reçues"""
-        timestamp = datetime.now()
-        
+    def update_display(self, sample):
+        """Met à jour l'affichage avec l'échantillon STATUS reçu"""
         # Mettre à jour les labels de statut
         for key, label in self.status_labels.items():
-            if key in data:
-                value = data[key]
-                formatted_value = f"{value:.2f}" if isinstance(value, float) else str(value)
-                if label.text() != formatted_value:
-                    label.setText(formatted_value)
-                
-                #label.setText(f"{value:.2f}" if isinstance(value, float) else str(value))
-                
-                # Ajouter aux données de graphique
-                self.plot_data[key].append(value)
+            value = getattr(sample, key)
+            formatted_value = f"{value:.2f}" if isinstance(value, float) else str(value)
+            if label.text() != formatted_value:
+                label.setText(formatted_value)
 
         # Mettre à jour les spinbox seulement si les valeurs ont changé
         # et si l'utilisateur n'est pas en train d'éditer
-        if 'delta_temp' in data:
-            delta_value = int(data['delta_temp'])
-            if delta_value != self.delta_spin.value() and not self.delta_spin.hasFocus():
-                self.delta_spin.blockSignals(True)
-                self.delta_spin.setValue(delta_value)
-                self.delta_spin.blockSignals(False)
-        
-        if 'dew_offset' in data:
-            offset_value = int(data['dew_offset'])
-            if offset_value != self.offset_spin.value() and not self.offset_spin.hasFocus():
-                self.offset_spin.blockSignals(True)
-                self.offset_spin.setValue(offset_value)
-                self.offset_spin.blockSignals(False)
-        
-        if 'pwm' in data:
-            pwm_value = int(((data['pwm']) * 100) // 255)
-            if pwm_value != self.power_spin.value() and not self.power_spin.hasFocus():
-                self.power_spin.blockSignals(True)
-                self.power_spin.setValue(pwm_value)
-                self.power_spin.blockSignals(False)
-        
-        # Ajouter le timestamp
-        self.timestamps.append(timestamp)
-        
-        # Mettre à jour les graphiques
-        if not self.pause_plots_btn.isChecked():
-            self.multi_plot.update_data(self.plot_data, list(self.timestamps))
+        delta_value = sample.delta_temp
+        if delta_value != self.delta_spin.value() and not self.delta_spin.hasFocus():
+            self.delta_spin.blockSignals(True)
+            self.delta_spin.setValue(delta_value)
+            self.delta_spin.blockSignals(False)
+        
+        offset_value = sample.dew_offset
+        if offset_value != self.offset_spin.value() and not self.offset_spin.hasFocus():
+            self.offset_spin.blockSignals(True)
+            self.offset_spin.setValue(offset_value)
+            self.offset_spin.blockSignals(False)
+        
+        pwm_value = int((sample.pwm * 100) // 255)
+        if pwm_value != self.power_spin.value() and not self.power_spin.hasFocus():
+            self.power_spin.blockSignals(True)
+            self.power_spin.setValue(pwm_value)
+            self.power_spin.blockSignals(False)
+        
+        # Ajouter à l'historique des graphiques
+        self.history.append(sample.t_ns / 1e9, sample.values())
+        
+        # Mettre à jour les graphiques (ajout incrémental du dernier point)
+        if self.multi_plot is not None and not self.pause_plots_btn.isChecked():
+            self.multi_plot.add_sample(sample)
         
         # Mettre à jour la barre de statut
-        self.status_label.setText(f"Dernière mise à jour: {timestamp.strftime('%H:%M:%S')}")
-    
-    def update_status_bar(self, message):
-        """Met à jour la barre de statut"""
-        self.status_bar.showMessage(message, 3000)
-        self.logger.info(message)
+        self.status_label.setText(f"Dernière mise à jour: {sample.timestamp.strftime('%H:%M:%S')}")
     
     def update_raw_console(self, data):
         """Affiche les données brutes en HEX"""
         if data:
-            hex_str = ' '.join(f'{b:02X}' for b in data)
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.hex_console.append(f"[{timestamp}] RX: {hex_str}")
-            
-            # Limiter la taille de la console
-            if self.hex_console.document().lineCount() > 100:
-                cursor = self.hex_console.textCursor()
-                cursor.movePosition(QTextCursor.MoveOperation.Start)
-                cursor.select(QTextCursor.SelectionType.LineUnderCursor)
-                cursor.removeSelectedText()
-                cursor.deleteChar()
+            self.hex_console.append_bytes(data)
     
     def handle_command_ack(self, command, success):
         """Gère les acquittements de commandes"""
-        color = "green" if success else "red"
         self.status_bar.showMessage(f"{command}: {'Succès' if success else 'Échec'}", 2000)
         self.logger.info(f"Commande {command}: {'succès' if success else 'échec'}")
+        self.diagnostic_stats['last_response'] = f"{command}: {'ACK' if success else 'échec'}"
+        self.update_diagnostic_stats()
     
     def send_mode_command(self):
         """Envoie la commande SET MODE"""
@@ -1340,27 +1265,37 @@ class MainWindow(QMainWindow):
         power = self.power_spin.value()
         self.serial_worker.send_mode(is_maxi, power)
     
-    def auto_request_status(self):
-        """Requête automatique de statut"""
-        if (self.serial_worker.serial_port and 
-            self.serial_worker.serial_port.is_open and
-            self.auto_status_check.isChecked()):
-            self.serial_worker.request_status()
+    def update_status_interval(self, seconds):
+        """Met à jour la période de base des requêtes STATUS"""
+        self.status_interval = seconds
+        self.status_scheduler.set_base_interval(seconds)
+        if self._status_polling and self.status_timer.isActive():
+            self._arm_status_timer(self.status_scheduler.next_delay)
     
-    def update_status_interval(self):
-        """Met à jour l'intervalle de requête STATUS"""
-        self.status_timer.setInterval(self.update_interval.value() * 1000)
+    def set_auto_status(self, enabled):
+        """Active/désactive la requête STATUS automatique"""
+        self.auto_status = enabled
+        if enabled and self._status_polling and not self.status_timer.isActive():
+            self._arm_status_timer(self.status_scheduler.next_delay)
     
     def toggle_plots_pause(self, paused):
         """Met en pause/reprend les graphiques"""
         self.pause_plots_btn.setText("Reprendre Graphiques" if paused else "Pause Graphiques")
+        if not paused:
+            # Rattraper les points reçus pendant la pause
+            self.multi_plot.update_data(self.history)
+    
+    def resize_history(self, capacity):
+        """Change la taille de l'historique et des graphiques (points les plus récents conservés)"""
+        self.history.resize(capacity)
+        if self.multi_plot is not None:
+            self.multi_plot.set_max_points(capacity, self.history)
     
     def clear_all_plots(self):
         """Efface tous les graphiques"""
-        for data in self.plot_data.values():
-            data.clear()
-        self.timestamps.clear()
-        self.multi_plot.clear_all()
+        self.history.clear()
+        if self.multi_plot is not None:
+            self.multi_plot.clear_all()
     
     def export_plot_data(self):
         """Exporte les données des graphiques"""
@@ -1372,17 +1307,16 @@ class MainWindow(QMainWindow):
                 with open(filename, 'w', newline='') as f:
                     writer = csv.writer(f)
                     # En-tête
-                    headers = ['Timestamp'] + list(self.plot_data.keys())
+                    headers = ['Timestamp'] + list(STATUS_FIELDS)
                     writer.writerow(headers)
                     
                     # Données
-                    for i, ts in enumerate(self.timestamps):
+                    points = self.history.last()
+                    offset = WALL_CLOCK_OFFSET_NS / 1e9
+                    for point in points.T:
+                        ts = datetime.fromtimestamp(point[0] + offset)
                         row = [ts.strftime("%Y-%m-%d %H:%M:%S.%f")]
-                        for key in self.plot_data.keys():
-                            if i < len(self.plot_data[key]):
-                                row.append(self.plot_data[key][i])
-                            else:
-                                row.append('')
+                        row.extend(point[1:].tolist())
                         writer.writerow(row)
                 
                 QMessageBox.information(self, "Export réussi", f"Données exportées vers {filename}")
@@ -1396,8 +1330,10 @@ class MainWindow(QMainWindow):
             self.log_dir_edit.setText(directory)
     
     def apply_log_config(self):
-        """Applique la configuration de journalisation"""
-        # Implémentation simplifiée
+        """Applique la configuration de journalisation (à partir de la prochaine session)"""
+        binary = self.log_format_combo.currentText() == "Binaire (.npy)"
+        self.serial_worker.data_logger.storage = STORAGE_NPY if binary else STORAGE_CSV
+        self.serial_worker.data_logger.raw_encoding = RAW_BINARY if self.raw_binary_check.isChecked() else RAW_HEX
         QMessageBox.information(self, "Configuration", "Configuration appliquée")
     
     def refresh_log_list(self):
@@ -1407,7 +1343,7 @@ class MainWindow(QMainWindow):
             log_dir = self.log_dir_edit.text()
             if os.path.exists(log_dir):
                 for file in os.listdir(log_dir):
-                    if file.endswith(('.csv', '.json', '.log')):
+                    if file.endswith(('.csv', '.npy', '.json', '.jsonl', '.bin', '.gz', '.zst', '.log')):
                         self.log_list.addItem(file)
         except Exception as e:
             self.logger.error(f"Erreur rafraîchissement logs: {e}")
@@ -1418,26 +1354,14 @@ class MainWindow(QMainWindow):
         log_path = os.path.join(self.log_dir_edit.text(), filename)
         
         if os.path.exists(log_path):
-            dialog = QDialog(self)
-            dialog.setWindowTitle(f"Log: {filename}")
-            dialog.resize(800, 600)
-            
-            layout = QVBoxLayout(dialog)
-            text_edit = QTextEdit()
-            text_edit.setReadOnly(True)
-            text_edit.setFont(QFont("Courier", 9))
-            
-            try:
-                with open(log_path, 'r') as f:
-                    text_edit.setText(f.read())
-            except Exception as e:
-                text_edit.setText(f"Erreur lecture: {str(e)}")
-            
-            layout.addWidget(text_edit)
-            dialog.exec()
+            from log_viewer import LogViewerDialog
+            # Fenêtre non modale : reste ouverte en mode suivi pendant l'acquisition
+            dialog = LogViewerDialog(log_path, self)
+            dialog.show()
     
     def save_configuration(self):
         """Sauvegarde la configuration"""
+        self.ensure_all_tabs()
         config = {
             'port': self.port_combo.currentData(),
             'baudrate': self.baudrate_combo.currentText(),
@@ -1449,9 +1373,11 @@ class MainWindow(QMainWindow):
             'log_directory': self.log_dir_edit.text(),
             'log_format': self.log_format_combo.currentIndex(),
             'log_level': self.log_level_combo.currentIndex(),
+            'raw_binary': self.raw_binary_check.isChecked(),
             'timeout': self.timeout_spin.value(),
             'reconnect_attempts': self.reconnect_spin.value(),
-            'auto_status': self.auto_status_check.isChecked()
+            'auto_status': self.auto_status_check.isChecked(),
+            'history_capacity': self.history_spin.value()
         }
         
         filename, _ = QFileDialog.getSaveFileName(
@@ -1478,6 +1404,7 @@ class MainWindow(QMainWindow):
                     config = json.load(f)
                 
                 # Appliquer la configuration
+                self.ensure_all_tabs()
                 self.baudrate_combo.setCurrentText(str(config.get('baudrate', '19200')))
                 self.delta_spin.setValue(config.get('delta_temp', 0))
                 self.offset_spin.setValue(config.get('dew_offset', 0))
@@ -1487,9 +1414,11 @@ class MainWindow(QMainWindow):
                 self.log_dir_edit.setText(config.get('log_directory', 'logs'))
                 self.log_format_combo.setCurrentIndex(config.get('log_format', 0))
                 self.log_level_combo.setCurrentIndex(config.get('log_level', 1))
+                self.raw_binary_check.setChecked(config.get('raw_binary', False))
                 self.timeout_spin.setValue(config.get('timeout', 5))
                 self.reconnect_spin.setValue(config.get('reconnect_attempts', 3))
                 self.auto_status_check.setChecked(config.get('auto_status', True))
+                self.history_spin.setValue(config.get('history_capacity', HISTORY_CAPACITY))
                 
                 QMessageBox.information(self, "Chargement", "Configuration chargée")
             except Exception as e:
@@ -1498,8 +1427,8 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Gère la fermeture de l'application"""
         self.serial_worker.disconnect()
-        self.worker_thread.quit()
-        self.worker_thread.wait()
+        if self.dashboard is not None:
+            self.dashboard.shutdown()
         
         # Sauvegarder l'état
         try:
@@ -0,0 +1,321 @@
+"""
+Métriques de la chaîne série : compteurs et histogrammes à faible coût,
+sans verrou sur le chemin critique, exportables en JSON ou au format texte
+Prometheus. Aucun import Qt : utilisable par le démon comme par l'interface.
+
+Chaque thread écrit dans sa propre case (dictionnaire indexé par
+threading.get_ident) : une écriture n'est jamais en concurrence avec une
+autre, et la lecture additionne les cases. Les métriques de la chaîne série
+sont déclarées en bas de ce module dans le registre partagé REGISTRY.
+"""
+import json
+import math
+import os
+import threading
+import time
+
+from protocol import Command
+
+# Histogrammes : cases logarithmiques, SUB_BUCKETS par octave à partir de
+# MIN_VALUE (erreur relative des percentiles < 1/SUB_BUCKETS)
+MIN_VALUE = 1e-6  # s
+SUB_BUCKETS = 8
+OCTAVES = 28      # jusqu'à ~270 s
+BUCKET_COUNT = 1 + OCTAVES * SUB_BUCKETS
+# Percentiles exportés
+QUANTILES = (0.5, 0.95, 0.99)
+# Bornes des cases cumulées de l'export Prometheus (s)
+PROMETHEUS_BOUNDS = (1e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0)
+
+_get_ident = threading.get_ident
+_frexp = math.frexp
+
+def _key(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+def bucket_index(value):
+    """Case d'une valeur (0 : en dessous de MIN_VALUE)"""
+    if value < MIN_VALUE:
+        return 0
+    mantissa, exponent = math.frexp(value / MIN_VALUE)  # valeur/MIN = m·2^e, m dans [0.5, 1)
+    index = 1 + (exponent - 1) * SUB_BUCKETS + int((2 * mantissa - 1) * SUB_BUCKETS)
+    return min(index, BUCKET_COUNT - 1)
+
+def bucket_upper(index):
+    """Borne supérieure de la case index"""
+    if index == 0:
+        return MIN_VALUE
+    octave, sub = divmod(index - 1, SUB_BUCKETS)
+    return MIN_VALUE * 2 ** octave * (1 + (sub + 1) / SUB_BUCKETS)
+
+class Counter:
+    """Compteur monotone ; inc() depuis n'importe quel thread, sans verrou"""
+    __slots__ = ('name', 'help', 'labels', '_cells')
+    kind = 'counter'
+
+    def __init__(self, name, help='', labels=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self._cells = {}
+
+    def inc(self, n=1):
+        cells = self._cells
+        ident = _get_ident()
+        cells[ident] = cells.get(ident, 0) + n
+
+    @property
+    def value(self):
+        return sum(list(self._cells.values()))
+
+    def reset(self):
+        self._cells = {}
+
+    def snapshot(self):
+        return self.value
+
+class _Shard:
+    """Cases d'un histogramme écrites par un seul thread"""
+    __slots__ = ('counts', 'total', 'count', 'max')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+class Histogram:
+    """
+    Distribution de durées (s) en cases logarithmiques : observe() coûte une
+    division et un frexp, les percentiles sont calculés à la lecture.
+    """
+    __slots__ = ('name', 'help', 'labels', '_shards')
+    kind = 'histogram'
+
+    def __init__(self, name, help='', labels=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self._shards = {}
+
+    def observe(self, value):
+        ident = _get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards[ident] = _Shard()
+        if value < MIN_VALUE:
+            index = 0
+        else:  # bucket_index, développé sur le chemin critique
+            mantissa, exponent = _frexp(value / MIN_VALUE)
+            index = min(1 + (exponent - 1) * SUB_BUCKETS + int((2 * mantissa - 1) * SUB_BUCKETS), BUCKET_COUNT - 1)
+        shard.counts[index] += 1
+        shard.total += value
+        shard.count += 1
+        if value > shard.max:
+            shard.max = value
+
+    def _merged(self):
+        counts = [0] * BUCKET_COUNT
+        total, count, maximum = 0.0, 0, 0.0
+        for shard in list(self._shards.values()):
+            for index, n in enumerate(shard.counts):
+                if n:
+                    counts[index] += n
+            total += shard.total
+            count += shard.count
+            maximum = max(maximum, shard.max)
+        return counts, total, count, maximum
+
+    @staticmethod
+    def _quantile(counts, count, q):
+        rank = q * count
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if n and seen >= rank:
+                return bucket_upper(index)
+        return 0.0
+
+    def quantile(self, q):
+        counts, _, count, maximum = self._merged()
+        return min(self._quantile(counts, count, q), maximum) if count else None
+
+    @property
+    def count(self):
+        return sum(shard.count for shard in list(self._shards.values()))
+
+    def reset(self):
+        self._shards = {}
+
+    def snapshot(self):
+        """{'count', 'sum', 'max', 'p50', 'p95', 'p99'} (durées en s)"""
+        counts, total, count, maximum = self._merged()
+        result = {'count': count, 'sum': total, 'max': maximum}
+        for q in QUANTILES:
+            result[f"p{round(q * 100)}"] = min(self._quantile(counts, count, q), maximum) if count else None
+        return result
+
+    def cumulative(self, bounds=PROMETHEUS_BOUNDS):
+        """Effectifs cumulés aux bornes données (approximés par les cases)"""
+        counts, total, count, _ = self._merged()
+        result = []
+        index, seen = 0, 0
+        for bound in bounds:
+            while index < BUCKET_COUNT and bucket_upper(index) <= bound:
+                seen += counts[index]
+                index += 1
+            result.append((bound, seen))
+        return result, total, count
+
+class MetricsRegistry:
+    """Ensemble de métriques nommées (avec étiquettes), créées à la première demande"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()  # création uniquement
+        self.started = time.time()
+
+    def _get(self, cls, name, help, labels):
+        key = _key(name, labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(name, help, labels)
+        return metric
+
+    def counter(self, name, help='', **labels):
+        return self._get(Counter, name, help, labels)
+
+    def histogram(self, name, help='', **labels):
+        return self._get(Histogram, name, help, labels)
+
+    def __iter__(self):
+        return iter(list(self._metrics.items()))
+
+    def reset(self):
+        for _, metric in self:
+            metric.reset()
+        self.started = time.time()
+
+    def snapshot(self):
+        """Valeurs de toutes les métriques : {'time', 'uptime', 'metrics': {clé: valeur}}"""
+        now = time.time()
+        return {'time': now, 'uptime': now - self.started,
+                'metrics': {key: metric.snapshot() for key, metric in self}}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Format texte d'exposition Prometheus (version 0.0.4)"""
+        lines = []
+        described = set()
+        for _, metric in sorted(self, key=lambda item: item[0]):
+            name = metric.name
+            if name not in described:
+                described.add(name)
+                if metric.help:
+                    lines.append(f"# HELP {name} {metric.help}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+            if metric.kind == 'counter':
+                lines.append(f"{_key(name, metric.labels)} {metric.value}")
+                continue
+            buckets, total, count = metric.cumulative()
+            for bound, seen in buckets:
+                lines.append(f"{_key(name + '_bucket', dict(metric.labels, le=repr(bound)))} {seen}")
+            lines.append(f"{_key(name + '_bucket', dict(metric.labels, le='+Inf'))} {count}")
+            lines.append(f"{_key(name + '_sum', metric.labels)} {total}")
+            lines.append(f"{_key(name + '_count', metric.labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+class PrometheusServer:
+    """Point d'accès HTTP /metrics (format texte Prometheus) dans un thread démon"""
+
+    def __init__(self, registry, port, host='127.0.0.1'):
+        import http.server  # import différé : seul le démon l'utilise
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] not in ('/', '/metrics'):
+                    handler.send_error(404)
+                    return
+                body = registry.to_prometheus().encode('utf-8')
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="PrometheusServer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class JsonSnapshotWriter:
+    """Écrit périodiquement REGISTRY.snapshot() dans un fichier JSON (remplacement atomique)"""
+
+    def __init__(self, registry, path, interval=10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="JsonSnapshotWriter", daemon=True)
+
+    def write(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(self.registry.to_json())
+        os.replace(temporary, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête l'écriture périodique après un dernier instantané"""
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+# Registre partagé et métriques de la chaîne série
+REGISTRY = MetricsRegistry()
+
+RX_BYTES = REGISTRY.counter('serial_rx_bytes_total', "Octets reçus du périphérique")
+TX_BYTES = REGISTRY.counter('serial_tx_bytes_total', "Octets envoyés au périphérique")
+FRAMES = {command: REGISTRY.counter('serial_frames_total', "Trames décodées par type", type=command.name)
+          for command in Command}
+NAKS = REGISTRY.counter('serial_naks_total', "Réponses NAK (0x34)")
+DECODE_SECONDS = REGISTRY.histogram('serial_decode_seconds', "Décodage d'un bloc reçu")
+COMMAND_TIMEOUTS = REGISTRY.counter('command_timeouts_total', "Commandes expirées (renvois compris)")
+COMMAND_FAILURES = REGISTRY.counter('command_failures_total', "Commandes en échec (NAK, envoi, timeout final)")
+LOG_WRITE_SECONDS = REGISTRY.histogram('log_write_seconds', "Écriture d'un lot de journalisation")
+RENDER_SECONDS = REGISTRY.histogram('render_seconds', "Rendu d'un graphique")
+GUI_LAG_SECONDS = REGISTRY.histogram('gui_event_loop_lag_seconds', "Retard de la boucle d'événements Qt")
+
+def command_latency(name):
+    """Histogramme des allers-retours d'une commande (envoi -> réponse)"""
+    return REGISTRY.histogram('command_latency_seconds', "Aller-retour des commandes", command=name)
+
+def count_frames(frames):
+    """Compte les trames décodées par type ; renvoie frames"""
+    for frame in frames:
+        FRAMES[frame.command].inc()
+    return frames
@@ -1,6 +1,9 @@
+import re
 import struct
+import time
 from enum import IntEnum
 from datetime import datetime
+from typing import NamedTuple
 import logging
 
 class Command(IntEnum):
@@ -14,6 +17,262 @@ class Command(IntEnum):
     FULL = 0x36
     REGUL = 0x37
     STATUS = 0x38
+    SAVE = 0x39
+
+# Taille maximale du contenu d'une réponse STATUS (au-delà : bruit, on resynchronise)
+MAX_STATUS_PAYLOAD = 128
+
+# Le buffer du décodeur n'est compacté qu'au-delà de cette quantité d'octets consommés
+COMPACT_THRESHOLD = 4096
+
+STATUS_FIELDS = (
+    'temperature', 'humidity', 'tube_temperature',
+    'dew_point', 'pwm', 'delta_temp', 'dew_offset'
+)
+# Capacité par défaut d'un historique d'échantillons : 12 h à 1 Hz (~5.5 Mo)
+HISTORY_CAPACITY = 43200
+
+# Écart entre l'horloge murale et l'horloge monotone, fixé au chargement du module
+WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+class StatusSample(NamedTuple):
+    """
+    Échantillon STATUS compact, partagé par le worker, le logger et les graphiques.
+    t_ns est un horodatage monotone (time.monotonic_ns), insensible aux
+    changements d'heure ; wall_ns/timestamp en donnent l'heure murale.
+    """
+    t_ns: int
+    temperature: float
+    humidity: float
+    tube_temperature: float
+    dew_point: float
+    pwm: float
+    delta_temp: int
+    dew_offset: int
+
+    @property
+    def wall_ns(self):
+        """Horodatage en ns depuis l'epoch"""
+        return self.t_ns + WALL_CLOCK_OFFSET_NS
+
+    @property
+    def timestamp(self):
+        """Horodatage sous forme de datetime locale"""
+        return datetime.fromtimestamp(self.wall_ns / 1e9)
+
+    def values(self):
+        """Valeurs des mesures, dans l'ordre de STATUS_FIELDS"""
+        return self[1:]
+
+class Frame(NamedTuple):
+    """Trame décodée : type et contenu (texte entre crochets pour STATUS)"""
+    command: Command
+    payload: bytes = b''
+
+    def to_bytes(self):
+        """Reconstruit les octets de la trame telle que reçue"""
+        if self.command == Command.STATUS:
+            return b'[' + self.payload + b']' + bytes([Command.RECEIVED])
+        if self.command in (Command.HELLO, Command.ALREADY_CONNECTED):
+            return bytes([self.command, Command.RECEIVED])
+        return bytes([self.command])
+
+ACK_FRAME = Frame(Command.RECEIVED)
+NAK_FRAME = Frame(Command.ERROR)
+
+class FrameDecoder:
+    """
+    Décodeur incrémental des réponses du périphérique.
+    Machine à états reprenable : chaque octet reçu n'est examiné qu'une fois,
+    quel que soit le découpage des données en morceaux.
+    - HELLO   : 0x30 0x35 (première connexion) ou 0x33 0x35 (déjà connecté)
+    - ACK/NAK : 0x35 / 0x34
+    - STATUS  : '[' t#h#tube#dew#pwm#delta#offset ']' 0x35
+    Les chiffres '4' et '5' à l'intérieur des crochets ne sont donc jamais
+    pris pour un NAK/ACK.
+
+    Les octets sont parcourus par re/bytes.find (en C) et non octet par octet.
+    Quand rien n'est en attente, les données reçues sont analysées sur place ;
+    seule une trame incomplète est conservée dans le buffer interne, lu via un
+    offset et compacté seulement lorsque la partie consommée devient grande.
+    """
+
+    IDLE = 'IDLE'
+    HELLO = 'HELLO'
+    IN_DATA = 'IN_DATA'
+    WAITING_ACK = 'WAITING_ACK'
+
+    # Octets significatifs hors trame et délimiteurs à l'intérieur d'une trame
+    _SYNC = re.compile(rb'[\x5B\x30\x33\x34\x35]')
+    _BRACKET = re.compile(rb'[\x5B\x5D]')
+    # Réponse STATUS complète, reconnue d'un seul coup à partir du '['
+    _STATUS = re.compile(rb'\[([^\x5B\x5D]{0,%d})\]([\x34\x35])' % MAX_STATUS_PAYLOAD)
+
+    def __init__(self, max_payload=MAX_STATUS_PAYLOAD):
+        self.max_payload = max_payload
+        self.state = self.IDLE
+        self.hello_byte = None
+        self.discarded = 0
+        self._buf = bytearray()
+        self._pos = 0      # prochain octet à lire dans _buf
+        self._start = 0    # début du contenu STATUS en cours dans _buf
+        self._end = 0      # position du ']' en cours dans _buf
+
+    @property
+    def payload(self):
+        """Contenu STATUS partiel en cours de réception"""
+        if self.state == self.IN_DATA:
+            return bytes(self._buf[self._start:self._pos])
+        if self.state == self.WAITING_ACK:
+            return bytes(self._buf[self._start:self._end])
+        return b''
+
+    def reset(self):
+        """Abandonne toute trame partielle"""
+        self.state = self.IDLE
+        self.hello_byte = None
+        self._buf.clear()
+        self._pos = self._start = self._end = 0
+
+    def feed(self, data):
+        """Consomme des octets et retourne la liste des trames complètes"""
+        if self._buf:
+            self._buf += data
+            src = self._buf
+        else:
+            # Rien en attente : analyse directe des données reçues
+            src = data
+            self._pos = 0
+
+        frames = self._scan(src)
+
+        # Ne conserver que la trame incomplète éventuelle
+        keep = self._start if self.state in (self.IN_DATA, self.WAITING_ACK) else self._pos
+        if src is self._buf:
+            if keep >= len(src):
+                src.clear()
+                self._pos = self._start = self._end = 0
+            elif keep >= COMPACT_THRESHOLD:
+                del src[:keep]
+                self._shift(keep)
+        else:
+            if keep < len(src):
+                self._buf += memoryview(src)[keep:]
+            self._shift(keep)
+        return frames
+
+    def _shift(self, offset):
+        """Recale les positions après suppression de `offset` octets en tête"""
+        self._pos -= offset
+        self._start -= offset
+        self._end -= offset
+
+    def _scan(self, buf):
+        """Fait avancer la machine à états sur buf à partir de self._pos"""
+        frames = []
+        pos = self._pos
+        size = len(buf)
+        max_payload = self.max_payload
+
+        while pos < size:
+            state = self.state
+
+            if state == self.IDLE:
+                match = self._SYNC.search(buf, pos)
+                if match is None:
+                    self.discarded += size - pos
+                    pos = size
+                    break
+                i = match.start()
+                self.discarded += i - pos
+                byte = buf[i]
+                pos = i + 1
+                if byte == 0x5B:  # '['
+                    match = self._STATUS.match(buf, i)
+                    if match is not None and match.end(1) - pos <= max_payload:
+                        # Cas courant : trame entière déjà disponible
+                        if match.group(2) == b'\x35':
+                            frames.append(Frame(Command.STATUS, bytes(match.group(1))))
+                        else:
+                            frames.append(NAK_FRAME)
+                        pos = match.end()
+                        continue
+                    self.state = self.IN_DATA
+                    self._start = pos
+                elif byte == Command.RECEIVED:
+                    frames.append(ACK_FRAME)
+                elif byte == Command.ERROR:
+                    frames.append(NAK_FRAME)
+                else:
+                    self.state = self.HELLO
+                    self.hello_byte = byte
+
+            elif state == self.IN_DATA:
+                match = self._BRACKET.search(buf, pos)
+                limit = match.start() if match else size
+                if limit - self._start > max_payload:
+                    # Trame trop longue : bruit, on resynchronise après la limite
+                    pos = self._start + max_payload + 1
+                    self.discarded += max_payload + 2
+                    self.state = self.IDLE
+                    continue
+                if match is None:
+                    pos = size
+                    break
+                pos = limit + 1
+                if buf[limit] == 0x5B:  # '[' : nouvelle trame, on resynchronise
+                    self.discarded += limit - self._start + 1
+                    self._start = pos
+                else:
+                    self._end = limit
+                    self.state = self.WAITING_ACK
+
+            elif state == self.WAITING_ACK:
+                byte = buf[pos]
+                self.state = self.IDLE
+                if byte == Command.RECEIVED:
+                    frames.append(Frame(Command.STATUS, bytes(buf[self._start:self._end])))
+                    pos += 1
+                elif byte == Command.ERROR:
+                    frames.append(NAK_FRAME)
+                    pos += 1
+                else:
+                    # ']' non suivi d'un acquittement : trame corrompue
+                    self.discarded += self._end - self._start + 2
+
+            else:  # HELLO
+                byte = buf[pos]
+                self.state = self.IDLE
+                if byte == Command.RECEIVED:
+                    frames.append(Frame(Command(self.hello_byte)))
+                    pos += 1
+                else:
+                    self.discarded += 1
+                self.hello_byte = None
+
+        self._pos = pos
+        return frames
+
+def parse_status_payload(payload, t_ns=None):
+    """
+    Convertit le contenu d'une réponse STATUS (sans crochets) en StatusSample.
+    Lève ValueError si le format est invalide.
+    """
+    if not isinstance(payload, str):
+        payload = bytes(payload).decode('ascii', errors='ignore')
+    parts = payload.split('#')
+    if len(parts) != len(STATUS_FIELDS):
+        raise ValueError(f"{len(parts)} parties au lieu de {len(STATUS_FIELDS)}")
+    return StatusSample(
+        time.monotonic_ns() if t_ns is None else t_ns,
+        float(parts[0]),
+        float(parts[1]),
+        float(parts[2]),
+        float(parts[3]),
+        float(parts[4]),
+        int(parts[5]),
+        int(parts[6])
+    )
 
 class ProtocolHandler:
     """Gestionnaire du protocole binaire"""
@@ -21,11 +280,8 @@ class ProtocolHandler:
     def __init__(self):
         self.connection_status = None
         self.last_command = None
-        self.response_buffer = bytearray()
-        self.in_status_response = False
-        self.status_buffer = ""
         self.logger = logging.getLogger(__name__)
-        self.buffer = bytearray()
+        self.decoder = FrameDecoder()
     
     def create_hello_command(self):
         """Crée la commande HELLO (0x30)"""
@@ -70,93 +326,48 @@ class ProtocolHandler:
         return bytes([Command.STATUS])
     
     def feed(self, data):
-        """Ajoute des données au buffer et retourne une liste de trames complètes."""
-        self.buffer.extend(data)
-        frames = []
-        while True:
-            frame = self._extract_frame()
-            if frame is None:
-                break
-            frames.append(frame)
-        return frames
-    
-    def _extract_frame(self):
-        """Extrait une trame du buffer si une trame complète est disponible."""
-        # Cherche la séquence de fin de trame pour STATUS
-        idx = self.buffer.find(b']\x35')
-        if idx != -1:
-            frame = self.buffer[:idx+2]
-            self.buffer = self.buffer[idx+2:]
-            self.logger.debug(f"Extracted STATUS frame: {frame.hex()}")
-            return frame
-        
-        # Cherche un acquittement simple (0x35 ou 0x34)
-        for i, byte in enumerate(self.buffer):
-            if byte in (0x35, 0x34):
-                frame = self.buffer[:i+1]
-                self.buffer = self.buffer[i+1:]
-                self.logger.debug(f"Extracted ACK/ERROR frame: {frame.hex()}")
-                return frame
-        
-        # Aucune trame complète trouvée
-        return None
+        """Ajoute des données au décodeur et retourne la liste des trames complètes."""
+        return self.decoder.feed(data)
     
     def parse_response(self, frame):
         """
-        Parse une trame complète.
-        Retourne (commande, données_parsées)
+        Parse une trame complète (Frame ou octets bruts).
+        Retourne (commande, données_parsées) ; StatusSample pour une réponse
+        STATUS, ValueError si son format est invalide.
         """
-        self.logger.debug(f"Parsing frame: {frame.hex()}")
+        if not isinstance(frame, Frame):
+            frames = FrameDecoder().feed(frame)
+            if len(frames) != 1:
+                self.logger.warning(f"Unknown frame: {bytes(frame).hex()}")
+                return None, {'raw': frame}
+            frame = frames[0]
         
         # Acquittement simple
-        if frame == bytes([Command.RECEIVED]):
+        if frame.command == Command.RECEIVED:
             return Command.RECEIVED, {'ack': True}
         
         # Erreur simple
-        if frame == bytes([Command.ERROR]):
+        if frame.command == Command.ERROR:
             return Command.ERROR, {'ack': False, 'error': True}
         
-        # Réponse HELLO (0x30 0x05 ou 0x33 0x05)
-        if len(frame) == 2 and frame[0] in (Command.HELLO, Command.ALREADY_CONNECTED) and frame[1] == 0x05:
-            return Command.HELLO, {'first_connection': (frame[0] == Command.HELLO)}
+        # Réponse HELLO (0x30 0x35 ou 0x33 0x35)
+        if frame.command in (Command.HELLO, Command.ALREADY_CONNECTED):
+            return Command.HELLO, {'first_connection': (frame.command == Command.HELLO)}
         
         # Réponse STATUS
-        if frame.startswith(b'[') and frame.endswith(b']\x35'):
-            # Extraire la chaîne entre crochets
-            status_str = frame[1:-2].decode('ascii', errors='ignore')
-            parsed = self._parse_status_response('[' + status_str + ']')
-            return Command.STATUS, parsed
-        
-        # Si on arrive ici, on ne sait pas parser
-        self.logger.warning(f"Unknown frame: {frame.hex()}")
-        return None, {'raw': frame}
+        status_str = frame.payload.decode('ascii', errors='ignore')
+        return Command.STATUS, self._parse_status_response('[' + status_str + ']')
     
     def _parse_status_response(self, status_str):
-        """Parse la chaîne de statut."""
+        """Parse la chaîne de statut en StatusSample ; lève ValueError si le format est invalide."""
+        if status_str.startswith('[') and status_str.endswith(']'):
+            content = status_str[1:-1]
+        else:
+            content = status_str
         try:
-            if status_str.startswith('[') and status_str.endswith(']'):
-                content = status_str[1:-1]
-            else:
-                content = status_str
-            
-            parts = content.split('#')
-            if len(parts) == 7:
-                return {
-                    'temperature': float(parts[0]),
-                    'humidity': float(parts[1]),
-                    'tube_temperature': float(parts[2]),
-                    'dew_point': float(parts[3]),
-                    'pwm': float(parts[4]),
-                    'delta_temp': int(parts[5]),
-                    'dew_offset': int(parts[6]),
-                    'timestamp': datetime.now()
-                }
-            else:
-                self.logger.warning(f"Invalid STATUS format: {status_str}")
-                return {'raw': status_str, 'error': 'Invalid format'}
-        except Exception as e:
-            self.logger.error(f"Error parsing STATUS: {e}")
-            return {'raw': status_str, 'error': str(e)}
+            return parse_status_payload(content)
+        except ValueError as e:
+            raise ValueError(f"Invalid STATUS format: {status_str} ({e})") from e
             
     def set_last_command(self, command):
         """Enregistre la dernière commande envoyée"""
@@ -164,9 +375,8 @@ class ProtocolHandler:
     
     def reset(self):
         """Réinitialise l'état du protocole"""
-        self.in_status_response = False
-        self.status_buffer = ""
         self.last_command = None
+        self.decoder.reset()
     
     def validate_delta_value(self, value):
         """Valide la valeur delta (0-9)"""
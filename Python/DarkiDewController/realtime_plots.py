@@ -5,23 +5,134 @@ from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 from collections import deque
 from datetime import datetime
+import time
+
+import metrics
+from ring_buffer import ColumnarRingBuffer
+from lod import MinMaxPyramid, POINTS_PER_PIXEL
+from rolling_stats import RollingStats
+
+# Plafond par défaut du nombre d'images par seconde des graphiques
+DEFAULT_FPS = 30
+
+class RenderScheduler(QObject):
+    """
+    Planificateur de rendu : les graphiques se déclarent « sales » et sont
+    redessinés ensemble, au plus une fois par image (fps plafonné).
+    Les graphiques masqués (onglet non visible) ou en pause ne sont pas rendus ;
+    ils le seront à leur réapparition.
+    """
+    
+    def __init__(self, fps=30, parent=None):
+        super().__init__(parent)
+        self.fps = fps
+        self.dirty = {}  # dict ordonné utilisé comme ensemble
+        self.last_frame = 0.0
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.render_frame)
+        
+        # Instrumentation
+        self.frame_count = 0
+        self.render_counts = {}
+        self.render_times = {}
+        self.reset_stats()
+    
+    def set_fps(self, fps):
+        """Change le plafond d'images par seconde"""
+        self.fps = max(1, fps)
+    
+    def mark_dirty(self, plot):
+        """Demande un rendu du graphique à la prochaine image"""
+        self.dirty[plot] = None
+        if not self.timer.isActive():
+            delay = self.last_frame + 1.0 / self.fps - time.perf_counter()
+            self.timer.start(max(0, int(delay * 1000)))
+    
+    def render_frame(self):
+        """Redessine tous les graphiques sales et visibles"""
+        self.last_frame = time.perf_counter()
+        plots, self.dirty = self.dirty, {}
+        rendered = False
+        for plot in plots:
+            if plot.paused or not plot.isVisible():
+                plot.stale = True
+                continue
+            start = time.perf_counter()
+            plot.redraw()
+            elapsed = time.perf_counter() - start
+            metrics.RENDER_SECONDS.observe(elapsed)
+            self.render_counts[plot] = self.render_counts.get(plot, 0) + 1
+            self.render_times[plot] = self.render_times.get(plot, 0.0) + elapsed
+            rendered = True
+        if rendered:
+            self.frame_count += 1
+    
+    def reset_stats(self):
+        """Remet à zéro les compteurs d'instrumentation"""
+        self.stats_start = time.perf_counter()
+        self.frame_count = 0
+        self.render_counts.clear()
+        self.render_times.clear()
+    
+    def report(self, reset=True):
+        """
+        Retourne les mesures depuis le dernier rapport :
+        {'fps': images/s, 'plots': {titre: (rendus/s, ms/rendu)}}
+        """
+        elapsed = max(time.perf_counter() - self.stats_start, 1e-9)
+        plots = {
+            plot.title: (count / elapsed, self.render_times[plot] / count * 1000)
+            for plot, count in self.render_counts.items()
+        }
+        report = {'fps': self.frame_count / elapsed, 'plots': plots}
+        if reset:
+            self.reset_stats()
+        return report
 
 class RealTimePlot(pg.PlotWidget):
     """Widget de graphique temps réel amélioré"""
     
-    def __init__(self, title="Graphique", y_label="Valeur", color='blue', max_points=1000):
+    def __init__(self, title="Graphique", y_label="Valeur", color='blue', max_points=1000, scheduler=None):
         super().__init__()
         
         self.title = title
         self.color = color
         self.max_points = max_points
-        self.data = deque(maxlen=max_points)
-        self.timestamps = deque(maxlen=max_points)
+        self.avg_window = 20
+        self.time_window = 60  # secondes affichées
         self.paused = False
+        self.scheduler = scheduler
+        self.stale = False  # rendu reporté pendant que le graphique était masqué
+        
+        self.lod_enabled = True  # enveloppe min/max quand la fenêtre dépasse la largeur en pixels
+        self.base_time = None
+        self.avg_values = deque()
+        self.avg_sum = 0.0
+        self._allocate(max_points)
         
         self.setup_plot()
         self.setup_controls()
     
+    def _allocate(self, max_points):
+        """Historique du graphique : temps relatif (s), valeur, moyenne mobile"""
+        self.max_points = max_points
+        self.buffer = ColumnarRingBuffer(max_points, ('value', 'average'))
+        self.pyramid = MinMaxPyramid(max_points)
+        # Statistiques de la fenêtre visible : titre et échelle Y
+        self.stats = RollingStats(self.time_window, max_points)
+    
+    @property
+    def data(self):
+        """Valeurs affichées (vue NumPy)"""
+        return self.buffer.column('value')
+    
+    @property
+    def timestamps(self):
+        """Temps relatifs en secondes (vue NumPy)"""
+        return self.buffer.times()
+    
     def setup_plot(self):
         """Configure l'apparence du graphique"""
         self.setBackground('w')
@@ -56,90 +167,173 @@ class RealTimePlot(pg.PlotWidget):
         self.getAxis('bottom').enableAutoSIPrefix(False)
     
     def add_data_point(self, value, timestamp=None):
-        """Ajoute un point de données"""
+        """Ajoute un point de données (mise à jour incrémentale, O(1) amorti)"""
         if self.paused:
             return
         
-        if timestamp is None:
-            timestamp = datetime.now()
-        
-        self.data.append(value)
-        self.timestamps.append(timestamp)
+        self._append(value, timestamp)
+        self.request_redraw()
+    
+    def set_data(self, timestamps, values):
+        """Remplace les données du graphique (temps en secondes et valeurs, même longueur)"""
+        if self.paused:
+            return
         
-        if len(self.data) > 1:
+        self._reset_data()
+        times = np.asarray(timestamps, dtype=float)[-self.max_points:]
+        values = np.asarray(values, dtype=float)[-self.max_points:]
+        if len(values):
+            self.base_time = times[0]
+            times = times - self.base_time
+            
+            # Moyenne mobile vectorisée (NaN tant que la fenêtre n'est pas pleine)
+            window = self.avg_window
+            averages = np.full(len(values), np.nan)
+            if len(values) >= window:
+                sums = np.cumsum(np.concatenate(((0.0,), values)))
+                averages[window - 1:] = (sums[window:] - sums[:-window]) / window
+            self.avg_values.extend(values[-window:].tolist())
+            self.avg_sum = float(values[-window:].sum())
+            
+            self.buffer.extend(times, np.column_stack((values, averages)))
+            self.pyramid.rebuild(times, values)
+            self._reload_stats()
+        self.request_redraw()
+
+    def request_redraw(self):
+        """Redessine via le planificateur s'il y en a un, sinon immédiatement"""
+        if self.scheduler is not None:
+            self.scheduler.mark_dirty(self)
+        else:
+            self.redraw()
+
+    def redraw(self):
+        """Met à jour la courbe, les échelles et le titre"""
+        self.stale = False
+        if len(self.buffer) > 1:
             self.update_plot()
             self.update_stats()
+
+    def showEvent(self, event):
+        """Rattrape le rendu reporté pendant que le graphique était masqué"""
+        super().showEvent(event)
+        if self.stale:
+            self.request_redraw()
+
+    def _append(self, value, timestamp):
+        """Ajoute un point à l'historique, à la moyenne mobile et aux statistiques"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        elif isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        if self.base_time is None:
+            self.base_time = timestamp
+        
+        value = float(value)
+        
+        # Moyenne mobile sur avg_window points (NaN tant que la fenêtre n'est pas pleine)
+        self.avg_values.append(value)
+        self.avg_sum += value
+        if len(self.avg_values) > self.avg_window:
+            self.avg_sum -= self.avg_values.popleft()
+        average = self.avg_sum / self.avg_window if len(self.avg_values) == self.avg_window else np.nan
+        
+        t = timestamp - self.base_time
+        self.buffer.append(t, (value, average))
+        self.pyramid.append(t, value)
+        self.stats.add(t, value)
     
     def update_plot(self):
-        """Met à jour le graphique"""
-        if len(self.data) == 0:
+        """Met à jour le graphique avec la fenêtre de temps visible"""
+        if len(self.buffer) == 0:
             return
         
-        # Convertir les timestamps en secondes relatives
-        if isinstance(self.timestamps[0], datetime):
-            base_time = self.timestamps[0]
-            x = [(t - base_time).total_seconds() for t in self.timestamps]
+        x = self.buffer.times()
+        last_x = x[-1]
+        
+        # Seuls les points de la fenêtre visible sont transmis à la courbe
+        first = int(np.searchsorted(x, last_x - self.time_window))
+        values = self.buffer.column('value')
+        averages = self.buffer.column('average')
+        if self.lod_enabled:
+            # Environ POINTS_PER_PIXEL points par pixel, quelle que soit la durée affichée
+            max_points = POINTS_PER_PIXEL * max(int(self.plotItem.vb.width()), 100)
+            curve_x, curve_y = self.pyramid.envelope(x, values, first, max_points)
+            step = max(1, (len(x) - first) // max_points)
         else:
-            x = list(range(len(self.data)))
+            curve_x, curve_y = x[first:], values[first:]
+            step = 1
         
-        y = list(self.data)
-        
-        # Mettre à jour la courbe principale
-        self.curve.setData(x, y)
-        
-        # Calculer et afficher la moyenne mobile
-        if len(y) >= 10:
-            window = min(20, len(y))
-            weights = np.ones(window) / window
-            avg_y = np.convolve(y, weights, mode='valid')
-            avg_x = x[window-1:]
-            self.avg_curve.setData(avg_x, avg_y)
+        # Mettre à jour la courbe principale et la moyenne mobile (sous-échantillonnée)
+        self.curve.setData(curve_x, curve_y)
+        self.avg_curve.setData(x[first::step], averages[first::step], connect='finite')
         
         # Mettre à jour la dernière valeur
-        if len(y) > 0:
-            last_val = y[-1]
-            self.last_value_text.setText(f"{last_val:.2f}")
-            self.last_value_text.setPos(x[-1], last_val)
-            
-            # Mettre à jour la ligne horizontale
-            self.hline.setValue(last_val)
+        last_val = self.stats.last
+        self.last_value_text.setText(f"{last_val:.2f}")
+        self.last_value_text.setPos(last_x, last_val)
+        
+        # Mettre à jour la ligne horizontale
+        self.hline.setValue(last_val)
         
         # Ajuster la vue
-        if len(x) > 0:
-            self.setXRange(max(0, x[-1] - 60), x[-1] + 5)
-            
-            # Ajuster l'échelle Y avec une marge
-            if len(y) > 0:
-                y_min, y_max = min(y), max(y)
-                margin = (y_max - y_min) * 0.1
-                self.setYRange(y_min - margin, y_max + margin)
+        self.setXRange(max(0, last_x - self.time_window), last_x + 5)
+        
+        # Ajuster l'échelle Y avec une marge
+        y_min, y_max = self.stats.min, self.stats.max
+        margin = (y_max - y_min) * 0.1
+        self.setYRange(y_min - margin, y_max + margin)
     
     def update_stats(self):
         """Met à jour les statistiques affichées"""
-        if len(self.data) == 0:
+        if self.stats.count == 0:
             return
         
-        data_array = np.array(self.data)
-        stats = {
-            'min': np.min(data_array),
-            'max': np.max(data_array),
-            'mean': np.mean(data_array),
-            'std': np.std(data_array),
-            'last': data_array[-1]
-        }
+        stats = self.stats
         
         # Mettre à jour le titre avec les stats
-        stats_text = f"{self.title} | Dernier: {stats['last']:.2f} | Min: {stats['min']:.2f} | Max: {stats['max']:.2f}"
+        stats_text = (f"{self.title} | Dernier: {stats.last:.2f} | Min: {stats.min:.2f} | Max: {stats.max:.2f}"
+                      f" | Moy: {stats.mean:.2f} ± {stats.std:.2f}")
         self.setTitle(stats_text)
     
+    def _reset_data(self):
+        """Vide l'historique et les calculs incrémentaux"""
+        self.buffer.clear()
+        self.pyramid.clear()
+        self.base_time = None
+        self.stats.clear()
+        self.avg_values.clear()
+        self.avg_sum = 0.0
+    
     def clear(self):
         """Efface les données du graphique"""
-        self.data.clear()
-        self.timestamps.clear()
+        self._reset_data()
         self.curve.clear()
         self.avg_curve.clear()
         self.last_value_text.setText("")
     
+    def set_max_points(self, max_points):
+        """Change la taille de l'historique du graphique (les données sont effacées)"""
+        if max_points == self.max_points:
+            return
+        self._allocate(max_points)
+        self.clear()
+    
+    def _reload_stats(self):
+        """Recharge les statistiques avec les points de la fenêtre visible"""
+        x = self.buffer.times()
+        self.stats.clear()
+        self.stats.set_window(self.time_window, self.max_points)
+        if len(x):
+            first = int(np.searchsorted(x, x[-1] - self.time_window))
+            self.stats.extend(x[first:].tolist(), self.buffer.column('value')[first:].tolist())
+    
+    def set_time_window(self, seconds):
+        """Définit la durée affichée"""
+        self.time_window = seconds
+        self._reload_stats()
+        self.request_redraw()
+    
     def toggle_pause(self):
         """Met en pause/reprend le graphique"""
         self.paused = not self.paused
@@ -147,15 +341,31 @@ class RealTimePlot(pg.PlotWidget):
     def set_paused(self, paused):
         """Définit l'état de pause"""
         self.paused = paused
+        if not paused and self.stale:
+            self.request_redraw()
 
 class MultiPlotWidget(QWidget):
     """Widget contenant plusieurs graphiques"""
     
-    def __init__(self):
+    def __init__(self, max_points=1000):
         super().__init__()
         
+        self.max_points = max_points
         self.plots = {}
+        self.scheduler = RenderScheduler(fps=DEFAULT_FPS, parent=self)
         self.setup_ui()
+        
+        # Rapport de rendu rafraîchi chaque seconde, seulement quand le widget est affiché
+        self.render_stats_timer = QTimer(self)
+        self.render_stats_timer.timeout.connect(self.update_render_stats)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.render_stats_timer.start(1000)
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.render_stats_timer.stop()
     
     def setup_ui(self):
         """Configure l'interface"""
@@ -169,11 +379,11 @@ class MultiPlotWidget(QWidget):
         temp_tab = QWidget()
         temp_layout = QGridLayout(temp_tab)
         
-        self.plots['temperature'] = RealTimePlot("Température Extérieure", "°C", 'red')
-        self.plots['tube_temperature'] = RealTimePlot("Température Tube", "°C", 'orange')
-        self.plots['dew_point'] = RealTimePlot("Point de Rosée", "°C", 'blue')
-        self.plots['humidity'] = RealTimePlot("Humidité", "%", 'green')
-        self.plots['pwm'] = RealTimePlot("Puissance PWM", "", 'purple')
+        self.plots['temperature'] = RealTimePlot("Température Extérieure", "°C", 'red', self.max_points, self.scheduler)
+        self.plots['tube_temperature'] = RealTimePlot("Température Tube", "°C", 'orange', self.max_points, self.scheduler)
+        self.plots['dew_point'] = RealTimePlot("Point de Rosée", "°C", 'blue', self.max_points, self.scheduler)
+        self.plots['humidity'] = RealTimePlot("Humidité", "%", 'green', self.max_points, self.scheduler)
+        self.plots['pwm'] = RealTimePlot("Puissance PWM", "", 'purple', self.max_points, self.scheduler)
         
         temp_layout.addWidget(self.plots['temperature'], 0, 0)
         temp_layout.addWidget(self.plots['tube_temperature'], 0, 1)
@@ -189,8 +399,8 @@ class MultiPlotWidget(QWidget):
         
         #self.plots['humidity'] = RealTimePlot("Humidité", "%", 'green')
         #☼self.plots['pwm'] = RealTimePlot("Puissance PWM", "", 'purple')
-        self.plots['delta_temp'] = RealTimePlot("Delta Temp", "", 'cyan')
-        self.plots['dew_offset'] = RealTimePlot("Offset Rosée", "", 'magenta')
+        self.plots['delta_temp'] = RealTimePlot("Delta Temp", "", 'cyan', self.max_points, self.scheduler)
+        self.plots['dew_offset'] = RealTimePlot("Offset Rosée", "", 'magenta', self.max_points, self.scheduler)
         
         #other_layout.addWidget(self.plots['humidity'], 0, 0)
         #other_layout.addWidget(self.plots['pwm'], 0, 1)
@@ -218,26 +428,61 @@ class MultiPlotWidget(QWidget):
         controls_layout.addWidget(QLabel("Échelle temps:"))
         self.time_scale = QComboBox()
         self.time_scale.addItems(["30s", "1min", "5min", "15min", "1h"])
+        self.time_scale.setCurrentText("1min")
         self.time_scale.currentTextChanged.connect(self.change_time_scale)
         controls_layout.addWidget(self.time_scale)
         
+        # Plafond d'images par seconde
+        controls_layout.addWidget(QLabel("FPS max:"))
+        self.fps_spin = QSpinBox()
+        self.fps_spin.setRange(1, 60)
+        self.fps_spin.setValue(DEFAULT_FPS)
+        self.fps_spin.valueChanged.connect(self.scheduler.set_fps)
+        controls_layout.addWidget(self.fps_spin)
+        
         controls_layout.addStretch()
+        
+        # Instrumentation du rendu
+        self.render_stats_label = QLabel("")
+        controls_layout.addWidget(self.render_stats_label)
+        
         layout.addWidget(controls_frame)
     
-    def update_data(self, data_dict, timestamps):
-        """Met à jour tous les graphiques avec de nouvelles données"""
+    def update_data(self, history):
+        """Recharge tous les graphiques depuis l'historique en colonnes (ColumnarRingBuffer)"""
+        for key, plot in self.plots.items():
+            plot.set_data(history.times(plot.max_points), history.column(key, plot.max_points))
+    
+    def set_max_points(self, max_points, history=None):
+        """Change la taille de l'historique des graphiques et les recharge depuis history"""
+        self.max_points = max_points
+        for plot in self.plots.values():
+            plot.set_max_points(max_points)
+        if history is not None:
+            self.update_data(history)
+    
+    def add_sample(self, sample):
+        """Ajoute un StatusSample à chaque graphique (mise à jour incrémentale)"""
+        t = sample.t_ns / 1e9
         for key, plot in self.plots.items():
-            if key in data_dict and len(data_dict[key]) > 0:
-                # Utiliser les dernières valeurs
-                values = list(data_dict[key])
-                times = timestamps[-len(values):] if len(timestamps) >= len(values) else timestamps
-                
-                # Mettre à jour le graphique
-                if len(values) == len(times):
-                    plot.data.clear()
-                    plot.timestamps.clear()
-                    for val, ts in zip(values, times):
-                        plot.add_data_point(val, ts)
+            plot.add_data_point(getattr(sample, key), t)
+    
+    def update_render_stats(self):
+        """Affiche le nombre de rendus par seconde et le temps de rendu par graphique"""
+        report = self.scheduler.report()
+        if not report['plots']:
+            self.render_stats_label.setText("")
+            return
+        
+        renders = sum(rate for rate, _ in report['plots'].values())
+        slowest_title, (_, slowest_ms) = max(report['plots'].items(), key=lambda item: item[1][1])
+        self.render_stats_label.setText(
+            f"{report['fps']:.1f} img/s | {renders:.1f} rendus/s | max {slowest_ms:.1f} ms ({slowest_title})"
+        )
+        self.render_stats_label.setToolTip("\n".join(
+            f"{title}: {rate:.1f} rendus/s, {ms:.2f} ms/rendu"
+            for title, (rate, ms) in report['plots'].items()
+        ))
     
     def clear_all(self):
         """Efface tous les graphiques"""
@@ -262,4 +507,4 @@ class MultiPlotWidget(QWidget):
         
         seconds = scale_seconds.get(scale, 60)
         for plot in self.plots.values():
-            plot.setXRange(0, seconds)
\ No newline at end of file
+            plot.set_time_window(seconds)
\ No newline at end of file
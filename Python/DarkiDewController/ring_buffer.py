@@ -0,0 +1,110 @@
+import numpy as np
+
+class ColumnarRingBuffer:
+    """
+    Historique en colonnes préalloué : une colonne de temps (float64) et une
+    colonne par mesure.
+    Chaque point est écrit deux fois (positions i et i + capacité) : les N
+    derniers points sont donc toujours contigus et last()/column() renvoient
+    des vues NumPy, sans copie ni allocation à chaque mise à jour.
+    """
+
+    def __init__(self, capacity, columns, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError(f"Capacité invalide: {capacity}")
+        self.columns = tuple(columns)
+        self.dtype = dtype
+        self._index = {name: i + 1 for i, name in enumerate(self.columns)}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Alloue le tampon miroir (ligne 0 : temps, puis une ligne par colonne)"""
+        self.capacity = capacity
+        self._data = np.zeros((len(self.columns) + 1, 2 * capacity), dtype=self.dtype)
+        self._head = 0   # prochaine position d'écriture, dans [0, capacité)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par le tampon"""
+        return self._data.nbytes
+
+    def append(self, t, values):
+        """Ajoute un point : temps t et une valeur par colonne (dans l'ordre de columns)"""
+        i = self._head
+        data = self._data
+        data[0, i] = t
+        data[1:, i] = values
+        data[:, i + self.capacity] = data[:, i]
+        self._head = i + 1 if i + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, times, values):
+        """Ajoute plusieurs points d'un coup : times (n,) et values (n, colonnes)"""
+        times = np.asarray(times)
+        values = np.asarray(values)
+        if len(times) > self.capacity:
+            times = times[-self.capacity:]
+            values = values[-self.capacity:]
+        n = len(times)
+        if n == 0:
+            return
+        positions = (self._head + np.arange(n)) % self.capacity
+        data = self._data
+        data[0, positions] = times
+        data[1:, positions] = values.T
+        data[:, positions + self.capacity] = data[:, positions]
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def _window(self, n):
+        """Bornes [début, fin) des n derniers points dans le tampon miroir"""
+        if n is None or n > self._count:
+            n = self._count
+        end = self._head + self.capacity
+        return end - n, end
+
+    def times(self, n=None):
+        """Vue sur les temps des n derniers points (tous par défaut)"""
+        start, end = self._window(n)
+        return self._data[0, start:end]
+
+    def column(self, name, n=None):
+        """Vue sur les valeurs d'une colonne pour les n derniers points"""
+        start, end = self._window(n)
+        return self._data[self._index[name], start:end]
+
+    def last(self, n=None):
+        """Vue (colonnes + 1, n) : temps puis colonnes, pour les n derniers points"""
+        start, end = self._window(n)
+        return self._data[:, start:end]
+
+    def latest(self):
+        """Dernier point (temps, valeurs) ou None si vide"""
+        if self._count == 0:
+            return None
+        point = self._data[:, self._head + self.capacity - 1]
+        return point[0], point[1:]
+
+    def clear(self):
+        """Vide l'historique (le tampon reste alloué)"""
+        self._head = 0
+        self._count = 0
+
+    def resize(self, capacity):
+        """Change la capacité en conservant les points les plus récents"""
+        if capacity == self.capacity:
+            return
+        if capacity < 1:
+            raise ValueError(f"Capacité invalide: {capacity}")
+        kept = self.last(min(self._count, capacity)).copy()
+        self._allocate(capacity)
+        n = kept.shape[1]
+        self._data[:, :n] = kept
+        self._data[:, capacity:capacity + n] = kept
+        self._head = n % capacity
+        self._count = n
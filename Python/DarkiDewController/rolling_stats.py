@@ -0,0 +1,134 @@
+from collections import deque
+import math
+
+class RollingStats:
+    """
+    Statistiques glissantes sur une fenêtre de temps (window, en secondes)
+    et/ou de nombre de points (max_count), en O(1) amorti par point :
+    - moyenne et variance par Welford (ajout et retrait),
+    - min/max par deques monotones.
+    La moyenne et la variance sont recalculées exactement dès que le nombre
+    de retraits depuis le dernier recalcul atteint la taille de la fenêtre,
+    ce qui borne la dérive numérique sans changer le coût amorti.
+    """
+
+    def __init__(self, window=None, max_count=None):
+        self.window = window
+        self.max_count = max_count
+        self.clear()
+
+    def clear(self):
+        """Vide la fenêtre"""
+        self._points = deque()  # (rang, temps, valeur)
+        self._min = deque()     # (rang, valeur) croissantes
+        self._max = deque()     # (rang, valeur) décroissantes
+        self._seq = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removed = 0
+        self.last = None
+        self.last_time = None
+
+    def __len__(self):
+        return len(self._points)
+
+    @property
+    def count(self):
+        return len(self._points)
+
+    def add(self, t, value):
+        """Ajoute un point (temps croissants) puis retire ceux sortis de la fenêtre"""
+        value = float(value)
+        seq = self._seq
+        self._seq += 1
+        self._points.append((seq, t, value))
+        self.last = value
+        self.last_time = t
+
+        n = len(self._points)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+
+        self._expire()
+
+    def extend(self, times, values):
+        """Ajoute une série de points"""
+        for t, value in zip(times, values):
+            self.add(t, value)
+
+    def set_window(self, window=None, max_count=None):
+        """
+        Change la fenêtre. Une fenêtre plus courte est appliquée immédiatement ;
+        pour l'agrandir, l'appelant doit réinjecter les points plus anciens
+        (clear() puis extend()).
+        """
+        self.window = window
+        self.max_count = max_count
+        self._expire()
+
+    def _expire(self):
+        """Retire les points les plus anciens qui sortent de la fenêtre"""
+        points = self._points
+        while points and (
+            (self.max_count is not None and len(points) > self.max_count)
+            or (self.window is not None and points[0][1] < self.last_time - self.window)
+        ):
+            seq, _, value = points.popleft()
+            n = len(points)
+            if n == 0:
+                self._mean = 0.0
+                self._m2 = 0.0
+            else:
+                delta = value - self._mean
+                self._mean -= delta / n
+                self._m2 -= delta * (value - self._mean)
+            if self._min[0][0] == seq:
+                self._min.popleft()
+            if self._max[0][0] == seq:
+                self._max.popleft()
+            self._removed += 1
+        if self._removed and self._removed >= len(points):
+            self._resync()
+
+    def _resync(self):
+        """Recalcule exactement moyenne et variance à partir de la fenêtre"""
+        self._removed = 0
+        n = len(self._points)
+        if n == 0:
+            return
+        total = math.fsum(value for _, _, value in self._points)
+        self._mean = total / n
+        self._m2 = math.fsum((value - self._mean) ** 2 for _, _, value in self._points)
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self):
+        return self._mean if self._points else None
+
+    @property
+    def variance(self):
+        """Variance de population (comme np.var)"""
+        n = len(self._points)
+        if n == 0:
+            return None
+        return max(self._m2, 0.0) / n
+
+    @property
+    def std(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
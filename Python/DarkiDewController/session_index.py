@@ -0,0 +1,206 @@
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from protocol import STATUS_FIELDS
+from session_store import HEADER_SIZE, SESSION_DTYPE, load_session
+
+# Catalogue SQLite placé dans le répertoire des logs
+INDEX_NAME = 'sessions.sqlite'
+# Un repère (temps du premier échantillon, position en octets) tous les BLOCK_SAMPLES échantillons
+BLOCK_SAMPLES = 256
+
+_SESSION_FILE = re.compile(r'^data_(\d{8}_\d{6})\.(csv|npy)$')
+
+logger = logging.getLogger(__name__)
+
+def to_ns(value):
+    """Instant en ns depuis l'epoch : datetime (locale si naïve), secondes (float) ou ns (int)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1_000_000) * 1000
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(value * 1e9)
+
+def _csv_time_ns(line):
+    """Horodatage ISO local (première colonne d'une ligne CSV) en ns depuis l'epoch"""
+    return to_ns(datetime.fromisoformat(line[:line.index(b',')].decode('ascii')))
+
+class SessionIndex:
+    """
+    Catalogue des sessions de mesure (data_<session>.csv / .npy) :
+    intervalle de temps de chaque fichier et repères (temps, octet) tous les
+    BLOCK_SAMPLES échantillons. query() ne lit que les sessions qui
+    recouvrent l'intervalle demandé et, dans chacune, se positionne
+    directement sur le bon bloc au lieu de relire tout le fichier.
+    Un fichier est réindexé quand sa taille ou sa date change.
+    """
+
+    def __init__(self, log_dir, block_samples=BLOCK_SAMPLES):
+        self.log_dir = Path(log_dir)
+        self.block_samples = block_samples
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.log_dir / INDEX_NAME, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                name TEXT PRIMARY KEY,
+                format TEXT NOT NULL,
+                t_start INTEGER,
+                t_end INTEGER,
+                samples INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blocks (
+                name TEXT NOT NULL,
+                t_ns INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                PRIMARY KEY (name, t_ns, offset)
+            );
+            CREATE INDEX IF NOT EXISTS sessions_span ON sessions (t_start, t_end);
+        """)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def refresh(self):
+        """Met à jour le catalogue (fichiers nouveaux, modifiés ou supprimés) ; renvoie les noms indexés"""
+        with self._lock:
+            known = {name: (size, mtime_ns) for name, size, mtime_ns
+                     in self._db.execute("SELECT name, size, mtime_ns FROM sessions")}
+            present = set()
+            for path in self.log_dir.iterdir():
+                match = _SESSION_FILE.match(path.name)
+                if not match:
+                    continue
+                present.add(path.name)
+                stat = path.stat()
+                if known.get(path.name) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                try:
+                    self._index_file(path, match.group(2), stat)
+                except Exception as e:
+                    logger.error(f"Erreur indexation {path.name}: {e}")
+            for name in set(known) - present:
+                self._forget(name)
+            self._db.commit()
+            return sorted(present)
+
+    def _forget(self, name):
+        self._db.execute("DELETE FROM sessions WHERE name = ?", (name,))
+        self._db.execute("DELETE FROM blocks WHERE name = ?", (name,))
+
+    def _index_file(self, path, file_format, stat):
+        """(Ré)indexe un fichier de session"""
+        if file_format == 'npy':
+            wall_ns = np.asarray(load_session(path)['wall_ns'])
+            count = len(wall_ns)
+            positions = np.arange(0, count, self.block_samples)
+            blocks = [(int(wall_ns[i]), HEADER_SIZE + int(i) * SESSION_DTYPE.itemsize) for i in positions]
+            span = (int(wall_ns[0]), int(wall_ns[-1])) if count else (None, None)
+        else:
+            blocks, count, span = self._scan_csv(path)
+
+        self._forget(path.name)
+        self._db.execute("INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (path.name, file_format, span[0], span[1], count, stat.st_size, stat.st_mtime_ns))
+        self._db.executemany("INSERT OR IGNORE INTO blocks VALUES (?, ?, ?)",
+                             [(path.name, t_ns, offset) for t_ns, offset in blocks])
+
+    def _scan_csv(self, path):
+        """Repères d'un CSV : seules les lignes de début de bloc et la dernière sont analysées"""
+        blocks = []
+        count = 0
+        last = None
+        with open(path, 'rb') as f:
+            f.readline()  # en-tête
+            offset = f.tell()
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # ligne en cours d'écriture
+                if count % self.block_samples == 0:
+                    blocks.append((_csv_time_ns(line), offset))
+                last = line
+                count += 1
+                offset += len(line)
+        span = (blocks[0][0], _csv_time_ns(last)) if count else (None, None)
+        return blocks, count, span
+
+    def sessions(self, t0=None, t1=None):
+        """Sessions (nom, format, début ns, fin ns, échantillons) qui recouvrent [t0, t1]"""
+        t0, t1 = to_ns(t0), to_ns(t1)
+        with self._lock:
+            return self._db.execute(
+                "SELECT name, format, t_start, t_end, samples FROM sessions "
+                "WHERE samples > 0 AND (? IS NULL OR t_end >= ?) AND (? IS NULL OR t_start <= ?) "
+                "ORDER BY t_start", (t0, t0, t1, t1)).fetchall()
+
+    def _start_offset(self, name, t0):
+        """Position du dernier repère dont le temps précède t0"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT offset FROM blocks WHERE name = ? AND t_ns <= ? ORDER BY t_ns DESC, offset DESC LIMIT 1",
+                (name, t0)).fetchone()
+        return row[0] if row else None
+
+    def query(self, channel, t0=None, t1=None):
+        """
+        Valeurs d'une mesure entre t0 et t1 (inclus) sur toutes les sessions.
+        t0/t1 : datetime (heure locale si naïve), secondes ou ns depuis l'epoch.
+        Renvoie (temps en ns int64, valeurs float64).
+        """
+        if channel not in STATUS_FIELDS:
+            raise ValueError(f"Mesure inconnue: {channel}")
+        self.refresh()
+        t0_ns, t1_ns = to_ns(t0), to_ns(t1)
+        low = t0_ns if t0_ns is not None else np.iinfo(np.int64).min
+        high = t1_ns if t1_ns is not None else np.iinfo(np.int64).max
+
+        times, values = [], []
+        for name, file_format, _, _, _ in self.sessions(t0, t1):
+            path = self.log_dir / name
+            if file_format == 'npy':
+                records = load_session(path)
+                wall_ns = records['wall_ns']
+                first = np.searchsorted(wall_ns, low, side='left')
+                last = np.searchsorted(wall_ns, high, side='right')
+                times.append(np.array(wall_ns[first:last]))
+                values.append(records[channel][first:last].astype(np.float64))
+            else:
+                session_times, session_values = self._read_csv_range(path, channel, low, high)
+                times.append(session_times)
+                values.append(session_values)
+
+        if not times:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        return np.concatenate(times), np.concatenate(values)
+
+    def _read_csv_range(self, path, channel, low, high):
+        """Lit les lignes d'un CSV entre low et high en partant du repère le plus proche"""
+        column = STATUS_FIELDS.index(channel) + 1
+        times, values = [], []
+        offset = self._start_offset(path.name, low)
+        with open(path, 'rb') as f:
+            if offset is None:
+                f.readline()  # en-tête
+            else:
+                f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                t_ns = _csv_time_ns(line)
+                if t_ns < low:
+                    continue
+                if t_ns > high:
+                    break
+                times.append(t_ns)
+                values.append(float(line.split(b',')[column]))
+        return np.array(times, dtype=np.int64), np.array(values, dtype=np.float64)
@@ -0,0 +1,133 @@
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from protocol import STATUS_FIELDS
+
+# Enregistrement binaire d'un échantillon STATUS (30 octets, sans alignement) :
+# horodatage en ns depuis l'epoch, mesures en float32, réglages en uint8
+SESSION_DTYPE = np.dtype([
+    ('wall_ns', '<i8'),
+    ('temperature', '<f4'),
+    ('humidity', '<f4'),
+    ('tube_temperature', '<f4'),
+    ('dew_point', '<f4'),
+    ('pwm', '<f4'),
+    ('delta_temp', 'u1'),
+    ('dew_offset', 'u1'),
+])
+
+# Taille fixe de l'en-tête .npy : le nombre d'enregistrements peut être réécrit sur place
+HEADER_SIZE = 256
+# Enregistrements accumulés en mémoire avant écriture
+CHUNK_RECORDS = 1024
+
+def _header(count):
+    """En-tête .npy version 1.0 de HEADER_SIZE octets pour `count` enregistrements"""
+    text = repr({'descr': SESSION_DTYPE.descr, 'fortran_order': False, 'shape': (count,)})
+    padding = HEADER_SIZE - len(npy_format.MAGIC_PREFIX) - 2 - 2 - len(text) - 1
+    if padding < 0:
+        raise ValueError("En-tête de session trop long")
+    text = text + ' ' * padding + '\n'
+    return npy_format.MAGIC_PREFIX + bytes((1, 0)) + len(text).to_bytes(2, 'little') + text.encode('latin1')
+
+class ColumnarSessionWriter:
+    """
+    Écrit une session au format .npy (tableau structuré SESSION_DTYPE).
+    Les échantillons sont accumulés par blocs de CHUNK_RECORDS puis écrits
+    d'un seul write ; flush() écrit le bloc partiel et met à jour le nombre
+    d'enregistrements dans l'en-tête. Le fichier se relit sans analyse avec
+    np.load(mmap_mode='r') ou load_session().
+    """
+
+    def __init__(self, path, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.count = 0
+        self._header_count = 0
+        self._chunk = np.zeros(chunk_records, dtype=SESSION_DTYPE)
+        self._filled = 0
+        self._file = open(path, 'wb')
+        self._file.write(_header(0))
+
+    def append(self, sample):
+        """Ajoute un StatusSample"""
+        self._chunk[self._filled] = (sample.wall_ns,) + sample.values()
+        self._filled += 1
+        if self._filled == len(self._chunk):
+            self._write_chunk()
+
+    def _write_chunk(self):
+        if self._filled:
+            self._file.write(self._chunk[:self._filled].tobytes())
+            self.count += self._filled
+            self._filled = 0
+
+    def flush(self):
+        """Écrit le bloc en cours et met à jour l'en-tête"""
+        self._write_chunk()
+        if self.count == self._header_count:
+            return
+        self._header_count = self.count
+        self._file.seek(0)
+        self._file.write(_header(self.count))
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+def load_session(path, mmap=True):
+    """
+    Charge une session .npy en tableau structuré (memmap en lecture seule par
+    défaut). Le nombre d'enregistrements est déduit de la taille du fichier :
+    une session interrompue avant la mise à jour de l'en-tête reste lisible.
+    """
+    count = max(0, (os.path.getsize(path) - HEADER_SIZE) // SESSION_DTYPE.itemsize)
+    if count == 0:
+        return np.zeros(0, dtype=SESSION_DTYPE)
+    if mmap:
+        return np.memmap(path, dtype=SESSION_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+    with open(path, 'rb') as f:
+        f.seek(HEADER_SIZE)
+        return np.fromfile(f, dtype=SESSION_DTYPE, count=count)
+
+def _local_offset_ns(wall_ns):
+    """Décalage de l'heure locale par rapport à UTC à l'instant wall_ns"""
+    utc_offset = datetime.fromtimestamp(wall_ns / 1e9).astimezone().utcoffset()
+    return int(utc_offset.total_seconds()) * 1_000_000_000
+
+def _iso_timestamps(wall_ns):
+    """Horodatages ISO locaux (comme datetime.isoformat()), vectorisés si le décalage horaire est constant"""
+    if len(wall_ns) == 0:
+        return np.array([], dtype=str)
+    offset = _local_offset_ns(int(wall_ns[0]))
+    if offset != _local_offset_ns(int(wall_ns[-1])):
+        # Changement d'heure pendant la session
+        return np.array([datetime.fromtimestamp(t / 1e9).isoformat() for t in wall_ns.tolist()])
+    # Arrondi à la microseconde, comme datetime.fromtimestamp
+    return np.datetime_as_string(((wall_ns + offset + 500) // 1000).astype('datetime64[us]'))
+
+def write_csv(records, f):
+    """Écrit des enregistrements SESSION_DTYPE au format CSV de DataLogger (horodatage ISO local)"""
+    # Conversion en texte colonne par colonne (représentation la plus courte des float32)
+    columns = [_iso_timestamps(np.asarray(records['wall_ns']))]
+    columns.extend(records[name].astype(str) for name in STATUS_FIELDS)
+    writer = csv.writer(f)
+    writer.writerow(['timestamp'] + list(STATUS_FIELDS))
+    writer.writerows(zip(*columns))
+
+def export_csv(path, csv_path):
+    """Exporte une session .npy en CSV ; renvoie le nombre d'enregistrements"""
+    records = load_session(path)
+    with open(csv_path, 'w', newline='') as f:
+        write_csv(records, f)
+    return len(records)
@@ -0,0 +1,109 @@
+"""
+Période adaptative des requêtes STATUS, commune à l'interface et au démon.
+
+Une seule requête est en vol à la fois : l'appelant envoie STATUS, attend la
+réponse (ou son échec), puis demande au StatusScheduler le délai avant la
+suivante. La période part de la période de base choisie par l'utilisateur :
+- elle est divisée par deux dès que la marge tube - point de rosée se réduit,
+  devient faible, ou que la PWM varie (épisode de buée) ;
+- elle s'allonge progressivement quand les mesures sont stables (la nuit),
+  jusqu'à MAX_STRETCH fois la base ;
+- elle double à chaque échec consécutif (timeout, NAK), jusqu'à MAX_INTERVAL ;
+- elle reste au moins RTT_FACTOR fois l'aller-retour mesuré.
+"""
+import logging
+
+# Étendue de l'adaptation autour de la période de base (base / k .. base × k)
+MAX_STRETCH = 4.0
+# Période maximale, recul après échecs compris (s)
+MAX_INTERVAL = 120.0
+# La liaison n'est occupée au plus qu'un quart du temps par les STATUS
+RTT_FACTOR = 4.0
+# Marge tube - point de rosée (°C) sous laquelle on interroge au plus vite
+MARGIN_ALERT = 1.0
+# Vitesse de rapprochement de la marge jugée significative (°C/min, lissée)
+MARGIN_RATE_ALERT = 0.5
+# Constante de temps du lissage de la vitesse de la marge (s) : filtre le bruit des capteurs
+MARGIN_RATE_TAU = 60.0
+# Variation de PWM entre deux mesures jugée significative (0-255)
+PWM_CHANGE = 5
+# Accélération immédiate, ralentissement progressif
+SPEEDUP = 0.5
+SLOWDOWN = 1.25
+
+logger = logging.getLogger(__name__)
+
+class StatusScheduler:
+    """
+    Délai entre deux requêtes STATUS (s), mesuré d'un envoi au suivant.
+    on_sample() et on_failure() renvoient ce délai ; l'appelant n'envoie la
+    requête suivante qu'après la réponse à la précédente, donc jamais avant
+    max(envoi + délai, réponse). adaptive=False : période fixe.
+    """
+
+    def __init__(self, base_interval, adaptive=True):
+        self.adaptive = adaptive
+        self.base_interval = float(base_interval)
+        self.interval = self.base_interval
+        self.round_trip = None   # aller-retour lissé (s)
+        self.margin_rate = 0.0   # vitesse lissée de la marge (°C/s, négative : elle se réduit)
+        self.failures = 0
+        self._last = None        # dernier échantillon reçu
+
+    def set_base_interval(self, seconds):
+        """Nouvelle période de base (réglage utilisateur) : l'adaptation repart de là"""
+        self.base_interval = float(seconds)
+        self.interval = self.base_interval
+
+    def reset(self):
+        """Oublie l'historique (reconnexion)"""
+        self.interval = self.base_interval
+        self.round_trip = None
+        self.margin_rate = 0.0
+        self.failures = 0
+        self._last = None
+
+    @property
+    def next_delay(self):
+        """Délai avant la prochaine requête, recul après échecs compris"""
+        if not self.adaptive:
+            return self.base_interval
+        return min(MAX_INTERVAL, self.interval * 2 ** self.failures)
+
+    def _bounds(self):
+        low = self.base_interval / MAX_STRETCH
+        if self.round_trip is not None:
+            low = max(low, RTT_FACTOR * self.round_trip)
+        return low, min(MAX_INTERVAL, max(low, self.base_interval * MAX_STRETCH))
+
+    def on_sample(self, sample, round_trip):
+        """Réponse STATUS reçue après round_trip secondes ; renvoie le délai suivant"""
+        self.failures = 0
+        self.round_trip = round_trip if self.round_trip is None else 0.8 * self.round_trip + 0.2 * round_trip
+        previous, self._last = self._last, sample
+        if not self.adaptive or previous is None:
+            return self.next_delay
+
+        margin = sample.tube_temperature - sample.dew_point
+        dt = max((sample.t_ns - previous.t_ns) / 1e9, 1e-3)
+        rate = (margin - (previous.tube_temperature - previous.dew_point)) / dt
+        self.margin_rate += dt / (dt + MARGIN_RATE_TAU) * (rate - self.margin_rate)
+        rate_per_min = self.margin_rate * 60
+        pwm_change = abs(sample.pwm - previous.pwm)
+
+        if margin < MARGIN_ALERT or rate_per_min < -MARGIN_RATE_ALERT or pwm_change >= PWM_CHANGE:
+            interval = self.interval * SPEEDUP
+        elif abs(rate_per_min) < MARGIN_RATE_ALERT / 2 and pwm_change == 0:
+            interval = self.interval * SLOWDOWN
+        else:
+            interval = (self.interval + self.base_interval) / 2  # retour vers la base
+        low, high = self._bounds()
+        self.interval = min(high, max(low, interval))
+        logger.debug("STATUS toutes les %.1f s (marge %.2f °C, %+.2f °C/min, ΔPWM %.0f, aller-retour %.0f ms)",
+                     self.interval, margin, rate_per_min, pwm_change, self.round_trip * 1e3)
+        return self.next_delay
+
+    def on_failure(self):
+        """STATUS en échec (timeout, NAK, réponse invalide) ; renvoie le délai suivant"""
+        self.failures += 1
+        return self.next_delay
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# Modules de l'application importables et Qt sans affichage
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope='session')
+def qapp():
+    """QApplication partagée par les tests qui utilisent des objets Qt"""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def in_tmp_dir(tmp_path, monkeypatch):
+    """Répertoire courant temporaire (DataLogger écrit dans ./logs)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,86 @@
+import pytest
+
+from command_queue import (CommandError, CommandPolicy, CommandQueue, CommandRejected,
+                           CommandTimeout)
+
+def make_queue():
+    return CommandQueue({'DELTA': CommandPolicy(1.0, 1), 'STATUS': CommandPolicy(2.0, 0)})
+
+def test_one_command_in_flight_at_a_time():
+    queue = make_queue()
+    first = queue.submit('DELTA', b'\x31\x33')
+    second = queue.submit('STATUS', b'\x38')
+    assert queue.start_next(now=0.0).future is first
+    assert queue.start_next(now=0.0) is None
+    assert len(queue) == 1
+    queue.complete()
+    assert first.result(0) is True
+    pending = queue.start_next(now=0.5)
+    assert pending.future is second and pending.deadline == 2.5
+    queue.complete('sample')
+    assert second.result(0) == 'sample'
+    assert queue.current is None and queue.start_next() is None
+
+def test_nak_fails_without_retry():
+    queue = make_queue()
+    future = queue.submit('DELTA', b'\x31\x33')
+    queue.start_next(now=0.0)
+    queue.fail(CommandRejected("DELTA: NAK"))
+    with pytest.raises(CommandRejected):
+        future.result(0)
+    assert queue.start_next() is None
+
+def test_timeout_retries_then_fails():
+    queue = make_queue()
+    future = queue.submit('DELTA', b'\x31\x33')
+    other = queue.submit('STATUS', b'\x38')
+    pending = queue.start_next(now=0.0)
+    assert queue.time_left(now=0.25) == 0.75
+    assert queue.expire(now=0.5) == (None, False)
+
+    # Délai dépassé : renvoi, en tête de file devant STATUS
+    assert queue.expire(now=1.0) == (pending, True)
+    assert not future.done()
+    assert queue.start_next(now=1.0) is pending and pending.attempts == 2
+
+    # Renvois épuisés : CommandTimeout, puis la commande suivante part
+    assert queue.expire(now=2.0) == (pending, False)
+    with pytest.raises(CommandTimeout):
+        future.result(0)
+    assert queue.start_next(now=2.0).future is other
+
+def test_set_timeout():
+    queue = make_queue()
+    queue.set_timeout('DELTA', 3.0)
+    queue.submit('DELTA', b'\x31\x33')
+    assert queue.start_next(now=10.0).deadline == 13.0
+    assert queue.policy('DELTA').retries == 1
+
+def test_cancel_all():
+    queue = make_queue()
+    futures = [queue.submit('DELTA', b'\x31\x33'), queue.submit('STATUS', b'\x38'), queue.submit('STATUS', b'\x38')]
+    queue.start_next(now=0.0)
+    queue.cancel_all(CommandError("Déconnecté"))
+    for future in futures:
+        with pytest.raises(CommandError, match="Déconnecté"):
+            future.result(0)
+    assert queue.current is None and len(queue) == 0
+
+def test_coalesce_only_merges_queued_identical_commands():
+    queue = make_queue()
+    in_flight = queue.submit('STATUS', b'\x38', coalesce=True)
+    queue.start_next(now=0.0)
+    # La commande en vol n'est pas fusionnée : sa réponse peut déjà être en route
+    queued = queue.submit('STATUS', b'\x38', coalesce=True)
+    assert queued is not in_flight
+    assert queue.submit('STATUS', b'\x38', coalesce=True) is queued
+    assert queue.submit('STATUS', b'\x38') is not queued
+    assert queue.submit('DELTA', b'\x31\x33', coalesce=True) is not queued
+    assert len(queue) == 3
+
+def test_cancelled_future_is_skipped():
+    queue = make_queue()
+    cancelled = queue.submit('DELTA', b'\x31\x33')
+    kept = queue.submit('STATUS', b'\x38')
+    assert cancelled.cancel()
+    assert queue.start_next(now=0.0).future is kept
@@ -0,0 +1,53 @@
+import numpy as np
+
+from lod import MinMaxPyramid
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=float), rng.normal(0, 1, n).cumsum()
+
+def test_levels_match_numpy_blocks():
+    times, values = series(1000)
+    pyramid = MinMaxPyramid(1024)
+    for t, value in zip(times, values):
+        pyramid.append(t, value)
+    for block, ring in pyramid.levels:
+        full = len(values) // block
+        blocks = values[:full * block].reshape(full, block)
+        np.testing.assert_array_equal(ring.column('min'), blocks.min(axis=1))
+        np.testing.assert_array_equal(ring.column('max'), blocks.max(axis=1))
+        np.testing.assert_array_equal(ring.times(), times[:full * block:block])
+
+def test_rebuild_matches_append():
+    times, values = series(777, seed=1)
+    appended = MinMaxPyramid(1024, factor=3)
+    for t, value in zip(times, values):
+        appended.append(t, value)
+    rebuilt = MinMaxPyramid(1024, factor=3)
+    rebuilt.rebuild(times, values)
+    for (_, a), (_, b) in zip(appended.levels, rebuilt.levels):
+        np.testing.assert_array_equal(a.last(), b.last())
+    # Les blocs partiels sont repris là où rebuild() s'est arrêté
+    for t, value in zip(times[-1] + 1 + np.arange(50), np.arange(50.0)):
+        appended.append(t, value)
+        rebuilt.append(t, value)
+    for (_, a), (_, b) in zip(appended.levels, rebuilt.levels):
+        np.testing.assert_array_equal(a.last(), b.last())
+
+def test_envelope_keeps_extremes_and_bounds_points():
+    times, values = series(10000, seed=2)
+    pyramid = MinMaxPyramid(16384)
+    pyramid.rebuild(times, values)
+    x, y = pyramid.envelope(times, values, 0, 500)
+    assert len(x) == len(y) <= 2 * 500 + 3
+    assert y.min() == values.min() and y.max() == values.max()
+    assert x[0] == times[0] and x[-1] == times[-1] and y[-1] == values[-1]
+    assert np.all(np.diff(x) >= 0)
+
+def test_envelope_returns_raw_points_when_few():
+    times, values = series(100)
+    pyramid = MinMaxPyramid(1024)
+    pyramid.rebuild(times, values)
+    x, y = pyramid.envelope(times, values, 40, 500)
+    np.testing.assert_array_equal(x, times[40:])
+    np.testing.assert_array_equal(y, values[40:])
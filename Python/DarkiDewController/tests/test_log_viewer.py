@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from log_viewer import LogLineModel
+
+LINES = ["début", "alpha", "cible une", "beta", "cible deux", "fin"]
+
+def wait_indexed(qapp, model):
+    deadline = time.monotonic() + 5
+    while model.indexing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    qapp.processEvents()  # lignes indexées livrées par signal depuis le thread
+
+def open_model(qapp, path, text):
+    path.write_text(text, encoding='utf-8')
+    model = LogLineModel(str(path))
+    model.start()
+    wait_indexed(qapp, model)
+    return model
+
+@pytest.fixture
+def model(qapp, tmp_path):
+    model = open_model(qapp, tmp_path / "app.log", "".join(line + "\n" for line in LINES))
+    yield model
+    model.close()
+
+def test_lines_are_indexed(model):
+    assert model.rowCount() == len(LINES)
+    assert [model.line(row) for row in range(len(LINES))] == LINES
+
+def test_find_forward_and_wrap(model):
+    assert model.find("cible", 0) == 2
+    assert model.find("cible", 2) == 4
+    assert model.find("cible", 4) == 2
+    assert model.find("absent", 0) == -1
+
+def test_find_inclusive_starts_at_current_row(model):
+    assert model.find("cible", 2, inclusive=True) == 2
+    assert model.find("cible", 3, inclusive=True) == 4
+    assert model.find("début", 0, inclusive=True) == 0
+
+def test_find_backwards(model):
+    assert model.find("cible", 4, backwards=True) == 2
+    assert model.find("cible", 2, backwards=True) == 4
+
+def test_last_line_without_newline(qapp, tmp_path):
+    path = tmp_path / "app.log"
+    model = open_model(qapp, path, "un\ndeux\ntrois")
+    assert [model.line(row) for row in range(model.rowCount())] == ["un", "deux", "trois"]
+    assert model.find("trois", 0) == 2
+
+    # En suivi, la ligne inachevée est retirée puis indexée une fois terminée
+    model.set_tailing(True)
+    assert model.rowCount() == 2
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(" fin\nquatre\n")
+    assert model.refresh()
+    wait_indexed(qapp, model)
+    assert [model.line(row) for row in range(model.rowCount())] == ["un", "deux", "trois fin", "quatre"]
+    model.close()
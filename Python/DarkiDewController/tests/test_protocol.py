@@ -0,0 +1,77 @@
+import pytest
+
+from protocol import (ACK_FRAME, NAK_FRAME, Command, Frame, FrameDecoder, ProtocolHandler,
+                      StatusSample, parse_status_payload)
+
+STATUS_PAYLOAD = b'12.34#85.10#15.20#9.87#127.00#3#2'
+STATUS_REPLY = b'[' + STATUS_PAYLOAD + b']\x35'
+# ACK, STATUS, HELLO (première connexion), HELLO (déjà connecté), NAK
+STREAM = b'\x35' + STATUS_REPLY + b'\x30\x35' + b'\x33\x35' + b'\x34'
+EXPECTED = [ACK_FRAME, Frame(Command.STATUS, STATUS_PAYLOAD), Frame(Command.HELLO),
+            Frame(Command.ALREADY_CONNECTED), NAK_FRAME]
+
+def feed_chunks(data, size):
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(0, len(data), size):
+        frames += decoder.feed(data[i:i + size])
+    return frames, decoder
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 16, len(STREAM)])
+def test_decoder_same_frames_for_any_chunk_size(size):
+    frames, decoder = feed_chunks(STREAM, size)
+    assert frames == EXPECTED
+    assert decoder.state == FrameDecoder.IDLE
+    assert decoder.discarded == 0
+
+def test_decoder_split_at_every_position():
+    for i in range(len(STREAM) + 1):
+        decoder = FrameDecoder()
+        assert decoder.feed(STREAM[:i]) + decoder.feed(STREAM[i:]) == EXPECTED, i
+
+def test_decoder_digits_inside_brackets_are_not_ack_or_nak():
+    # '4' (0x34) et '5' (0x35) dans le contenu STATUS, reçus octet par octet
+    payload = b'45.45#55.00#44.44#5.4#54.00#4#5'
+    frames, _ = feed_chunks(b'[' + payload + b']\x35', 1)
+    assert frames == [Frame(Command.STATUS, payload)]
+
+def test_decoder_status_followed_by_error_is_nak():
+    for size in (1, 64):
+        frames, _ = feed_chunks(b'[' + STATUS_PAYLOAD + b']\x34', size)
+        assert frames == [NAK_FRAME]
+
+def test_decoder_skips_noise_and_resynchronises():
+    frames, decoder = feed_chunks(b'\x00\xff\x12' + STATUS_REPLY, 4)
+    assert frames == [Frame(Command.STATUS, STATUS_PAYLOAD)]
+    assert decoder.discarded == 3
+
+def test_decoder_drops_oversized_status():
+    decoder = FrameDecoder(max_payload=16)
+    frames = decoder.feed(b'[' + b'7' * 40)
+    frames += decoder.feed(b'\x35')
+    assert frames == [ACK_FRAME]
+    assert decoder.discarded > 0
+
+def test_decoder_payload_of_partial_frame_and_reset():
+    decoder = FrameDecoder()
+    assert decoder.feed(b'[12.3') == []
+    assert decoder.state == FrameDecoder.IN_DATA
+    assert decoder.payload == b'12.3'
+    decoder.reset()
+    assert decoder.state == FrameDecoder.IDLE
+    assert decoder.feed(STATUS_REPLY) == [Frame(Command.STATUS, STATUS_PAYLOAD)]
+
+def test_parse_status_payload():
+    sample = parse_status_payload(STATUS_PAYLOAD, t_ns=123)
+    assert sample == StatusSample(123, 12.34, 85.10, 15.20, 9.87, 127.0, 3, 2)
+    with pytest.raises(ValueError):
+        parse_status_payload(b'12.34#85.10')
+    with pytest.raises(ValueError):
+        parse_status_payload(b'a#b#c#d#e#f#g')
+
+def test_parse_response_raises_on_invalid_status():
+    handler = ProtocolHandler()
+    command, sample = handler.parse_response(STATUS_REPLY)
+    assert command == Command.STATUS and isinstance(sample, StatusSample)
+    with pytest.raises(ValueError):
+        handler.parse_response(b'[1#2]\x35')
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ring_buffer import ColumnarRingBuffer
+
+def filled(capacity, count):
+    ring = ColumnarRingBuffer(capacity, ('a', 'b'))
+    for i in range(count):
+        ring.append(float(i), (i * 2.0, i * 3.0))
+    return ring
+
+def expected(count, keep):
+    t = np.arange(max(0, count - keep), count, dtype=float)
+    return np.vstack((t, t * 2, t * 3))
+
+def test_append_wraps_and_keeps_last_points():
+    ring = filled(5, 12)
+    assert len(ring) == 5
+    np.testing.assert_array_equal(ring.last(), expected(12, 5))
+    np.testing.assert_array_equal(ring.column('b', 2), [30.0, 33.0])
+    t, values = ring.latest()
+    assert t == 11.0 and list(values) == [22.0, 33.0]
+
+def test_extend_matches_append():
+    ring = filled(7, 3)
+    t = np.arange(3, 20, dtype=float)
+    ring.extend(t, np.column_stack((t * 2, t * 3)))
+    np.testing.assert_array_equal(ring.last(), expected(20, 7))
+
+@pytest.mark.parametrize('count', [0, 3, 8, 13, 30])
+@pytest.mark.parametrize('capacity', [1, 4, 8, 20])
+def test_resize_keeps_most_recent_points(count, capacity):
+    ring = filled(8, count)
+    kept = min(count, 8, capacity)
+    ring.resize(capacity)
+    assert ring.capacity == capacity and len(ring) == kept
+    np.testing.assert_array_equal(ring.last(), expected(count, kept))
+    # Les ajouts suivants continuent normalement après le redimensionnement
+    for i in range(count, count + 10):
+        ring.append(float(i), (i * 2.0, i * 3.0))
+    np.testing.assert_array_equal(ring.last(), expected(count + 10, min(kept + 10, capacity)))
+
+def test_resize_rejects_invalid_capacity():
+    with pytest.raises(ValueError):
+        filled(4, 2).resize(0)
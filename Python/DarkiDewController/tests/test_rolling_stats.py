@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from rolling_stats import RollingStats
+
+def check(stats, expected):
+    assert stats.count == len(expected)
+    assert stats.min == expected.min()
+    assert stats.max == expected.max()
+    assert stats.last == expected[-1]
+    assert stats.mean == pytest.approx(expected.mean(), rel=1e-9, abs=1e-9)
+    assert stats.std == pytest.approx(expected.std(), rel=1e-6, abs=1e-9)
+
+def test_count_window_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = 20 + rng.normal(0, 2, 3000)
+    stats = RollingStats(max_count=100)
+    for i, value in enumerate(values):
+        stats.add(i, value)
+        check(stats, values[max(0, i - 99):i + 1])
+
+def test_time_window_matches_numpy():
+    rng = np.random.default_rng(1)
+    times = np.cumsum(rng.uniform(0.1, 3.0, 2000))
+    values = rng.normal(0, 1, 2000).cumsum()
+    stats = RollingStats(window=60.0)
+    for i, (t, value) in enumerate(zip(times, values)):
+        stats.add(t, value)
+        check(stats, values[:i + 1][times[:i + 1] >= t - 60.0])
+
+def test_no_drift_with_large_offset():
+    rng = np.random.default_rng(2)
+    values = 1e6 + rng.normal(0, 0.01, 50000)
+    stats = RollingStats(max_count=500)
+    stats.extend(range(len(values)), values)
+    assert stats.std == pytest.approx(values[-500:].std(), rel=1e-6)
+
+def test_set_window_and_clear():
+    stats = RollingStats(max_count=10)
+    stats.extend(range(10), range(10))
+    stats.set_window(max_count=3)
+    check(stats, np.array([7.0, 8.0, 9.0]))
+    stats.clear()
+    assert stats.count == 0 and stats.mean is None and stats.std is None and stats.min is None
@@ -0,0 +1,60 @@
+import os
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="DeviceSimulator utilise des pseudo-terminaux")
+
+from command_queue import CommandError, CommandRejected
+from device_simulator import DeviceSimulator
+from protocol import StatusSample
+
+TIMEOUT = 5.0
+
+@pytest.fixture
+def link(in_tmp_dir):
+    """SerialWorker connecté à un périphérique simulé : (worker, périphérique)"""
+    from main import SerialWorker
+    with DeviceSimulator(1, latency=0.01, fragment=3) as simulator:
+        worker = SerialWorker()
+        worker.device_boot_delay = 0
+        assert worker.connect(simulator.port_names[0])
+        deadline = time.monotonic() + TIMEOUT
+        while not worker.is_device_ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+        yield worker, simulator.devices[0]
+        worker.disconnect()
+
+def test_status_round_trip(link):
+    worker, device = link
+    sample = worker.request_status().result(TIMEOUT)
+    assert isinstance(sample, StatusSample)
+    assert (sample.delta_temp, sample.dew_offset) == (device.delta_temp, device.dew_offset)
+    assert device.connected  # HELLO envoyé au démarrage
+
+def test_settings_are_applied_in_order(link):
+    worker, device = link
+    futures = [worker.send_delta_temp(4), worker.send_dew_offset(2), worker.send_mode(False)]
+    assert [future.result(TIMEOUT) for future in futures] == [True, True, True]
+    assert (device.delta_temp, device.dew_offset) == (4, 2)
+    sample = worker.request_status().result(TIMEOUT)
+    assert (sample.delta_temp, sample.dew_offset) == (4, 2)
+
+def test_unknown_order_is_rejected(link):
+    worker, _ = link
+    with pytest.raises(CommandRejected):
+        worker.send_raw(b'\x41').result(TIMEOUT)
+    # La liaison reste utilisable après le NAK
+    assert worker.send_raw(b'\x31\x33').result(TIMEOUT) is True
+
+def test_disconnect_fails_pending_commands(link):
+    worker, _ = link
+    futures = [worker.request_status() for _ in range(3)]
+    worker.disconnect()
+    for future in futures:
+        try:
+            future.result(TIMEOUT)
+        except CommandError:
+            pass
+    assert all(future.done() for future in futures)
+    assert worker.send_hello().exception(0) is not None
@@ -0,0 +1,57 @@
+from protocol import StatusSample
+from status_scheduler import MAX_INTERVAL, MAX_STRETCH, SLOWDOWN, StatusScheduler
+
+def sample(t, tube=15.0, dew=9.0, pwm=100.0):
+    return StatusSample(int(t * 1e9), 12.0, 80.0, tube, dew, pwm, 3, 2)
+
+def run(scheduler, readings, round_trip=0.05):
+    """Envoie les mesures au rythme demandé par le scheduler ; renvoie les délais"""
+    t, delays = 0.0, []
+    for reading in readings:
+        delays.append(scheduler.on_sample(reading(t), round_trip))
+        t += delays[-1]
+    return delays
+
+def test_stable_readings_stretch_up_to_limit():
+    scheduler = StatusScheduler(30)
+    delays = run(scheduler, [sample] * 30)
+    assert delays[0] == 30
+    assert delays == sorted(delays)
+    assert delays[-1] == min(MAX_INTERVAL, 30 * MAX_STRETCH)
+
+def test_dew_risk_speeds_up_to_base_fraction():
+    scheduler = StatusScheduler(30)
+    run(scheduler, [sample] * 5)
+    delays = run(scheduler, [lambda t: sample(t, tube=9.5, dew=9.0)] * 10)
+    assert delays[-1] == 30 / MAX_STRETCH
+
+def test_pwm_change_speeds_up():
+    scheduler = StatusScheduler(30)
+    run(scheduler, [sample])
+    assert scheduler.on_sample(sample(30, pwm=150.0), 0.05) == 15
+
+def test_round_trip_sets_lower_bound():
+    scheduler = StatusScheduler(4)
+    delays = run(scheduler, [lambda t: sample(t, tube=9.5, dew=9.0)] * 10, round_trip=0.5)
+    assert min(delays[1:]) >= 4 * 0.5
+
+def test_failures_back_off_and_success_resets():
+    scheduler = StatusScheduler(30)
+    run(scheduler, [sample])
+    assert [scheduler.on_failure() for _ in range(4)] == [60, 120, 120, 120]
+    # Recul oublié : mesure stable, la période reprend depuis la base
+    assert scheduler.on_sample(sample(400), 0.05) == 30 * SLOWDOWN
+
+def test_fixed_mode_ignores_readings_and_failures():
+    scheduler = StatusScheduler(10, adaptive=False)
+    assert set(run(scheduler, [sample, lambda t: sample(t, tube=9.1, dew=9.0, pwm=255.0)] * 5)) == {10}
+    assert scheduler.on_failure() == 10
+
+def test_set_base_interval_and_reset():
+    scheduler = StatusScheduler(30)
+    run(scheduler, [sample] * 10)
+    scheduler.set_base_interval(5)
+    assert scheduler.next_delay == 5
+    scheduler.on_failure()
+    scheduler.reset()
+    assert scheduler.next_delay == 5 and scheduler.round_trip is None
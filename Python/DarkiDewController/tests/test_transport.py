@@ -0,0 +1,44 @@
+import asyncio
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason="DeviceSimulator utilise des pseudo-terminaux")
+
+from command_queue import CommandRejected
+from device_simulator import DeviceSimulator
+from protocol import StatusSample
+from transport import SerialTransport
+
+TIMEOUT = 5.0
+
+def exchange(port_name, select_reader=True):
+    """HELLO, DELTA, ordre inconnu puis STATUS ; renvoie (résultats, commandes terminées)"""
+    done = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        if not select_reader:
+            # Comme une boucle Proactor : pas de add_reader
+            def no_reader(*args):
+                raise NotImplementedError
+            loop.add_reader = no_reader
+        async with SerialTransport(port_name, on_done=lambda pending: done.append(pending.name)) as transport:
+            assert (transport._reader is None) == select_reader
+            results = [await transport.hello(), await transport.set_delta(4)]
+            with pytest.raises(CommandRejected):
+                await transport.command("0x41", b'\x41')
+            results.append(await transport.status())
+            return results
+
+    return asyncio.run(asyncio.wait_for(run(), TIMEOUT)), done
+
+@pytest.mark.parametrize('select_reader', [True, False], ids=['add_reader', 'executor'])
+def test_commands_round_trip(select_reader):
+    with DeviceSimulator(1, latency=0.01, fragment=3) as simulator:
+        (first, delta, sample), done = exchange(simulator.port_names[0], select_reader)
+        device = simulator.devices[0]
+    assert first is True and delta is True
+    assert isinstance(sample, StatusSample)
+    assert (sample.delta_temp, device.delta_temp) == (4, 4)
+    assert done == ["HELLO", "DELTA", "0x41", "STATUS"]
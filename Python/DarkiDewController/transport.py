@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import threading
+import time
+
+import serial
+
+import metrics
+from command_queue import CommandError, CommandQueue, CommandRejected
+from log_config import HexBytes
+from protocol import Command, FrameDecoder, ProtocolHandler, parse_status_payload
+
+# Octets lus au plus par réveil quand le port signale des données
+READ_CHUNK = 4096
+# Sans add_reader (Windows, boucle Proactor), lecture bloquante dans l'exécuteur :
+# attente maximale du premier octet (borne l'arrêt du lecteur) et silence entre
+# deux octets qui termine le bloc (s)
+READ_TIMEOUT = 0.5
+INTER_BYTE_TIMEOUT = 0.002
+
+class SerialTransport:
+    """
+    Liaison série asyncio avec le périphérique : la lecture est pilotée par
+    loop.add_reader sur le descripteur du port (POSIX), sans thread ; toutes
+    les E/S, la file de commandes et les délais s'exécutent dans le thread
+    de la boucle, dans l'ordre d'arrivée. Sans add_reader, un read()
+    bloquant tourne dans l'exécuteur de la boucle et rend chaque bloc reçu.
+
+    Les commandes s'attendent directement :
+        sample = await transport.status()
+        await transport.set_delta(3)
+    Elles passent par une CommandQueue (une seule en vol, délais et renvois
+    par type de commande) et lèvent CommandRejected / CommandTimeout.
+    Depuis un autre thread, submit() met une commande en file et renvoie
+    son concurrent.futures.Future.
+    """
+
+    def __init__(self, port, baudrate=19200, data_logger=None, on_sample=None, on_raw=None,
+                 on_done=None, logger=None):
+        self.port_name = port
+        self.baudrate = baudrate
+        self.data_logger = data_logger
+        self.on_sample = on_sample  # appelé avec chaque StatusSample reçu
+        self.on_raw = on_raw        # appelé avec chaque bloc d'octets reçu
+        self.on_done = on_done      # appelé avec chaque PendingCommand terminée (Future résolu)
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self.protocol = ProtocolHandler()
+        self.decoder = FrameDecoder()
+        self.commands = CommandQueue()
+        self.serial_port = None
+        self.loop = None
+        self._fd = None
+        self._reader = None
+        self._deadline = None
+
+    @property
+    def is_open(self):
+        return self.serial_port is not None and self.serial_port.is_open
+
+    async def open(self):
+        """Ouvre le port en mode non bloquant et commence la lecture"""
+        self.loop = asyncio.get_running_loop()
+        self.serial_port = serial.Serial(port=self.port_name, baudrate=self.baudrate,
+                                         timeout=0, write_timeout=2.0)
+        self.decoder.reset()
+        try:
+            self._fd = self.serial_port.fileno()
+            self.loop.add_reader(self._fd, self._on_readable)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            # Pas de descripteur sélectionnable : read() bloquant hors de la boucle
+            self._fd = None
+            self._reader = self.loop.create_task(self._read_blocking())
+        self.logger.info("Port %s ouvert (%d bauds)", self.port_name, self.baudrate)
+        return self
+
+    async def close(self):
+        """Ferme le port ; les commandes en attente échouent avec CommandError"""
+        if self._fd is not None:
+            self.loop.remove_reader(self._fd)
+            self._fd = None
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        self._cancel_deadline()
+        self.commands.cancel_all(CommandError("Déconnecté"))
+        if self.serial_port is not None:
+            self.serial_port.close()
+        self.logger.info("Port %s fermé", self.port_name)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # Commandes du protocole
+
+    def submit(self, name, data, coalesce=False):
+        """
+        Met une commande en file depuis n'importe quel thread et renvoie son
+        concurrent.futures.Future ; l'envoi est planifié dans la boucle.
+        """
+        if not self.is_open:
+            raise CommandError("Port série non ouvert")
+        future = self.commands.submit(name, data, coalesce)
+        self.loop.call_soon_threadsafe(self._send_next)
+        return future
+
+    async def command(self, name, data, coalesce=False):
+        """Met une commande en file et attend son résultat"""
+        if not self.is_open:
+            raise CommandError("Port série non ouvert")
+        future = self.commands.submit(name, data, coalesce)
+        self._send_next()
+        return await asyncio.wrap_future(future)
+
+    async def hello(self):
+        """HELLO ; renvoie True à la première connexion, False si déjà connecté"""
+        return await self.command("HELLO", self.protocol.create_hello_command())
+
+    async def status(self):
+        """STATUS ; renvoie le StatusSample reçu"""
+        return await self.command("STATUS", self.protocol.create_status_command(), coalesce=True)
+
+    async def set_delta(self, value):
+        return await self.command("DELTA", self.protocol.create_delta_command(value))
+
+    async def set_offset(self, value):
+        return await self.command("OFFSET", self.protocol.create_offset_command(value))
+
+    async def set_mode(self, is_maxi=True, value=100):
+        return await self.command("FULL" if is_maxi else "REGUL", self.protocol.create_mode_command(is_maxi, value))
+
+    async def save(self):
+        """Écrit les réglages en EEPROM"""
+        return await self.command("SAVE", bytes([Command.SAVE]))
+
+    # Envoi et délais
+
+    def _send_next(self):
+        """Envoie la commande suivante si aucune n'attend de réponse"""
+        pending = self.commands.start_next()
+        if pending is None:
+            return
+        self.logger.debug("%s: envoi %s (essai %d): %s", self.port_name,
+                          pending.name, pending.attempts, HexBytes(pending.data))
+        try:
+            self.serial_port.write(pending.data)
+        except Exception as e:
+            self.logger.error("%s: erreur envoi %s: %s", self.port_name, pending.name, e)
+            self._done(self.commands.fail(CommandError(f"Erreur envoi {pending.name}: {e}")))
+            self.loop.call_soon(self._send_next)
+            return
+        metrics.TX_BYTES.inc(len(pending.data))
+        if self.data_logger is not None:
+            self.data_logger.log_raw_data(pending.data, direction="TX")
+        self._deadline = self.loop.call_later(pending.policy.timeout, self._on_deadline, pending)
+
+    def _cancel_deadline(self):
+        if self._deadline is not None:
+            self._deadline.cancel()
+            self._deadline = None
+
+    def _on_deadline(self, pending):
+        self._deadline = None
+        if self.commands.current is not pending:
+            return
+        _, retry = self.commands.expire(pending.deadline)
+        self.decoder.reset()
+        if retry:
+            self.logger.warning("%s: timeout %s, nouvel essai", self.port_name, pending.name)
+        else:
+            self.logger.error("%s: timeout %s (%d envoi(s))", self.port_name, pending.name, pending.attempts)
+            self._done(pending)
+        self._send_next()
+
+    def _finish(self, success, result=True, reason="NAK"):
+        """Termine la commande en vol (échec : CommandRejected avec reason) et envoie la suivante"""
+        self._cancel_deadline()
+        if success:
+            pending = self.commands.complete(result)
+        else:
+            pending = self.commands.fail(CommandRejected(f"{self.commands.current.name}: {reason}"))
+        self.decoder.reset()
+        self._done(pending)
+        self._send_next()
+
+    def _done(self, pending):
+        if self.on_done is not None:
+            self.on_done(pending)
+
+    # Réception
+
+    def _on_readable(self):
+        try:
+            data = self.serial_port.read(self.serial_port.in_waiting or READ_CHUNK)
+        except Exception as e:
+            self.logger.error("%s: erreur lecture: %s", self.port_name, e)
+            self.loop.create_task(self.close())
+            return
+        if data:
+            self._received(data)
+
+    async def _read_blocking(self):
+        """
+        Lecteur sans add_reader : read() bloquant dans l'exécuteur, rendu au
+        premier silence de INTER_BYTE_TIMEOUT après un octet (ou à
+        READ_TIMEOUT sans données) ; le traitement reste dans la boucle.
+        """
+        port = self.serial_port
+        port.timeout = READ_TIMEOUT
+        port.inter_byte_timeout = INTER_BYTE_TIMEOUT
+        while port.is_open:
+            try:
+                data = await self.loop.run_in_executor(None, port.read, READ_CHUNK)
+            except Exception as e:
+                if port.is_open:
+                    self.logger.error("%s: erreur lecture: %s", self.port_name, e)
+                    self._reader = None
+                    self.loop.create_task(self.close())
+                return
+            if data:
+                self._received(data)
+
+    def _received(self, data):
+        self.logger.debug("%s: reçu %d octets: %.50s...", self.port_name, len(data), HexBytes(data))
+        metrics.RX_BYTES.inc(len(data))
+        if self.data_logger is not None:
+            self.data_logger.log_raw_data(data, direction="RX")
+        if self.on_raw is not None:
+            self.on_raw(data)
+        start = time.perf_counter()
+        frames = metrics.count_frames(self.decoder.feed(data))
+        metrics.DECODE_SECONDS.observe(time.perf_counter() - start)
+        for frame in frames:
+            self._handle_frame(frame)
+
+    def _handle_frame(self, frame):
+        """Résout la commande en vol selon la trame reçue"""
+        current = self.commands.current
+        if current is None:
+            self.logger.warning("%s: trame ignorée (aucune commande en cours): %s", self.port_name, frame.command.name)
+            return
+        if frame.command == Command.ERROR:
+            metrics.NAKS.inc()
+            self.logger.error("%s: %s: NAK reçu", self.port_name, current.name)
+            self._finish(False)
+        elif current.name == "STATUS":
+            if frame.command == Command.STATUS:
+                try:
+                    sample = parse_status_payload(frame.payload)
+                except ValueError as e:
+                    self.logger.error("%s: format STATUS invalide: %s", self.port_name, e)
+                    self._finish(False, reason=f"réponse invalide ({e})")
+                    return
+                if self.data_logger is not None:
+                    self.data_logger.log_parsed_data(sample)
+                if self.on_sample is not None:
+                    self.on_sample(sample)
+                self._finish(True, sample)
+        elif current.name == "HELLO":
+            if frame.command in (Command.HELLO, Command.ALREADY_CONNECTED):
+                self._finish(True, frame.command == Command.HELLO)
+        elif frame.command == Command.RECEIVED:  # DELTA, OFFSET, FULL, REGUL, SAVE
+            self._finish(True)
+
+class EventLoopThread:
+    """
+    Boucle asyncio dans un thread dédié, partagée par tous les transports :
+    pont entre le thread Qt (ou tout code synchrone) et les coroutines.
+    submit() renvoie un concurrent.futures.Future.
+    """
+
+    def __init__(self, name="SerialIO"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Planifie une coroutine dans la boucle d'E/S"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, callback, *args):
+        """Appelle une fonction dans le thread de la boucle"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout=5.0):
+        if not self.loop.is_running():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.loop.close()